@@ -1,11 +1,12 @@
 import streamlit as st
 import yfinance as yf
-import pandas as pd
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from utils.data_fetcher import DataFetcher
 from utils.portfolio_manager import PortfolioManager
 from utils.stock_symbols import StockSymbolFetcher
+from utils.market_snapshot import get_market_snapshot, DASHBOARD_INDICES
+from utils.market_movers import get_market_movers
 from auth import init_auth, login_page, get_current_user, logout
 import streamlit.components.v1 as components
 
@@ -84,79 +85,28 @@ if user:
 else:
     st.markdown("Welcome to your comprehensive stock market analysis platform")
 
-# Quick stats section
-col1, col2, col3, col4 = st.columns(4)
+# Quick stats section (served from the shared market snapshot)
+market_snapshot = get_market_snapshot()
+index_quotes = market_snapshot.get_quotes(list(DASHBOARD_INDICES.values()))
 
-with col1:
-    try:
-        spy_data = yf.Ticker("SPY").history(period="1d")
-        if not spy_data.empty:
-            spy_price = spy_data['Close'].iloc[-1]
-            spy_change = spy_data['Close'].iloc[-1] - spy_data['Open'].iloc[-1]
-            spy_pct_change = (spy_change / spy_data['Open'].iloc[-1]) * 100
-
-            st.metric(
-                label="S&P 500 (SPY)",
-                value=f"${spy_price:.2f}",
-                delta=f"{spy_pct_change:.2f}%"
-            )
-        else:
-            st.metric("S&P 500 (SPY)", "N/A", "Data unavailable")
-    except Exception as e:
-        st.metric("S&P 500 (SPY)", "Error", f"Failed to fetch data")
-
-with col2:
-    try:
-        nasdaq_data = yf.Ticker("QQQ").history(period="1d")
-        if not nasdaq_data.empty:
-            nasdaq_price = nasdaq_data['Close'].iloc[-1]
-            nasdaq_change = nasdaq_data['Close'].iloc[-1] - nasdaq_data['Open'].iloc[-1]
-            nasdaq_pct_change = (nasdaq_change / nasdaq_data['Open'].iloc[-1]) * 100
-
-            st.metric(
-                label="NASDAQ (QQQ)",
-                value=f"${nasdaq_price:.2f}",
-                delta=f"{nasdaq_pct_change:.2f}%"
-            )
-        else:
-            st.metric("NASDAQ (QQQ)", "N/A", "Data unavailable")
-    except Exception as e:
-        st.metric("NASDAQ (QQQ)", "Error", f"Failed to fetch data")
-
-with col3:
-    try:
-        dow_data = yf.Ticker("DIA").history(period="1d")
-        if not dow_data.empty:
-            dow_price = dow_data['Close'].iloc[-1]
-            dow_change = dow_data['Close'].iloc[-1] - dow_data['Open'].iloc[-1]
-            dow_pct_change = (dow_change / dow_data['Open'].iloc[-1]) * 100
-
-            st.metric(
-                label="DOW (DIA)",
-                value=f"${dow_price:.2f}",
-                delta=f"{dow_pct_change:.2f}%"
-            )
-        else:
-            st.metric("DOW (DIA)", "N/A", "Data unavailable")
-    except Exception as e:
-        st.metric("DOW (DIA)", "Error", f"Failed to fetch data")
-
-with col4:
-    try:
-        vix_data = yf.Ticker("^VIX").history(period="1d")
-        if not vix_data.empty:
-            vix_price = vix_data['Close'].iloc[-1]
-            vix_change = vix_data['Close'].iloc[-1] - vix_data['Open'].iloc[-1]
-
-            st.metric(
-                label="VIX",
-                value=f"{vix_price:.2f}",
-                delta=f"{vix_change:.2f}"
-            )
+for col, (label, index_symbol) in zip(st.columns(4), DASHBOARD_INDICES.items()):
+    with col:
+        quote = index_quotes.get(index_symbol)
+        if quote:
+            if index_symbol == '^VIX':
+                st.metric(
+                    label=label,
+                    value=f"{quote['price']:.2f}",
+                    delta=f"{quote['change']:.2f}"
+                )
+            else:
+                st.metric(
+                    label=label,
+                    value=f"${quote['price']:.2f}",
+                    delta=f"{quote['percent_change']:.2f}%"
+                )
         else:
-            st.metric("VIX", "N/A", "Data unavailable")
-    except Exception as e:
-        st.metric("VIX", "Error", f"Failed to fetch data")
+            st.metric(label, "N/A", "Data unavailable")
 
 # Quick stock lookup
 st.subheader("Quick Stock Lookup")
@@ -195,57 +145,35 @@ with col2:
 # Recent activity section
 st.subheader("Market Activity")
 
-# Top gainers and losers (using popular stocks as example)
-popular_stocks = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META', 'NFLX', 'NVDA']
+# Top gainers and losers across the whole symbol universe
+market_movers = get_market_movers()
 
 try:
-    stock_data = []
-    for stock in popular_stocks:
-        try:
-            ticker = yf.Ticker(stock)
-            hist = ticker.history(period="1d")
-            if not hist.empty:
-                current_price = hist['Close'].iloc[-1]
-                open_price = hist['Open'].iloc[-1]
-                change = current_price - open_price
-                pct_change = (change / open_price) * 100
-
-                stock_data.append({
-                    'Symbol': stock,
-                    'Price': current_price,
-                    'Change': change,
-                    'Change %': pct_change
-                })
-        except:
-            continue
-
-    if stock_data:
-        df = pd.DataFrame(stock_data)
-        df = df.sort_values('Change %', ascending=False)
+    top_gainers = market_movers.get_movers('gainers', limit=4)
+    top_losers = market_movers.get_movers('losers', limit=4)
 
+    if top_gainers or top_losers:
         col1, col2 = st.columns(2)
 
         with col1:
             st.write("**Top Gainers**")
-            top_gainers = df.head(4)
-            for _, row in top_gainers.iterrows():
+            for quote in top_gainers:
                 st.metric(
-                    label=row['Symbol'],
-                    value=f"${row['Price']:.2f}",
-                    delta=f"{row['Change %']:.2f}%"
+                    label=quote['symbol'],
+                    value=f"${quote['price']:.2f}",
+                    delta=f"{quote['percent_change']:.2f}%"
                 )
 
         with col2:
             st.write("**Top Losers**")
-            top_losers = df.tail(4)
-            for _, row in top_losers.iterrows():
+            for quote in top_losers:
                 st.metric(
-                    label=row['Symbol'],
-                    value=f"${row['Price']:.2f}",
-                    delta=f"{row['Change %']:.2f}%"
+                    label=quote['symbol'],
+                    value=f"${quote['price']:.2f}",
+                    delta=f"{quote['percent_change']:.2f}%"
                 )
     else:
-        st.warning("Unable to fetch market activity data at this time.")
+        st.info("Market activity will appear once the background universe scan completes.")
 
 except Exception as e:
     st.error(f"Error loading market activity: {str(e)}")
@@ -0,0 +1,140 @@
+"""
+Micro-benchmarks for the RSI / true range / ATR kernels
+
+Compares runtime and peak allocations of utils.indicator_kernels against the
+previous pandas implementations, and checks the results agree.
+
+Run from the repository root:
+    python -m benchmarks.bench_indicator_kernels [--sizes 252 5040] [--repeat 50]
+"""
+import argparse
+import timeit
+import tracemalloc
+import numpy as np
+import pandas as pd
+from utils import indicator_kernels
+
+DEFAULT_SIZES = [252, 1260, 5040, 20160]
+
+
+def legacy_rsi(data, window=14):
+    """Previous TechnicalAnalysis.calculate_rsi (simple rolling means)"""
+    delta = data.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def legacy_true_range(high, low, close):
+    """Previous true range built from a throwaway 3-column DataFrame"""
+    tr1 = high - low
+    tr2 = abs(high - close.shift())
+    tr3 = abs(low - close.shift())
+    return pd.DataFrame({'tr1': tr1, 'tr2': tr2, 'tr3': tr3}).max(axis=1)
+
+
+def legacy_atr(high, low, close, window=14):
+    """Previous TechnicalAnalysis.calculate_atr (simple rolling mean)"""
+    return legacy_true_range(high, low, close).rolling(window=window).mean()
+
+
+def pandas_wilder(values, window=14):
+    """Reference Wilder smoothing via pandas ewm, seeded with the first simple average"""
+    seeded = values.copy()
+    seeded.iloc[:window - 1] = np.nan
+    seeded.iloc[window - 1] = values.iloc[:window].mean()
+    return seeded.ewm(alpha=1 / window, adjust=False, ignore_na=True).mean()
+
+
+def pandas_wilder_rsi(close, window=14):
+    """Reference Wilder RSI built from pandas operations"""
+    delta = close.diff().iloc[1:]
+    gain = pandas_wilder(delta.clip(lower=0), window)
+    loss = pandas_wilder((-delta).clip(lower=0), window)
+    return (100 - 100 / (1 + gain / loss)).reindex(close.index)
+
+
+def make_bars(size, seed=0):
+    """Random-walk OHLC bars"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size)))
+    spread = np.abs(rng.normal(0, 0.01, size)) * close
+    index = pd.date_range('2000-01-03', periods=size, freq='B')
+    return pd.DataFrame({
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close
+    }, index=index)
+
+
+def measure(func, repeat):
+    """
+    Time a callable and record its peak traced allocation
+
+    Returns:
+        tuple: (best time per call in ms, peak allocation in KiB)
+    """
+    func()
+    best = min(timeit.repeat(func, number=1, repeat=repeat)) * 1000
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1024
+
+
+def max_difference(a, b):
+    """Largest absolute difference where both results are defined"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    both = ~(np.isnan(a) | np.isnan(b))
+    return float(np.abs(a[both] - b[both]).max()) if both.any() else float('nan')
+
+
+def run(sizes, repeat):
+    rows = []
+    for size in sizes:
+        bars = make_bars(size)
+        high, low, close = bars['High'], bars['Low'], bars['Close']
+        h, l, c = high.to_numpy(), low.to_numpy(), close.to_numpy()
+
+        cases = [
+            ('RSI sma', lambda: legacy_rsi(close), lambda: indicator_kernels.rsi(c, method='sma')),
+            ('RSI wilder', lambda: pandas_wilder_rsi(close), lambda: indicator_kernels.rsi(c)),
+            ('True range', lambda: legacy_true_range(high, low, close), lambda: indicator_kernels.true_range(h, l, c)),
+            ('ATR sma', lambda: legacy_atr(high, low, close), lambda: indicator_kernels.atr(h, l, c, method='sma')),
+            ('ATR wilder', lambda: pandas_wilder(legacy_true_range(high, low, close)),
+             lambda: indicator_kernels.atr(h, l, c))
+        ]
+
+        for name, baseline, kernel in cases:
+            base_ms, base_kib = measure(baseline, repeat)
+            kernel_ms, kernel_kib = measure(kernel, repeat)
+            rows.append({
+                'Indicator': name,
+                'Bars': size,
+                'Pandas ms': round(base_ms, 3),
+                'Kernel ms': round(kernel_ms, 3),
+                'Speedup': round(base_ms / kernel_ms, 1),
+                'Pandas peak KiB': round(base_kib, 1),
+                'Kernel peak KiB': round(kernel_kib, 1),
+                'Max abs diff': max_difference(baseline(), kernel())
+            })
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark indicator kernels against the pandas implementations")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Number of bars per run")
+    parser.add_argument('--repeat', type=int, default=30, help="Timing repetitions per case")
+    args = parser.parse_args()
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(run(args.sizes, args.repeat).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
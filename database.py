@@ -101,6 +101,14 @@ class DatabaseManager:
                 )
             """)
             
+            # Activity is read per user and pruned by age
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_user_activity_user ON user_activity (user_id, timestamp)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_user_activity_timestamp ON user_activity (timestamp)
+            """)
+            
             conn.commit()
     
     @contextmanager
@@ -166,14 +174,24 @@ class DatabaseManager:
         return None
     
     def log_activity(self, user_id, action, details=None, ip_address=None, user_agent=None):
-        """Log user activity"""
+        """Log user activity (queued and written in batches by utils.activity_log)"""
+        from utils.activity_log import get_activity_log
+        get_activity_log(self.db_path).log(user_id, action, details, ip_address, user_agent)
+    
+    def get_user_activity(self, user_id, limit=50):
+        """Get a user's most recent activity"""
+        from utils.activity_log import get_activity_log, FLUSH_TIMEOUT
+        get_activity_log(self.db_path).flush(FLUSH_TIMEOUT)
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO user_activity (user_id, action, details, ip_address, user_agent)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user_id, action, details, ip_address, user_agent))
-            conn.commit()
+                SELECT action, details, ip_address, user_agent, timestamp
+                FROM user_activity
+                WHERE user_id = ?
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (user_id, limit))
+            return cursor.fetchall()
     
     def update_user_settings(self, user_id, settings):
         """Update user settings"""
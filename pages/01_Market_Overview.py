@@ -1,23 +1,20 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
-from utils.data_fetcher import DataFetcher
+from utils.market_snapshot import get_market_snapshot
+from utils.market_movers import get_market_movers
+from utils.sector_aggregates import get_sector_aggregator, HORIZON_LABELS
 
 st.set_page_config(page_title="Market Overview", page_icon="📊", layout="wide")
 
-# Initialize data fetcher
-if 'data_fetcher' not in st.session_state:
-    st.session_state.data_fetcher = DataFetcher()
-
-data_fetcher = st.session_state.data_fetcher
+market_snapshot = get_market_snapshot()
 
 st.title("📊 Market Overview")
 
 # Get market indices data
-indices_data = data_fetcher.get_market_indices()
+indices_data = market_snapshot.get_market_indices()
 
 if indices_data:
     # Display major indices
@@ -76,58 +73,26 @@ if indices_data:
 # Sector performance
 st.subheader("Sector Performance")
 
-sector_etfs = {
-    'Technology': 'XLK',
-    'Healthcare': 'XLV',
-    'Financials': 'XLF',
-    'Energy': 'XLE',
-    'Consumer Discretionary': 'XLY',
-    'Utilities': 'XLU',
-    'Real Estate': 'XLRE',
-    'Materials': 'XLB',
-    'Industrials': 'XLI',
-    'Consumer Staples': 'XLP',
-    'Communication': 'XLC'
-}
+sector_aggregator = get_sector_aggregator()
+horizon = st.radio("Horizon", HORIZON_LABELS, horizontal=True, key="sector_horizon")
 
 try:
-    sector_data = []
-    for sector, etf in sector_etfs.items():
-        try:
-            ticker = yf.Ticker(etf)
-            data = ticker.history(period="1d")
-            if not data.empty:
-                current_price = data['Close'].iloc[-1]
-                open_price = data['Open'].iloc[-1]
-                change = current_price - open_price
-                pct_change = (change / open_price) * 100
-                
-                sector_data.append({
-                    'Sector': sector,
-                    'ETF': etf,
-                    'Price': current_price,
-                    'Change %': pct_change
-                })
-        except:
-            continue
+    sector_df = sector_aggregator.get_performance(horizon)
     
-    if sector_data:
-        sector_df = pd.DataFrame(sector_data)
-        sector_df = sector_df.sort_values('Change %', ascending=False)
-        
+    if not sector_df.empty:
         # Create sector performance chart
         fig = go.Figure(data=[
             go.Bar(
                 x=sector_df['Sector'],
-                y=sector_df['Change %'],
-                marker_color=['green' if x >= 0 else 'red' for x in sector_df['Change %']],
-                text=[f"{x:.2f}%" for x in sector_df['Change %']],
+                y=sector_df[horizon],
+                marker_color=['green' if x >= 0 else 'red' for x in sector_df[horizon]],
+                text=[f"{x:.2f}%" for x in sector_df[horizon]],
                 textposition='auto'
             )
         ])
         
         fig.update_layout(
-            title="Sector Performance Today",
+            title=f"Sector Performance ({horizon})",
             xaxis_title="Sector",
             yaxis_title="Change (%)",
             height=400,
@@ -146,7 +111,7 @@ try:
                 st.metric(
                     label=f"{row['Sector']} ({row['ETF']})",
                     value=f"${row['Price']:.2f}",
-                    delta=f"{row['Change %']:.2f}%"
+                    delta=f"{row[horizon]:.2f}%"
                 )
         
         with col2:
@@ -156,10 +121,25 @@ try:
                 st.metric(
                     label=f"{row['Sector']} ({row['ETF']})",
                     value=f"${row['Price']:.2f}",
-                    delta=f"{row['Change %']:.2f}%"
+                    delta=f"{row[horizon]:.2f}%"
                 )
+        
+        with st.expander("All Horizons"):
+            st.dataframe(
+                sector_df[['Sector', 'ETF', 'Price'] + HORIZON_LABELS].round(2),
+                use_container_width=True,
+                hide_index=True
+            )
     else:
         st.warning("Unable to fetch sector performance data at this time.")
+    
+    # Advance/decline breadth across the symbol universe
+    st.write("**Market Breadth by Sector**")
+    breadth_df = sector_aggregator.get_breadth()
+    if not breadth_df.empty:
+        st.dataframe(breadth_df.round(2), use_container_width=True, hide_index=True)
+    else:
+        st.info("Breadth statistics will appear once the background universe scan completes.")
 
 except Exception as e:
     st.error(f"Error loading sector data: {str(e)}")
@@ -167,55 +147,49 @@ except Exception as e:
 # Market movers
 st.subheader("Market Movers")
 
-# Popular stocks to track for movers
-popular_stocks = [
-    'AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META', 'NFLX', 'NVDA',
-    'AMD', 'INTC', 'CRM', 'ORCL', 'PYPL', 'SHOP', 'UBER', 'ZOOM',
-    'JPM', 'BAC', 'V', 'MA', 'JNJ', 'PFE', 'KO', 'PEP', 'WMT', 'HD'
-]
+market_movers = get_market_movers()
 
 try:
-    movers_data = []
-    for symbol in popular_stocks:
-        try:
-            quote = data_fetcher.get_real_time_quote(symbol)
-            if quote:
-                movers_data.append({
-                    'Symbol': symbol,
-                    'Price': quote['price'],
-                    'Change': quote['change'],
-                    'Change %': quote['percent_change'],
-                    'Volume': quote['volume']
-                })
-        except:
-            continue
+    top_gainers = market_movers.get_movers('gainers')
+    top_losers = market_movers.get_movers('losers')
     
-    if movers_data:
-        movers_df = pd.DataFrame(movers_data)
-        
+    if top_gainers or top_losers:
         col1, col2 = st.columns(2)
         
         with col1:
             st.write("**Top Gainers**")
-            top_gainers = movers_df.nlargest(10, 'Change %')
-            for _, row in top_gainers.iterrows():
+            for quote in top_gainers:
                 st.metric(
-                    label=row['Symbol'],
-                    value=f"${row['Price']:.2f}",
-                    delta=f"{row['Change %']:.2f}%"
+                    label=quote['symbol'],
+                    value=f"${quote['price']:.2f}",
+                    delta=f"{quote['percent_change']:.2f}%"
                 )
         
         with col2:
             st.write("**Top Losers**")
-            top_losers = movers_df.nsmallest(10, 'Change %')
-            for _, row in top_losers.iterrows():
+            for quote in top_losers:
                 st.metric(
-                    label=row['Symbol'],
-                    value=f"${row['Price']:.2f}",
-                    delta=f"{row['Change %']:.2f}%"
+                    label=quote['symbol'],
+                    value=f"${quote['price']:.2f}",
+                    delta=f"{quote['percent_change']:.2f}%"
                 )
+        
+        volume_spikes = market_movers.get_movers('volume')
+        if volume_spikes:
+            st.write("**Unusual Volume**")
+            volume_df = pd.DataFrame([
+                {
+                    'Symbol': quote['symbol'],
+                    'Price': quote['price'],
+                    'Change %': quote['percent_change'],
+                    'Volume': quote['volume'],
+                    'Volume vs Avg': quote['volume_ratio']
+                }
+                for quote in volume_spikes
+            ])
+            st.dataframe(volume_df.round(2), use_container_width=True, hide_index=True)
     else:
-        st.warning("Unable to fetch market movers data at this time.")
+        st.info("Market movers will appear once the background universe scan completes.")
 
 except Exception as e:
     st.error(f"Error loading market movers: {str(e)}")
@@ -241,7 +215,8 @@ with col2:
         st.metric("Market Status", "CLOSED", "🔴")
 
 with col3:
-    st.metric("Last Update", datetime.now().strftime("%H:%M:%S"))
+    last_update = market_snapshot.updated_at
+    st.metric("Last Update", last_update.strftime("%H:%M:%S") if last_update else "Pending")
 
 # Auto-refresh option
 with st.sidebar:
@@ -1,11 +1,13 @@
 import streamlit as st
 import yfinance as yf
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 from utils.data_fetcher import DataFetcher
 from utils.technical_analysis import TechnicalAnalysis
+from utils.chart_downsampling import aggregate_ohlc, downsample_series, downsample_frame, slice_range
+from utils.chart_builder import (
+    build_figure, cached_figure, candlestick_trace, data_version, line_trace, volume_trace
+)
 
 st.set_page_config(page_title="Stock Search", page_icon="🔍", layout="wide")
 
@@ -127,166 +129,64 @@ if selected_symbol:
             with chart_options[3]:
                 show_indicators = st.checkbox("Technical Indicators", value=False)
             
-            # Create chart based on type
-            if chart_type == "Candlestick":
-                # Create candlestick chart with subplots
-                rows = 2 if show_volume else 1
-                row_heights = [0.7, 0.3] if show_volume else [1.0]
-                
-                fig = make_subplots(
-                    rows=rows, cols=1,
-                    shared_xaxes=True,
-                    vertical_spacing=0.03,
-                    subplot_titles=[f'{selected_symbol} Price'] + (['Volume'] if show_volume else []),
-                    row_heights=row_heights
-                )
-                
-                # Candlestick
-                fig.add_trace(
-                    go.Candlestick(
-                        x=stock_data.index,
-                        open=stock_data['Open'],
-                        high=stock_data['High'],
-                        low=stock_data['Low'],
-                        close=stock_data['Close'],
-                        name=selected_symbol
-                    ),
-                    row=1, col=1
+            # Zooming slices the full-resolution bars before they are downsampled
+            first_day = stock_data.index[0].date()
+            last_day = stock_data.index[-1].date()
+            zoom_start, zoom_end = first_day, last_day
+            if first_day < last_day:
+                zoom_start, zoom_end = st.slider(
+                    "Zoom",
+                    min_value=first_day,
+                    max_value=last_day,
+                    value=(first_day, last_day),
+                    format="YYYY-MM-DD"
                 )
-                
-                # Moving averages
+            
+            def build_chart():
+                # Indicators are computed on the full history so zooming keeps their warm-up
+                chart_data = slice_range(stock_data, zoom_start, zoom_end)
+                ma_traces = []
                 if show_ma:
-                    sma_20 = ta.calculate_sma(stock_data['Close'], 20)
-                    sma_50 = ta.calculate_sma(stock_data['Close'], 50)
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=sma_20,
-                            mode='lines',
-                            name='SMA 20',
-                            line=dict(color='orange', width=1)
-                        ),
-                        row=1, col=1
-                    )
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=sma_50,
-                            mode='lines',
-                            name='SMA 50',
-                            line=dict(color='blue', width=1)
-                        ),
-                        row=1, col=1
-                    )
-                
-                # Bollinger Bands
-                if show_bb:
-                    bb = ta.calculate_bollinger_bands(stock_data['Close'])
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=bb['upper'],
-                            mode='lines',
-                            name='BB Upper',
-                            line=dict(color='red', dash='dash', width=1)
-                        ),
-                        row=1, col=1
-                    )
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=bb['lower'],
-                            mode='lines',
-                            name='BB Lower',
-                            line=dict(color='red', dash='dash', width=1),
-                            fill='tonexty',
-                            fillcolor='rgba(255,0,0,0.05)'
-                        ),
-                        row=1, col=1
-                    )
+                    for window, color in ((20, 'orange'), (50, 'blue')):
+                        sma = slice_range(ta.calculate_sma(stock_data['Close'], window), zoom_start, zoom_end)
+                        ma_traces.append(line_trace(downsample_series(sma), f'SMA {window}', color=color,
+                                                    width=1 if chart_type == "Candlestick" else None))
                 
-                # Volume
-                if show_volume:
-                    colors = ['red' if close < open else 'green' 
-                             for close, open in zip(stock_data['Close'], stock_data['Open'])]
+                if chart_type == "Candlestick":
+                    candles = aggregate_ohlc(chart_data)
+                    price_traces = [candlestick_trace(candles, selected_symbol)] + ma_traces
                     
-                    fig.add_trace(
-                        go.Bar(
-                            x=stock_data.index,
-                            y=stock_data['Volume'],
-                            name='Volume',
-                            marker_color=colors,
-                            opacity=0.7
-                        ),
-                        row=2, col=1
-                    )
-                
-                fig.update_layout(
-                    height=600,
-                    xaxis_rangeslider_visible=False,
-                    showlegend=True
-                )
-                
-            elif chart_type == "Line":
-                fig = go.Figure()
-                fig.add_trace(
-                    go.Scatter(
-                        x=stock_data.index,
-                        y=stock_data['Close'],
-                        mode='lines',
-                        name=f'{selected_symbol} Close',
-                        line=dict(width=2)
-                    )
-                )
-                
-                if show_ma:
-                    sma_20 = ta.calculate_sma(stock_data['Close'], 20)
-                    sma_50 = ta.calculate_sma(stock_data['Close'], 50)
+                    if show_bb:
+                        bb = pd.DataFrame(ta.calculate_bollinger_bands(stock_data['Close']))
+                        bb = downsample_frame(slice_range(bb, zoom_start, zoom_end), by='middle')
+                        price_traces.append(line_trace(bb['upper'], 'BB Upper', color='red', dash='dash', width=1))
+                        price_traces.append(line_trace(bb['lower'], 'BB Lower', color='red', dash='dash', width=1,
+                                                       fill='tonexty', fillcolor='rgba(255,0,0,0.05)'))
                     
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=sma_20,
-                            mode='lines',
-                            name='SMA 20',
-                            line=dict(color='orange')
-                        )
-                    )
+                    rows = [{'title': f'{selected_symbol} Price', 'height': 0.7, 'traces': price_traces}]
+                    if show_volume:
+                        rows.append({'title': 'Volume', 'height': 0.3,
+                                     'traces': [volume_trace(candles, opacity=0.7)]})
                     
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=sma_50,
-                            mode='lines',
-                            name='SMA 50',
-                            line=dict(color='blue')
-                        )
-                    )
+                    return build_figure({'height': 600, 'rows': rows, 'layout': {'showlegend': True}})
                 
-                fig.update_layout(
-                    title=f'{selected_symbol} Price Chart',
-                    height=500
-                )
-            
-            else:  # Area chart
-                fig = go.Figure()
-                fig.add_trace(
-                    go.Scatter(
-                        x=stock_data.index,
-                        y=stock_data['Close'],
-                        mode='lines',
-                        name=f'{selected_symbol} Close',
-                        fill='tonexty',
-                        line=dict(width=2)
-                    )
-                )
+                close_line = downsample_series(chart_data['Close'])
+                if chart_type == "Line":
+                    price_traces = [line_trace(close_line, f'{selected_symbol} Close', width=2)] + ma_traces
+                else:  # Area chart
+                    price_traces = [line_trace(close_line, f'{selected_symbol} Close', width=2, fill='tonexty')]
                 
-                fig.update_layout(
-                    title=f'{selected_symbol} Price Chart',
-                    height=500
-                )
+                return build_figure({
+                    'title': f'{selected_symbol} Price Chart',
+                    'height': 500,
+                    'rows': [{'traces': price_traces}]
+                })
+            
+            chart_options_key = (chart_type, show_volume, show_ma, show_bb, str(zoom_start), str(zoom_end))
+            fig = cached_figure(
+                "stock_search", selected_symbol, period, chart_options_key,
+                data_version(stock_data), build_chart
+            )
             
             st.plotly_chart(fig, use_container_width=True)
             
@@ -5,6 +5,11 @@ import plotly.express as px
 from datetime import datetime
 from utils.data_fetcher import DataFetcher
 from utils.portfolio_manager import PortfolioManager
+from utils.risk_analytics import get_portfolio_risk, BENCHMARK_SYMBOL
+from utils.monte_carlo import simulate_portfolio, SIMULATION_METHODS
+from utils.portfolio_optimizer import (
+    optimize_holdings, rebalance_trades, OPTIMIZATION_TARGETS, RISK_FREE_RATE
+)
 from auth import require_auth
 
 st.set_page_config(page_title="Stocks", page_icon="📈", layout="wide")
@@ -159,6 +164,247 @@ def main():
 
             st.plotly_chart(fig, use_container_width=True)
 
+            # Risk analytics from daily closes
+            st.subheader("Risk Analytics")
+
+            risk_period = st.selectbox("Risk Lookback", ["6mo", "1y", "2y", "5y"], index=1)
+
+            try:
+                risk = get_portfolio_risk(
+                    data_fetcher,
+                    {holding['symbol']: holding['shares'] for holding in portfolio_data['holdings']},
+                    period=risk_period
+                )
+            except Exception as e:
+                risk = None
+                st.error(f"Error calculating portfolio risk: {str(e)}")
+
+            if risk:
+                var_95 = risk['var'].iloc[0]
+
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Volatility (annualized)", f"{risk['volatility']:.2f}%",
+                              f"{risk['daily_volatility']:.2f}% daily", delta_color="off")
+                with col2:
+                    st.metric(f"Beta vs {BENCHMARK_SYMBOL}",
+                              f"{risk['beta']:.2f}" if not pd.isna(risk['beta']) else "N/A")
+                with col3:
+                    st.metric(f"1-Day VaR ({var_95['confidence']:.0f}%)", f"${var_95['historical_var_value']:,.2f}",
+                              f"{var_95['historical_var']:.2f}% historical", delta_color="off")
+                with col4:
+                    st.metric(f"1-Day CVaR ({var_95['confidence']:.0f}%)", f"${var_95['historical_cvar_value']:,.2f}",
+                              f"{var_95['historical_cvar']:.2f}% historical", delta_color="off")
+
+                st.caption(
+                    f"Based on {risk['observations']} daily returns from "
+                    f"{pd.Timestamp(risk['start']).strftime('%Y-%m-%d')} to {pd.Timestamp(risk['end']).strftime('%Y-%m-%d')}"
+                )
+                if risk['missing']:
+                    st.warning(f"No price history for: {', '.join(risk['missing'])}")
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.write("**Value at Risk (1 day)**")
+                    var_display = risk['var'].rename(columns={
+                        'confidence': 'Confidence (%)',
+                        'historical_var': 'Historical VaR (%)',
+                        'historical_cvar': 'Historical CVaR (%)',
+                        'parametric_var': 'Parametric VaR (%)',
+                        'parametric_cvar': 'Parametric CVaR (%)',
+                        'historical_var_value': 'Historical VaR ($)',
+                        'historical_cvar_value': 'Historical CVaR ($)',
+                        'parametric_var_value': 'Parametric VaR ($)',
+                        'parametric_cvar_value': 'Parametric CVaR ($)'
+                    })
+                    st.dataframe(var_display.round(2).set_index('Confidence (%)').T, use_container_width=True)
+
+                with col2:
+                    st.write("**Risk Contribution**")
+                    positions_display = risk['positions'].rename(columns={
+                        'symbol': 'Symbol',
+                        'value': 'Value',
+                        'weight': 'Weight (%)',
+                        'volatility': 'Volatility (%)',
+                        'beta': 'Beta',
+                        'risk_contribution': 'Risk Contribution (%)',
+                        'risk_contribution_pct': 'Share of Risk (%)'
+                    })
+                    st.dataframe(positions_display.round(2), use_container_width=True, hide_index=True)
+
+                if len(risk['correlation']) > 1:
+                    corr_fig = px.imshow(
+                        risk['correlation'].round(2),
+                        text_auto=True,
+                        color_continuous_scale='RdBu_r',
+                        zmin=-1,
+                        zmax=1,
+                        title="Correlation of Daily Returns"
+                    )
+                    corr_fig.update_layout(height=400)
+                    st.plotly_chart(corr_fig, use_container_width=True)
+            else:
+                st.info("Not enough price history to estimate portfolio risk")
+
+            # Forward-looking Monte Carlo simulation
+            st.subheader("Monte Carlo Simulation")
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                mc_method = st.selectbox("Method", list(SIMULATION_METHODS), format_func=SIMULATION_METHODS.get)
+            with col2:
+                mc_paths = st.selectbox("Paths", [1000, 10000, 100000], index=1, format_func=lambda n: f"{n:,}")
+            with col3:
+                mc_horizon = st.selectbox(
+                    "Horizon", [21, 63, 126, 252], index=3,
+                    format_func=lambda days: {21: "1 Month", 63: "3 Months", 126: "6 Months", 252: "1 Year"}[days]
+                )
+            with col4:
+                mc_seed = st.number_input("Random Seed", min_value=0, value=42, step=1)
+
+            # Results are stored with their inputs so a change never shows a stale fan chart
+            mc_holdings = tuple(sorted((holding['symbol'], holding['shares']) for holding in portfolio_data['holdings']))
+            mc_inputs = (mc_holdings, mc_method, mc_paths, mc_horizon, int(mc_seed))
+
+            if st.button("Run Simulation"):
+                try:
+                    with st.spinner(f"Simulating {mc_paths:,} paths..."):
+                        st.session_state.monte_carlo = {
+                            'inputs': mc_inputs,
+                            'result': simulate_portfolio(
+                                data_fetcher, dict(mc_holdings),
+                                method=mc_method, paths=mc_paths, horizon=mc_horizon, seed=int(mc_seed)
+                            )
+                        }
+                except Exception as e:
+                    st.error(f"Error running simulation: {str(e)}")
+
+            simulation = None
+            stored_simulation = st.session_state.get('monte_carlo')
+            if stored_simulation:
+                if stored_simulation['inputs'] == mc_inputs:
+                    simulation = stored_simulation['result']
+                else:
+                    del st.session_state.monte_carlo
+                    st.info("Holdings or simulation settings changed; run the simulation again for current results.")
+            if simulation:
+                fan = simulation['fan']
+                terminal = simulation['terminal']
+
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Median Outcome", f"${terminal['p50']:,.2f}",
+                              f"{(terminal['p50'] / simulation['start_value'] - 1) * 100:+.1f}%")
+                with col2:
+                    st.metric("Expected Value", f"${simulation['expected_value']:,.2f}",
+                              f"{(simulation['expected_value'] / simulation['start_value'] - 1) * 100:+.1f}%")
+                with col3:
+                    st.metric("5th Percentile", f"${terminal['p5']:,.2f}",
+                              f"{(terminal['p5'] / simulation['start_value'] - 1) * 100:+.1f}%")
+                with col4:
+                    st.metric("Probability of Loss", f"{simulation['probability_of_loss']:.1f}%")
+
+                mc_fig = go.Figure()
+                for lower, upper, label, opacity in (('p5', 'p95', '5th-95th Percentile', 0.2),
+                                                     ('p25', 'p75', '25th-75th Percentile', 0.35)):
+                    mc_fig.add_trace(go.Scatter(x=fan.index, y=fan[upper], mode='lines', line=dict(width=0),
+                                                showlegend=False, hoverinfo='skip'))
+                    mc_fig.add_trace(go.Scatter(x=fan.index, y=fan[lower], mode='lines', line=dict(width=0),
+                                                fill='tonexty', fillcolor=f'rgba(31, 119, 180, {opacity})', name=label))
+                mc_fig.add_trace(go.Scatter(x=fan.index, y=fan['p50'], mode='lines', name='Median',
+                                            line=dict(color='blue', width=2)))
+                mc_fig.add_trace(go.Scatter(x=fan.index, y=fan['mean'], mode='lines', name='Mean',
+                                            line=dict(color='gray', width=1, dash='dash')))
+                mc_fig.update_layout(
+                    title=f"Simulated Portfolio Value ({simulation['paths']:,} paths, "
+                          f"{SIMULATION_METHODS[simulation['method']]})",
+                    xaxis_title="Date",
+                    yaxis_title="Portfolio Value ($)",
+                    height=450,
+                    hovermode='x unified'
+                )
+                st.plotly_chart(mc_fig, use_container_width=True)
+                st.caption(f"Model fitted on {simulation['history_days']} daily returns of the current holdings")
+
+            # Optimal weights and rebalancing trades
+            st.subheader("Portfolio Optimization")
+
+            try:
+                # Same session holdings as the risk and simulation sections above
+                optimization, optimization_shares = optimize_holdings(data_fetcher, portfolio_data['holdings'])
+            except Exception as e:
+                optimization, optimization_shares = None, {}
+                st.error(f"Error optimizing portfolio: {str(e)}")
+
+            if optimization:
+                col1, col2 = st.columns([3, 2])
+
+                with col1:
+                    frontier = optimization['frontier']
+                    frontier_fig = go.Figure()
+                    frontier_fig.add_trace(go.Scatter(
+                        x=frontier['volatility'], y=frontier['expected_return'], mode='lines',
+                        name='Efficient Frontier', line=dict(color='blue', width=2)
+                    ))
+                    frontier_fig.add_trace(go.Scatter(
+                        x=optimization['assets']['volatility'], y=optimization['assets']['expected_return'],
+                        mode='markers+text', text=optimization['assets']['symbol'], textposition='top center',
+                        name='Holdings', marker=dict(color='gray', size=8)
+                    ))
+                    for _, row in optimization['statistics'].iterrows():
+                        frontier_fig.add_trace(go.Scatter(
+                            x=[row['volatility']], y=[row['expected_return']], mode='markers',
+                            name=OPTIMIZATION_TARGETS.get(row['portfolio'], 'Current'),
+                            marker=dict(size=12, symbol='diamond' if row['portfolio'] == 'current' else 'circle')
+                        ))
+                    frontier_fig.update_layout(
+                        title="Efficient Frontier",
+                        xaxis_title="Volatility (%)",
+                        yaxis_title="Expected Return (%)",
+                        height=450
+                    )
+                    st.plotly_chart(frontier_fig, use_container_width=True)
+
+                with col2:
+                    statistics_display = optimization['statistics'].copy()
+                    statistics_display['portfolio'] = statistics_display['portfolio'].map(
+                        lambda name: OPTIMIZATION_TARGETS.get(name, 'Current')
+                    )
+                    st.dataframe(
+                        statistics_display.rename(columns={
+                            'portfolio': 'Portfolio',
+                            'expected_return': 'Expected Return (%)',
+                            'volatility': 'Volatility (%)',
+                            'sharpe': 'Sharpe'
+                        }).round(2),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                    st.caption(f"Long-only, fully invested. Sharpe uses a {RISK_FREE_RATE:.0%} risk-free rate.")
+
+                rebalance_target = st.selectbox(
+                    "Rebalance Toward", list(OPTIMIZATION_TARGETS), format_func=OPTIMIZATION_TARGETS.get
+                )
+                trades = rebalance_trades(optimization, optimization_shares, rebalance_target)
+                st.dataframe(
+                    trades.rename(columns={
+                        'symbol': 'Symbol',
+                        'current_weight': 'Current Weight (%)',
+                        'target_weight': 'Target Weight (%)',
+                        'price': 'Price',
+                        'current_shares': 'Current Shares',
+                        'target_shares': 'Target Shares',
+                        'trade_shares': 'Shares to Trade',
+                        'trade_value': 'Trade Value ($)',
+                        'action': 'Action'
+                    }).round(4),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            else:
+                st.info("Hold at least two stocks with price history to optimize the portfolio")
+
             # Manage individual holdings
             st.subheader("Manage Holdings")
 
@@ -4,6 +4,9 @@ import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
 from utils.data_fetcher import DataFetcher
+from utils.chart_downsampling import aggregate_ohlc, downsample_series
+from utils.correlation_analysis import analyze_symbols
+from utils.portfolio_manager import PortfolioManager
 
 st.set_page_config(page_title="Watchlist", page_icon="👁️", layout="wide")
 
@@ -166,11 +169,11 @@ if st.session_state.watchlist:
                 if not data.empty:
                     # Calculate percentage change from first day
                     first_price = data['Close'].iloc[0]
-                    pct_change = ((data['Close'] - first_price) / first_price) * 100
+                    pct_change = downsample_series(((data['Close'] - first_price) / first_price) * 100)
                     
                     fig.add_trace(
                         go.Scatter(
-                            x=data.index,
+                            x=pct_change.index,
                             y=pct_change,
                             mode='lines',
                             name=symbol,
@@ -190,6 +193,116 @@ if st.session_state.watchlist:
         
         st.plotly_chart(fig, use_container_width=True)
 
+# Correlation analysis over any number of symbols
+if 'portfolio_manager' not in st.session_state:
+    st.session_state.portfolio_manager = PortfolioManager()
+
+# Session holdings, so sold or removed positions drop out like on the Portfolio page
+portfolio_symbols = [
+    symbol for symbol, holding in st.session_state.portfolio_manager.get_portfolio().items() if holding['shares'] > 0
+]
+
+if st.session_state.watchlist or portfolio_symbols:
+    st.subheader("Correlation Analysis")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        correlation_source = st.selectbox(
+            "Symbols",
+            ["Watchlist + Portfolio", "Watchlist", "Portfolio", "Custom"]
+        )
+
+    with col2:
+        correlation_period = st.selectbox("History", ["3mo", "6mo", "1y", "2y"], index=2, key="correlation_period")
+
+    with col3:
+        correlation_window = st.selectbox(
+            "Rolling Window",
+            [21, 63, 126],
+            index=1,
+            format_func=lambda days: f"{days} days"
+        )
+
+    if correlation_source == "Watchlist":
+        correlation_symbols = list(st.session_state.watchlist)
+    elif correlation_source == "Portfolio":
+        correlation_symbols = portfolio_symbols
+    elif correlation_source == "Custom":
+        custom_input = st.text_area(
+            "Symbols (comma separated)",
+            value=", ".join(dict.fromkeys(list(st.session_state.watchlist) + portfolio_symbols))
+        )
+        correlation_symbols = [s.strip().upper() for s in custom_input.split(",") if s.strip()]
+    else:
+        correlation_symbols = list(dict.fromkeys(list(st.session_state.watchlist) + portfolio_symbols))
+
+    try:
+        with st.spinner(f"Analyzing {len(correlation_symbols)} symbols..."):
+            analysis = analyze_symbols(correlation_symbols, correlation_period, correlation_window)
+    except Exception as e:
+        analysis = None
+        st.error(f"Error calculating correlations: {str(e)}")
+
+    if analysis:
+        if analysis['missing']:
+            st.warning(f"Not enough price history for: {', '.join(analysis['missing'])}")
+
+        matrix_view = st.radio(
+            "Matrix",
+            ["Full Period", f"Last {analysis['window']} Days"],
+            horizontal=True
+        )
+        matrix = analysis['correlation'] if matrix_view == "Full Period" else analysis['recent']
+
+        heatmap = px.imshow(
+            matrix.round(2),
+            text_auto=len(matrix) <= 20,
+            color_continuous_scale='RdBu_r',
+            zmin=-1,
+            zmax=1,
+            title=f"Correlation of Daily Returns ({len(matrix)} symbols, clustered)"
+        )
+        heatmap.update_layout(height=max(500, min(1200, 18 * len(matrix))))
+        st.plotly_chart(heatmap, use_container_width=True)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            rolling_fig = go.Figure()
+            rolling_fig.add_trace(go.Scatter(
+                x=analysis['rolling'].index,
+                y=analysis['rolling'],
+                mode='lines',
+                name='Average Correlation',
+                line=dict(color='purple', width=2)
+            ))
+            rolling_fig.update_layout(
+                title=f"Average Pairwise Correlation ({analysis['window']}-day rolling)",
+                xaxis_title="Date",
+                yaxis_title="Correlation",
+                height=400
+            )
+            st.plotly_chart(rolling_fig, use_container_width=True)
+
+        with col2:
+            st.write("**Most and Least Correlated Pairs**")
+            pairs = analysis['pairs']
+            pair_display = pd.concat([pairs.head(10), pairs.tail(10)]).drop_duplicates()
+            st.dataframe(
+                pair_display.rename(columns={
+                    'symbol_a': 'Symbol A',
+                    'symbol_b': 'Symbol B',
+                    'correlation': 'Correlation',
+                    'recent_correlation': f"Last {analysis['window']} Days",
+                    'change': 'Change'
+                }).round(3),
+                use_container_width=True,
+                hide_index=True
+            )
+
+        st.caption(f"Based on {analysis['observations']} daily returns; symbols are ordered by hierarchical clustering")
+
 # Individual stock chart
 if 'selected_chart_symbol' in st.session_state:
     symbol = st.session_state.selected_chart_symbol
@@ -205,12 +318,13 @@ if 'selected_chart_symbol' in st.session_state:
     try:
         data = data_fetcher.get_stock_data(symbol, chart_period)
         if not data.empty:
+            candles = aggregate_ohlc(data)
             fig = go.Figure(data=go.Candlestick(
-                x=data.index,
-                open=data['Open'],
-                high=data['High'],
-                low=data['Low'],
-                close=data['Close'],
+                x=candles.index,
+                open=candles['Open'],
+                high=candles['High'],
+                low=candles['Low'],
+                close=candles['Close'],
                 name=symbol
             ))
             
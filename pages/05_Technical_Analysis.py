@@ -1,10 +1,19 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 from utils.data_fetcher import DataFetcher
-from utils.technical_analysis import TechnicalAnalysis
+from utils.technical_analysis import TechnicalAnalysis, CANDLESTICK_PATTERNS
+from utils.market_snapshot import download_history
+from utils.backtesting import (
+    SIGNAL_RULES, RULE_LABELS, COMBINE_MODES, DEFAULT_SWEEP_GRIDS,
+    run_backtest, run_sweep, summarize_sweep
+)
+from utils.parameter_optimizer import ParameterOptimizer, SEARCH_SPACES, SEARCH_METHODS
+from utils.chart_downsampling import aggregate_ohlc, downsample_series, downsample_frame, slice_range
+from utils.chart_builder import (
+    build_figure, cached_figure, cached_indicators, candlestick_trace, data_version, histogram_trace, line_trace,
+    volume_trace
+)
 
 st.set_page_config(page_title="Technical Analysis", page_icon="📊", layout="wide")
 
@@ -15,8 +24,12 @@ if 'data_fetcher' not in st.session_state:
 if 'technical_analysis' not in st.session_state:
     st.session_state.technical_analysis = TechnicalAnalysis()
 
+if 'parameter_optimizer' not in st.session_state:
+    st.session_state.parameter_optimizer = ParameterOptimizer()
+
 data_fetcher = st.session_state.data_fetcher
 ta = st.session_state.technical_analysis
+optimizer = st.session_state.parameter_optimizer
 
 st.title("📊 Technical Analysis")
 
@@ -111,312 +124,179 @@ if symbol and (analyze_button or 'current_analysis_symbol' in st.session_state):
                 with indicator_cols[3]:
                     show_support_resistance = st.checkbox("Support/Resistance", value=True)
                     show_pivot = st.checkbox("Pivot Points", value=False)
+                    show_patterns = st.checkbox("Candlestick Patterns", value=False)
+                
+                # Every indicator on this page comes from one fused pass over the bars
+                indicator_spec = {
+                    'sma': [{'window': 20}, {'window': 50}],
+                    'ema': {'window': 12},
+                    'rsi': None,
+                    'macd': None,
+                    'atr': None
+                }
+                if show_bb:
+                    indicator_spec['bollinger'] = None
+                if show_stoch:
+                    indicator_spec['stochastic'] = None
+                # Reruns on the same bars (zooming, toggling panes) reuse the computed frames
+                indicators, pattern_flags = cached_indicators(
+                    symbol, period, repr(indicator_spec), data_version(stock_data),
+                    lambda: (ta.compute_indicators(stock_data, indicator_spec), ta.detect_candlestick_patterns(stock_data))
+                )
                 
                 # Main chart with candlesticks
                 st.subheader("Price Chart with Technical Indicators")
                 
-                # Determine number of subplots
-                subplot_count = 1  # Main price chart
-                if show_volume:
-                    subplot_count += 1
-                if show_rsi:
-                    subplot_count += 1
-                if show_macd:
-                    subplot_count += 1
-                if show_stoch:
-                    subplot_count += 1
-                
-                # Create subplot heights
-                heights = [0.5]  # Main chart gets 50%
-                remaining = 0.5
-                if subplot_count > 1:
-                    subplot_height = remaining / (subplot_count - 1)
-                    heights.extend([subplot_height] * (subplot_count - 1))
-                
-                # Create subplots
-                subplot_titles = [f'{symbol} Price Chart']
-                if show_volume:
-                    subplot_titles.append('Volume')
-                if show_rsi:
-                    subplot_titles.append('RSI')
-                if show_macd:
-                    subplot_titles.append('MACD')
-                if show_stoch:
-                    subplot_titles.append('Stochastic')
-                
-                fig = make_subplots(
-                    rows=subplot_count,
-                    cols=1,
-                    shared_xaxes=True,
-                    vertical_spacing=0.02,
-                    subplot_titles=subplot_titles,
-                    row_heights=heights
-                )
+                # Zooming slices the full-resolution bars; indicators keep their full-history warm-up
+                first_day = stock_data.index[0].date()
+                last_day = stock_data.index[-1].date()
+                zoom_start, zoom_end = first_day, last_day
+                if first_day < last_day:
+                    zoom_start, zoom_end = st.slider(
+                        "Zoom",
+                        min_value=first_day,
+                        max_value=last_day,
+                        value=(first_day, last_day),
+                        format="YYYY-MM-DD"
+                    )
                 
-                # Main candlestick chart
-                fig.add_trace(
-                    go.Candlestick(
-                        x=stock_data.index,
-                        open=stock_data['Open'],
-                        high=stock_data['High'],
-                        low=stock_data['Low'],
-                        close=stock_data['Close'],
-                        name=symbol,
-                        showlegend=False
-                    ),
-                    row=1, col=1
-                )
+                def zoomed(values):
+                    return slice_range(values, zoom_start, zoom_end)
                 
-                # Moving Averages
-                if show_ma:
-                    sma_20 = ta.calculate_sma(stock_data['Close'], 20)
-                    sma_50 = ta.calculate_sma(stock_data['Close'], 50)
-                    ema_12 = ta.calculate_ema(stock_data['Close'], 12)
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=sma_20,
-                            mode='lines',
-                            name='SMA 20',
-                            line=dict(color='orange', width=1)
-                        ),
-                        row=1, col=1
-                    )
+                def build_chart():
+                    candles = aggregate_ohlc(zoomed(stock_data))
                     
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=sma_50,
-                            mode='lines',
-                            name='SMA 50',
-                            line=dict(color='blue', width=1)
-                        ),
-                        row=1, col=1
-                    )
+                    # Main candlestick chart
+                    price_traces = [candlestick_trace(candles, symbol, showlegend=False)]
+                    price_lines = []
                     
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=ema_12,
-                            mode='lines',
-                            name='EMA 12',
-                            line=dict(color='green', width=1)
-                        ),
-                        row=1, col=1
-                    )
-                
-                # Bollinger Bands
-                if show_bb:
-                    bb = ta.calculate_bollinger_bands(stock_data['Close'])
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=bb['upper'],
-                            mode='lines',
-                            name='BB Upper',
-                            line=dict(color='red', dash='dash', width=1),
-                            showlegend=False
-                        ),
-                        row=1, col=1
-                    )
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=bb['lower'],
-                            mode='lines',
-                            name='BB Lower',
-                            line=dict(color='red', dash='dash', width=1),
-                            fill='tonexty',
-                            fillcolor='rgba(255,0,0,0.1)',
-                            showlegend=False
-                        ),
-                        row=1, col=1
-                    )
-                
-                # Support and Resistance
-                if show_support_resistance:
-                    levels = ta.get_support_resistance_levels(stock_data)
-                    for level in levels['resistance'][:3]:  # Top 3 resistance levels
-                        fig.add_hline(
-                            y=level,
-                            line_dash="dash",
-                            line_color="red",
-                            opacity=0.5,
-                            row=1, col=1
-                        )
-                    for level in levels['support'][:3]:  # Top 3 support levels
-                        fig.add_hline(
-                            y=level,
-                            line_dash="dash",
-                            line_color="green",
-                            opacity=0.5,
-                            row=1, col=1
-                        )
-                
-                # Pivot Points
-                if show_pivot:
-                    pivot_data = ta.calculate_pivot_points(stock_data)
-                    if pivot_data:
-                        colors = ['purple', 'red', 'red', 'red', 'green', 'green', 'green']
-                        levels = [pivot_data['pivot'], pivot_data['r1'], pivot_data['r2'], pivot_data['r3'],
-                                 pivot_data['s1'], pivot_data['s2'], pivot_data['s3']]
-                        names = ['Pivot', 'R1', 'R2', 'R3', 'S1', 'S2', 'S3']
-                        
-                        for level, color, name in zip(levels, colors, names):
-                            fig.add_hline(
-                                y=level,
-                                line_dash="dot",
-                                line_color=color,
-                                opacity=0.6,
-                                annotation_text=name,
-                                row=1, col=1
-                            )
-                
-                current_row = 2
-                
-                # Volume
-                if show_volume:
-                    colors = ['red' if close < open else 'green' 
-                             for close, open in zip(stock_data['Close'], stock_data['Open'])]
-                    
-                    fig.add_trace(
-                        go.Bar(
-                            x=stock_data.index,
-                            y=stock_data['Volume'],
-                            name='Volume',
-                            marker_color=colors,
-                            opacity=0.7,
-                            showlegend=False
-                        ),
-                        row=current_row, col=1
-                    )
+                    # Moving Averages
+                    if show_ma:
+                        price_traces += [
+                            line_trace(downsample_series(zoomed(indicators['sma_20'])), 'SMA 20', color='orange', width=1),
+                            line_trace(downsample_series(zoomed(indicators['sma_50'])), 'SMA 50', color='blue', width=1),
+                            line_trace(downsample_series(zoomed(indicators['ema_12'])), 'EMA 12', color='green', width=1)
+                        ]
                     
-                    # Volume SMA
-                    volume_sma = stock_data['Volume'].rolling(20).mean()
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=volume_sma,
-                            mode='lines',
-                            name='Volume SMA',
-                            line=dict(color='blue', width=1),
-                            showlegend=False
-                        ),
-                        row=current_row, col=1
-                    )
-                    current_row += 1
-                
-                # RSI
-                if show_rsi:
-                    rsi = ta.calculate_rsi(stock_data['Close'])
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=rsi,
-                            mode='lines',
-                            name='RSI',
-                            line=dict(color='purple', width=2),
-                            showlegend=False
-                        ),
-                        row=current_row, col=1
-                    )
+                    # Bollinger Bands
+                    if show_bb:
+                        bb = downsample_frame(zoomed(indicators[['bb_upper_20_2', 'bb_middle_20_2', 'bb_lower_20_2']]), by='bb_middle_20_2')
+                        price_traces += [
+                            line_trace(bb['bb_upper_20_2'], 'BB Upper', color='red', dash='dash', width=1, showlegend=False),
+                            line_trace(bb['bb_lower_20_2'], 'BB Lower', color='red', dash='dash', width=1, showlegend=False,
+                                       fill='tonexty', fillcolor='rgba(255,0,0,0.1)')
+                        ]
                     
-                    # RSI levels
-                    fig.add_hline(y=70, line_dash="dash", line_color="red", opacity=0.5, row=current_row, col=1)
-                    fig.add_hline(y=30, line_dash="dash", line_color="green", opacity=0.5, row=current_row, col=1)
-                    fig.add_hline(y=50, line_dash="dot", line_color="gray", opacity=0.3, row=current_row, col=1)
-                    current_row += 1
-                
-                # MACD
-                if show_macd:
-                    macd_data = ta.calculate_macd(stock_data['Close'])
-                    
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=macd_data['macd'],
-                            mode='lines',
-                            name='MACD',
-                            line=dict(color='blue', width=2),
-                            showlegend=False
-                        ),
-                        row=current_row, col=1
-                    )
+                    # Support and Resistance
+                    if show_support_resistance:
+                        levels = ta.get_support_resistance_levels(stock_data)
+                        price_lines += [{'y': level, 'color': 'red', 'opacity': 0.5} for level in levels['resistance'][:3]]
+                        price_lines += [{'y': level, 'color': 'green', 'opacity': 0.5} for level in levels['support'][:3]]
                     
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=macd_data['signal'],
-                            mode='lines',
-                            name='Signal',
-                            line=dict(color='red', width=2),
-                            showlegend=False
-                        ),
-                        row=current_row, col=1
-                    )
+                    # Pivot Points
+                    if show_pivot:
+                        pivot_data = ta.calculate_pivot_points(stock_data)
+                        if pivot_data:
+                            pivot_colors = {'pivot': 'purple', 'r1': 'red', 'r2': 'red', 'r3': 'red',
+                                            's1': 'green', 's2': 'green', 's3': 'green'}
+                            price_lines += [
+                                {'y': pivot_data[key], 'color': color, 'dash': 'dot', 'opacity': 0.6,
+                                 'text': 'Pivot' if key == 'pivot' else key.upper()}
+                                for key, color in pivot_colors.items()
+                            ]
                     
-                    # MACD histogram
-                    colors = ['green' if val >= 0 else 'red' for val in macd_data['histogram']]
-                    fig.add_trace(
-                        go.Bar(
-                            x=stock_data.index,
-                            y=macd_data['histogram'],
-                            name='MACD Histogram',
-                            marker_color=colors,
-                            opacity=0.6,
-                            showlegend=False
-                        ),
-                        row=current_row, col=1
-                    )
-                    current_row += 1
-                
-                # Stochastic
-                if show_stoch:
-                    stoch_data = ta.calculate_stochastic(
-                        stock_data['High'], stock_data['Low'], stock_data['Close']
-                    )
+                    # Candlestick pattern markers, placed below/above the bar that completes them
+                    if show_patterns:
+                        zoomed_flags = zoomed(pattern_flags)
+                        for signal, color, marker, price_col, offset in (
+                            ('bullish', 'green', 'triangle-up', 'Low', 0.99),
+                            ('bearish', 'red', 'triangle-down', 'High', 1.01)
+                        ):
+                            names = [name for name, (_, kind) in CANDLESTICK_PATTERNS.items() if kind == signal]
+                            hits = zoomed_flags.loc[zoomed_flags[names].any(axis=1), names]
+                            if hits.empty:
+                                continue
+                            labels = pd.Series([CANDLESTICK_PATTERNS[name][0] + ', ' for name in names], index=names)
+                            price_traces.append(line_trace(
+                                stock_data.loc[hits.index, price_col] * offset,
+                                f'{signal.title()} Patterns',
+                                mode='markers',
+                                marker={'symbol': marker, 'size': 10, 'color': color},
+                                text=hits.dot(labels).str.rstrip(', ').to_numpy(),
+                                hoverinfo='x+text'
+                            ))
                     
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=stoch_data['k'],
-                            mode='lines',
-                            name='%K',
-                            line=dict(color='blue', width=2),
-                            showlegend=False
-                        ),
-                        row=current_row, col=1
-                    )
+                    rows = [{'title': f'{symbol} Price Chart', 'traces': price_traces, 'hlines': price_lines}]
                     
-                    fig.add_trace(
-                        go.Scatter(
-                            x=stock_data.index,
-                            y=stoch_data['d'],
-                            mode='lines',
-                            name='%D',
-                            line=dict(color='red', width=2),
-                            showlegend=False
-                        ),
-                        row=current_row, col=1
-                    )
+                    # Volume
+                    if show_volume:
+                        # Summed over each merged candle so it stays on the bars' scale
+                        volume_sma = candles['Volume'].rolling(20).mean()
+                        rows.append({'title': 'Volume', 'traces': [
+                            volume_trace(candles, opacity=0.7, showlegend=False),
+                            line_trace(volume_sma, 'Volume SMA', color='blue', width=1, showlegend=False)
+                        ]})
                     
-                    # Stochastic levels
-                    fig.add_hline(y=80, line_dash="dash", line_color="red", opacity=0.5, row=current_row, col=1)
-                    fig.add_hline(y=20, line_dash="dash", line_color="green", opacity=0.5, row=current_row, col=1)
-                
-                # Update layout
-                fig.update_layout(
-                    height=150 * subplot_count + 200,
-                    xaxis_rangeslider_visible=False,
-                    showlegend=True,
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    )
+                    # RSI
+                    if show_rsi:
+                        rsi = downsample_series(zoomed(indicators['rsi_14']))
+                        rows.append({
+                            'title': 'RSI',
+                            'traces': [line_trace(rsi, 'RSI', color='purple', width=2, showlegend=False)],
+                            'hlines': [
+                                {'y': 70, 'color': 'red', 'opacity': 0.5},
+                                {'y': 30, 'color': 'green', 'opacity': 0.5},
+                                {'y': 50, 'color': 'gray', 'dash': 'dot', 'opacity': 0.3}
+                            ]
+                        })
+                    
+                    # MACD
+                    if show_macd:
+                        macd_data = indicators[['macd_12_26_9', 'macd_signal_12_26_9', 'macd_histogram_12_26_9']]
+                        macd_data = downsample_frame(zoomed(macd_data), by='macd_histogram_12_26_9')
+                        rows.append({'title': 'MACD', 'traces': [
+                            line_trace(macd_data['macd_12_26_9'], 'MACD', color='blue', width=2, showlegend=False),
+                            line_trace(macd_data['macd_signal_12_26_9'], 'Signal', color='red', width=2, showlegend=False),
+                            histogram_trace(macd_data['macd_histogram_12_26_9'], 'MACD Histogram', opacity=0.6, showlegend=False)
+                        ]})
+                    
+                    # Stochastic
+                    if show_stoch:
+                        stoch_data = downsample_frame(zoomed(indicators[['stoch_k_14_3', 'stoch_d_14_3']]), by='stoch_k_14_3')
+                        rows.append({
+                            'title': 'Stochastic',
+                            'traces': [
+                                line_trace(stoch_data['stoch_k_14_3'], '%K', color='blue', width=2, showlegend=False),
+                                line_trace(stoch_data['stoch_d_14_3'], '%D', color='red', width=2, showlegend=False)
+                            ],
+                            'hlines': [
+                                {'y': 80, 'color': 'red', 'opacity': 0.5},
+                                {'y': 20, 'color': 'green', 'opacity': 0.5}
+                            ]
+                        })
+                    
+                    # Main chart gets 50%, the indicator panes share the rest
+                    rows[0]['height'] = 0.5 if len(rows) > 1 else 1.0
+                    for row in rows[1:]:
+                        row['height'] = 0.5 / (len(rows) - 1)
+                    
+                    return build_figure({
+                        'height': 150 * len(rows) + 200,
+                        'vertical_spacing': 0.02,
+                        'rows': rows,
+                        'layout': {
+                            'showlegend': True,
+                            'legend': {'orientation': 'h', 'yanchor': 'bottom', 'y': 1.02, 'xanchor': 'right', 'x': 1}
+                        }
+                    })
+                
+                chart_options_key = (
+                    show_ma, show_bb, show_rsi, show_macd, show_stoch, show_volume,
+                    show_support_resistance, show_pivot, show_patterns, str(zoom_start), str(zoom_end)
+                )
+                fig = cached_figure(
+                    "technical_analysis", symbol, period, chart_options_key,
+                    data_version(stock_data), build_chart
                 )
                 
                 st.plotly_chart(fig, use_container_width=True)
@@ -430,8 +310,8 @@ if symbol and (analyze_button or 'current_analysis_symbol' in st.session_state):
                     st.write("**Trend Analysis**")
                     
                     # Moving average trend
-                    sma_20 = ta.calculate_sma(stock_data['Close'], 20)
-                    sma_50 = ta.calculate_sma(stock_data['Close'], 50)
+                    sma_20 = indicators['sma_20']
+                    sma_50 = indicators['sma_50']
                     
                     current_price = stock_data['Close'].iloc[-1]
                     sma_20_current = sma_20.iloc[-1] if not pd.isna(sma_20.iloc[-1]) else 0
@@ -452,7 +332,7 @@ if symbol and (analyze_button or 'current_analysis_symbol' in st.session_state):
                     st.write("**Momentum Indicators**")
                     
                     # RSI analysis
-                    rsi = ta.calculate_rsi(stock_data['Close'])
+                    rsi = indicators['rsi_14']
                     current_rsi = rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else 50
                     
                     if current_rsi > 70:
@@ -465,9 +345,10 @@ if symbol and (analyze_button or 'current_analysis_symbol' in st.session_state):
                     st.write(f"**RSI (14):** {current_rsi:.1f} - {rsi_signal}")
                     
                     # MACD analysis
-                    macd_data = ta.calculate_macd(stock_data['Close'])
-                    macd_current = macd_data['macd'].iloc[-1]
-                    signal_current = macd_data['signal'].iloc[-1]
+                    macd_line = indicators['macd_12_26_9']
+                    signal_line = indicators['macd_signal_12_26_9']
+                    macd_current = macd_line.iloc[-1]
+                    signal_current = signal_line.iloc[-1]
                     
                     if macd_current > signal_current:
                         macd_signal = "🟢 Bullish"
@@ -489,46 +370,50 @@ if symbol and (analyze_button or 'current_analysis_symbol' in st.session_state):
                         st.write(f"**Support:** ${levels['support'][0]:.2f}")
                     
                     # Volatility (ATR)
-                    atr = ta.calculate_atr(stock_data['High'], stock_data['Low'], stock_data['Close'])
+                    atr = indicators['atr_14']
                     current_atr = atr.iloc[-1] if not pd.isna(atr.iloc[-1]) else 0
                     atr_pct = (current_atr / current_price) * 100
                     
                     st.write(f"**ATR:** ${current_atr:.2f} ({atr_pct:.1f}%)")
                 
-                # Pattern Recognition (Basic)
+                # Pattern Recognition
                 st.subheader("Pattern Analysis")
                 
-                patterns = []
-                
-                # Simple pattern detection
-                recent_data = stock_data.tail(20)
-                
-                # Doji pattern (open ≈ close)
-                latest = recent_data.iloc[-1]
-                body_size = abs(latest['Close'] - latest['Open'])
-                range_size = latest['High'] - latest['Low']
+                signal_icons = {'bullish': '🟢', 'bearish': '🔴', 'neutral': '🟡'}
+                latest_patterns = [name for name in pattern_flags.columns if pattern_flags[name].iloc[-1]]
                 
-                if body_size < (range_size * 0.1):
-                    patterns.append("🟡 Doji - Indecision")
-                
-                # Hammer pattern
-                if (latest['Close'] > latest['Open'] and 
-                    (latest['Close'] - latest['Open']) < (latest['High'] - latest['Low']) * 0.3 and
-                    (latest['Open'] - latest['Low']) > (latest['High'] - latest['Low']) * 0.6):
-                    patterns.append("🟢 Hammer - Bullish Reversal")
-                
-                # Shooting star pattern  
-                if (latest['Open'] > latest['Close'] and 
-                    (latest['Open'] - latest['Close']) < (latest['High'] - latest['Low']) * 0.3 and
-                    (latest['High'] - latest['Open']) > (latest['High'] - latest['Low']) * 0.6):
-                    patterns.append("🔴 Shooting Star - Bearish Reversal")
-                
-                if patterns:
-                    for pattern in patterns:
-                        st.write(pattern)
+                if latest_patterns:
+                    for name in latest_patterns:
+                        label, signal = CANDLESTICK_PATTERNS[name]
+                        st.write(f"{signal_icons[signal]} {label} - {signal.title()}")
                 else:
                     st.write("No significant patterns detected")
                 
+                recent_hits = [
+                    {'Date': date, 'Pattern': CANDLESTICK_PATTERNS[name][0], 'Signal': CANDLESTICK_PATTERNS[name][1].title()}
+                    for name, dates in ta.flags_to_hits(pattern_flags, lookback=20).items()
+                    for date in dates
+                ]
+                if recent_hits:
+                    with st.expander(f"Patterns in the last 20 bars ({len(recent_hits)})"):
+                        recent_df = pd.DataFrame(recent_hits).sort_values('Date', ascending=False)
+                        recent_df['Date'] = recent_df['Date'].dt.strftime('%Y-%m-%d')
+                        st.dataframe(recent_df, use_container_width=True, hide_index=True)
+                
+                pattern_counts = pattern_flags.sum()
+                pattern_counts = pattern_counts[pattern_counts > 0]
+                if not pattern_counts.empty:
+                    with st.expander("Pattern frequency over the selected period"):
+                        st.dataframe(
+                            pd.DataFrame({
+                                'Pattern': [CANDLESTICK_PATTERNS[name][0] for name in pattern_counts.index],
+                                'Signal': [CANDLESTICK_PATTERNS[name][1].title() for name in pattern_counts.index],
+                                'Occurrences': pattern_counts.to_numpy()
+                            }).sort_values('Occurrences', ascending=False),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                
                 # Trading signals summary
                 st.subheader("Trading Signals Summary")
                 
@@ -547,9 +432,9 @@ if symbol and (analyze_button or 'current_analysis_symbol' in st.session_state):
                     signals.append("🔴 SELL - RSI overbought")
                 
                 # MACD signals
-                if macd_current > signal_current and macd_data['macd'].iloc[-2] <= macd_data['signal'].iloc[-2]:
+                if macd_current > signal_current and macd_line.iloc[-2] <= signal_line.iloc[-2]:
                     signals.append("🟢 BUY - MACD bullish crossover")
-                elif macd_current < signal_current and macd_data['macd'].iloc[-2] >= macd_data['signal'].iloc[-2]:
+                elif macd_current < signal_current and macd_line.iloc[-2] >= signal_line.iloc[-2]:
                     signals.append("🔴 SELL - MACD bearish crossover")
                 
                 if signals:
@@ -563,6 +448,196 @@ if symbol and (analyze_button or 'current_analysis_symbol' in st.session_state):
                 else:
                     st.info("🟡 HOLD - No clear trading signals")
                 
+                # Backtest the signal rules over the whole history
+                st.subheader("Strategy Backtest")
+                
+                backtest_cols = st.columns(4)
+                with backtest_cols[0]:
+                    backtest_rules = st.multiselect(
+                        "Rules",
+                        list(SIGNAL_RULES),
+                        default=list(SIGNAL_RULES),
+                        format_func=RULE_LABELS.get
+                    )
+                with backtest_cols[1]:
+                    combine_mode = st.selectbox("Combine Rules", list(COMBINE_MODES), format_func=COMBINE_MODES.get)
+                with backtest_cols[2]:
+                    allow_short = st.checkbox("Allow Short Positions", value=False)
+                with backtest_cols[3]:
+                    cost_bps = st.number_input("Cost per Trade (bps)", min_value=0.0, max_value=100.0, value=5.0, step=1.0)
+                
+                optimized_cols = st.columns(2)
+                with optimized_cols[0]:
+                    use_optimized = st.checkbox(
+                        "Use Optimized Parameters",
+                        value=False,
+                        help="Use the best stored optimizer parameters for this symbol where available"
+                    )
+                with optimized_cols[1]:
+                    # Optimizer runs are stored per download period, not the chart period
+                    optimized_period = st.selectbox(
+                        "Optimized Over", ["1y", "2y", "5y", "10y"], index=2, disabled=not use_optimized
+                    )
+                
+                if backtest_rules:
+                    backtest_params = {rule: None for rule in backtest_rules}
+                    if use_optimized:
+                        missing_rules = []
+                        for rule in backtest_rules:
+                            best = optimizer.get_best_params(
+                                rule, symbol=symbol, period=optimized_period, allow_short=allow_short, cost_bps=cost_bps
+                            )
+                            if best:
+                                backtest_params[rule] = best['params']
+                            else:
+                                missing_rules.append(RULE_LABELS[rule])
+                        if missing_rules:
+                            st.info(
+                                f"No stored optimum for {', '.join(missing_rules)} on {symbol} "
+                                f"({optimized_period}, {'long/short' if allow_short else 'long only'}, {cost_bps:g} bps); "
+                                "using default parameters. Run the optimizer below with these settings first."
+                            )
+                        st.caption(", ".join(
+                            f"{RULE_LABELS[rule]}: {params if params else 'defaults'}"
+                            for rule, params in backtest_params.items()
+                        ))
+                    
+                    backtest = run_backtest(stock_data, backtest_params, combine_mode, allow_short, cost_bps)
+                    metrics = backtest['metrics']
+                    buy_hold_return = (backtest['benchmark'].iloc[-1] - 1) * 100
+                    
+                    metric_cols = st.columns(6)
+                    metric_cols[0].metric("Total Return", f"{metrics['total_return']:+.1f}%",
+                                          f"{metrics['total_return'] - buy_hold_return:+.1f}% vs buy & hold")
+                    metric_cols[1].metric("CAGR", f"{metrics['cagr']:+.1f}%" if not pd.isna(metrics['cagr']) else "N/A")
+                    metric_cols[2].metric("Sharpe", f"{metrics['sharpe']:.2f}" if not pd.isna(metrics['sharpe']) else "N/A")
+                    metric_cols[3].metric("Max Drawdown", f"{metrics['max_drawdown']:.1f}%")
+                    metric_cols[4].metric("Hit Rate", f"{metrics['hit_rate']:.0f}%" if metrics['trades'] else "N/A",
+                                          f"{metrics['trades']} trades", delta_color="off")
+                    metric_cols[5].metric("Turnover", f"{metrics['turnover']:.1f}x / yr",
+                                          f"{metrics['exposure']:.0f}% in market", delta_color="off")
+                    
+                    backtest_fig = build_figure({
+                        'height': 500,
+                        'rows': [
+                            {'title': 'Equity Curve', 'height': 0.7, 'traces': [
+                                line_trace(downsample_series(backtest['equity']), 'Strategy', color='blue', width=2),
+                                line_trace(downsample_series(backtest['benchmark']), 'Buy & Hold', color='gray', width=1)
+                            ]},
+                            {'title': 'Drawdown', 'height': 0.3, 'traces': [
+                                line_trace(downsample_series(backtest['drawdown'] * 100), 'Drawdown %', color='red',
+                                           width=1, fill='tozeroy', showlegend=False)
+                            ]}
+                        ],
+                        'layout': {'hovermode': 'x unified'}
+                    })
+                    st.plotly_chart(backtest_fig, use_container_width=True)
+                else:
+                    st.info("Select at least one rule to backtest")
+                
+                with st.expander("Parameter Sweep"):
+                    st.write("Evaluate a grid of rule parameters over many symbols in parallel.")
+                    
+                    sweep_cols = st.columns(3)
+                    with sweep_cols[0]:
+                        sweep_rule = st.selectbox("Rule", list(DEFAULT_SWEEP_GRIDS), format_func=RULE_LABELS.get)
+                    with sweep_cols[1]:
+                        sweep_period = st.selectbox("History", ["1y", "2y", "5y", "10y"], index=3)
+                    with sweep_cols[2]:
+                        sweep_rank = st.selectbox("Rank By", ["sharpe", "cagr", "total_return", "max_drawdown", "hit_rate"])
+                    
+                    sweep_default = [symbol] + [s for s in st.session_state.get('watchlist', []) if s != symbol]
+                    sweep_input = st.text_area("Symbols (comma separated)", value=", ".join(sweep_default), key="sweep_symbols")
+                    st.caption(", ".join(
+                        f"{name}: {values}" for name, values in DEFAULT_SWEEP_GRIDS[sweep_rule].items()
+                    ))
+                    
+                    if st.button("Run Sweep"):
+                        sweep_symbols = sorted({s.strip().upper() for s in sweep_input.split(",") if s.strip()})
+                        try:
+                            with st.spinner(f"Sweeping {len(sweep_symbols)} symbols..."):
+                                sweep_bars = {}
+                                for start in range(0, len(sweep_symbols), 200):
+                                    sweep_bars.update(download_history(sweep_symbols[start:start + 200], period=sweep_period))
+                                sweep_results = run_sweep(
+                                    sweep_bars, {sweep_rule: DEFAULT_SWEEP_GRIDS[sweep_rule]},
+                                    combine_mode, allow_short, cost_bps
+                                )
+                            st.session_state.sweep_results = sweep_results
+                        except Exception as e:
+                            st.error(f"Error running parameter sweep: {str(e)}")
+                    
+                    sweep_results = st.session_state.get('sweep_results')
+                    if sweep_results is not None and not sweep_results.empty:
+                        summary = summarize_sweep(sweep_results, sort_by=sweep_rank)
+                        st.write(f"**Median metrics across {sweep_results['symbol'].nunique()} symbols**")
+                        st.dataframe(summary.head(20).round(2), use_container_width=True, hide_index=True)
+                
+                with st.expander("Indicator Optimizer"):
+                    st.write("Search indicator parameters across cores. Results are stored and reused for unchanged data.")
+                    
+                    optimize_cols = st.columns(4)
+                    with optimize_cols[0]:
+                        optimize_rule = st.selectbox("Indicator Rule", list(SEARCH_SPACES), format_func=RULE_LABELS.get)
+                    with optimize_cols[1]:
+                        optimize_search = st.selectbox("Search", SEARCH_METHODS, format_func=str.title)
+                    with optimize_cols[2]:
+                        optimize_samples = st.number_input(
+                            "Random Samples", min_value=10, max_value=1000, value=100, step=10,
+                            disabled=optimize_search != 'random'
+                        )
+                    with optimize_cols[3]:
+                        optimize_period = st.selectbox("Optimizer History", ["1y", "2y", "5y", "10y"], index=2)
+                    
+                    optimize_rank = st.selectbox(
+                        "Optimize For", ["sharpe", "cagr", "total_return", "max_drawdown", "hit_rate"], key="optimize_rank"
+                    )
+                    optimize_input = st.text_area(
+                        "Symbols (comma separated)", value=", ".join(sweep_default), key="optimize_symbols"
+                    )
+                    st.caption(", ".join(
+                        f"{name}: {values[0]}-{values[-1]}" for name, values in SEARCH_SPACES[optimize_rule].items()
+                    ))
+                    
+                    if st.button("Run Optimizer"):
+                        optimize_symbols = sorted({s.strip().upper() for s in optimize_input.split(",") if s.strip()})
+                        try:
+                            with st.spinner(f"Downloading {len(optimize_symbols)} symbols..."):
+                                optimize_bars = {}
+                                for start in range(0, len(optimize_symbols), 200):
+                                    optimize_bars.update(download_history(optimize_symbols[start:start + 200], period=optimize_period))
+                            
+                            progress_bar = st.progress(0.0, text="Evaluating parameters...")
+                            optimize_results = optimizer.optimize(
+                                optimize_bars, optimize_rule, search=optimize_search, samples=int(optimize_samples),
+                                period=optimize_period, allow_short=allow_short, cost_bps=cost_bps,
+                                progress=lambda done, total: progress_bar.progress(done / total, text=f"{done}/{total} tasks")
+                            )
+                            progress_bar.empty()
+                            st.session_state.optimize_results = optimize_results
+                        except Exception as e:
+                            st.error(f"Error running optimizer: {str(e)}")
+                    
+                    optimize_results = st.session_state.get('optimize_results')
+                    if optimize_results is not None and not optimize_results.empty:
+                        reused = int(optimize_results['stored'].sum())
+                        st.write(
+                            f"**{len(optimize_results)} evaluations over {optimize_results['symbol'].nunique()} symbols "
+                            f"({reused} reused from earlier runs)**"
+                        )
+                        summary = summarize_sweep(optimize_results.drop(columns='stored'), sort_by=optimize_rank)
+                        st.dataframe(summary.head(20).round(2), use_container_width=True, hide_index=True)
+                    
+                    best = optimizer.get_best_params(
+                        optimize_rule, symbol=symbol, metric=optimize_rank,
+                        period=optimize_period, allow_short=allow_short, cost_bps=cost_bps
+                    )
+                    if best:
+                        st.info(
+                            f"Best stored {RULE_LABELS[optimize_rule]} parameters for {symbol}: {best['params']} "
+                            f"({optimize_rank} {best['score']:.2f})"
+                        )
+                
                 # Risk disclaimer
                 st.warning("⚠️ **Disclaimer:** This analysis is for educational purposes only and should not be considered as financial advice. Always do your own research and consider consulting with a financial advisor before making investment decisions.")
     
@@ -594,11 +669,44 @@ else:
         st.write("• Volume Analysis")
     
     st.subheader("Pattern Recognition")
-    st.write("Basic candlestick pattern detection including:")
-    st.write("• Doji patterns")
-    st.write("• Hammer patterns")
-    st.write("• Shooting star patterns")
-    st.write("• And more...")
+    st.write("Candlestick pattern detection over the full history, including:")
+    st.write("• Doji, Hammer and Shooting Star")
+    st.write("• Bullish/Bearish Engulfing and Harami")
+    st.write("• Piercing Line and Dark Cloud Cover")
+    st.write("• Morning/Evening Star")
+    st.write("• Three White Soldiers and Three Black Crows")
+
+# Pattern screener across many symbols
+st.subheader("Candlestick Pattern Screener")
+
+with st.expander("Scan symbols for recent patterns"):
+    default_symbols = st.session_state.get('watchlist') or ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'META']
+    screener_input = st.text_area("Symbols (comma separated)", value=", ".join(default_symbols))
+    screener_lookback = st.slider("Report patterns from the last N bars", 1, 20, 5)
+    
+    if st.button("Scan Patterns"):
+        screener_symbols = sorted({s.strip().upper() for s in screener_input.split(",") if s.strip()})
+        try:
+            with st.spinner(f"Scanning {len(screener_symbols)} symbols..."):
+                # One batched download, then one vectorized pass per symbol
+                screener_bars = download_history(screener_symbols, period="3mo")
+                screener_hits = ta.scan_patterns(screener_bars, lookback=screener_lookback)
+            
+            missing = [s for s in screener_symbols if s not in screener_bars]
+            if missing:
+                st.warning(f"No data for: {', '.join(missing)}")
+            
+            if screener_hits.empty:
+                st.info("No patterns found in the selected window")
+            else:
+                screener_hits['Date'] = pd.to_datetime(screener_hits['Date']).dt.strftime('%Y-%m-%d')
+                st.dataframe(
+                    screener_hits.style.format({'Close': '${:.2f}'}),
+                    use_container_width=True,
+                    hide_index=True
+                )
+        except Exception as e:
+            st.error(f"Error scanning patterns: {str(e)}")
 
 # Sidebar tools
 with st.sidebar:
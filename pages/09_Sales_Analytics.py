@@ -2,9 +2,12 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 from auth import init_auth, get_current_user, require_auth
 from database import DatabaseManager
+from utils.sales_rollups import sales_rollups
+from utils.sales_trends import get_sales_trends
 
 st.set_page_config(page_title="Sales Analytics", page_icon="📈", layout="wide")
 
@@ -16,10 +19,81 @@ st.markdown(f'<style>{css}</style>', unsafe_allow_html=True)
 # Initialize authentication
 init_auth()
 
+# Sort options for the customer table (column -> label)
+CUSTOMER_SORT_COLUMNS = {
+    'lifetime_spend': 'Lifetime Spend',
+    'order_count': 'Order Count',
+    'last_purchase': 'Last Purchase',
+    'rfm_score': 'RFM Score',
+    'name': 'Name',
+    'created_at': 'Date Added'
+}
+
+# Per-customer spend with RFM quintiles (5 = best) and a segment, in one pass
+# over customers and their indexed sales. Quintiles are ranked among buyers
+# only; customers without completed sales get no scores. Scores come from
+# CUME_DIST, so tied values (same order count, same purchase day) always
+# share a score instead of being split across buckets by row order.
+CUSTOMER_RFM_QUERY = """
+    WITH spend AS (
+        SELECT
+            c.id,
+            c.customer_code,
+            c.name,
+            c.email,
+            c.phone,
+            c.created_at,
+            COUNT(st.id) AS order_count,
+            COALESCE(SUM(st.total_amount), 0) AS lifetime_spend,
+            MAX(st.sale_date) AS last_purchase
+        FROM customers c
+        LEFT JOIN sales_transactions st ON st.customer_id = c.id AND st.status = 'completed'
+        GROUP BY c.id
+    ),
+    scored AS (
+        SELECT
+            spend.*,
+            CAST(CUME_DIST() OVER (PARTITION BY order_count > 0 ORDER BY DATE(last_purchase)) * 5 - 1e-9 AS INTEGER) + 1
+                AS recency,
+            CAST(CUME_DIST() OVER (PARTITION BY order_count > 0 ORDER BY order_count) * 5 - 1e-9 AS INTEGER) + 1
+                AS frequency,
+            CAST(CUME_DIST() OVER (PARTITION BY order_count > 0 ORDER BY lifetime_spend) * 5 - 1e-9 AS INTEGER) + 1
+                AS monetary
+        FROM spend
+    )
+    SELECT
+        id,
+        customer_code,
+        name,
+        email,
+        phone,
+        created_at,
+        order_count,
+        lifetime_spend,
+        CASE WHEN order_count > 0 THEN lifetime_spend / order_count ELSE 0 END AS avg_order_value,
+        last_purchase,
+        CAST(julianday('now') - julianday(last_purchase) AS INTEGER) AS days_since_purchase,
+        CASE WHEN order_count > 0 THEN recency END AS recency_score,
+        CASE WHEN order_count > 0 THEN frequency END AS frequency_score,
+        CASE WHEN order_count > 0 THEN monetary END AS monetary_score,
+        CASE WHEN order_count > 0 THEN recency * 100 + frequency * 10 + monetary END AS rfm_score,
+        CASE
+            WHEN order_count = 0 THEN 'No Purchases'
+            WHEN recency >= 4 AND frequency >= 4 AND monetary >= 4 THEN 'Champions'
+            WHEN recency >= 3 AND frequency >= 3 THEN 'Loyal'
+            WHEN recency >= 4 THEN 'New / Promising'
+            WHEN recency <= 2 AND frequency >= 3 THEN 'At Risk'
+            WHEN recency <= 2 THEN 'Hibernating'
+            ELSE 'Needs Attention'
+        END AS segment
+    FROM scored
+"""
+
 class SalesAnalytics:
     def __init__(self):
         self.db = DatabaseManager()
         self.init_sales_tables()
+        sales_rollups.refresh()
 
     def init_sales_tables(self):
         """Initialize sales tracking tables"""
@@ -55,6 +129,7 @@ class SalesAnalytics:
                     unit_price REAL NOT NULL,
                     discount_amount REAL DEFAULT 0,
                     total_price REAL NOT NULL,
+                    unit_cost REAL,
                     FOREIGN KEY (transaction_id) REFERENCES sales_transactions (id),
                     FOREIGN KEY (product_id) REFERENCES products (id)
                 )
@@ -74,6 +149,18 @@ class SalesAnalytics:
                 )
             """)
 
+            # Per-customer aggregation groups on customer_id
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_sales_transactions_customer
+                ON sales_transactions (customer_id, status)
+            """)
+
+            # Trend analysis loads sales by time range
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_sales_transactions_date
+                ON sales_transactions (sale_date)
+            """)
+
             conn.commit()
 
     def get_sales_summary(self, start_date, end_date):
@@ -83,13 +170,12 @@ class SalesAnalytics:
 
             cursor.execute("""
                 SELECT 
-                    COUNT(*) as total_transactions,
-                    SUM(total_amount) as total_revenue,
-                    AVG(total_amount) as avg_transaction_value,
-                    SUM(total_amount - discount_amount - tax_amount) as net_revenue
-                FROM sales_transactions 
-                WHERE DATE(sale_date) BETWEEN ? AND ?
-                AND status = 'completed'
+                    SUM(transactions) as total_transactions,
+                    SUM(revenue) as total_revenue,
+                    SUM(revenue) / SUM(transactions) as avg_transaction_value,
+                    SUM(net_revenue) as net_revenue
+                FROM sales_daily_rollup
+                WHERE day BETWEEN ? AND ?
             """, (start_date, end_date))
 
             return cursor.fetchone()
@@ -103,14 +189,12 @@ class SalesAnalytics:
                 SELECT 
                     p.name,
                     p.sku,
-                    SUM(sti.quantity) as total_sold,
-                    SUM(sti.total_price) as total_revenue,
-                    AVG(sti.unit_price) as avg_price
-                FROM sales_transaction_items sti
-                JOIN sales_transactions st ON sti.transaction_id = st.id
-                JOIN products p ON sti.product_id = p.id
-                WHERE DATE(st.sale_date) BETWEEN ? AND ?
-                AND st.status = 'completed'
+                    SUM(r.quantity) as total_sold,
+                    SUM(r.revenue) as total_revenue,
+                    SUM(r.unit_price_sum) / SUM(r.line_count) as avg_price
+                FROM sales_daily_product_rollup r
+                JOIN products p ON r.product_id = p.id
+                WHERE r.day BETWEEN ? AND ?
                 GROUP BY p.id, p.name, p.sku
                 ORDER BY total_sold DESC
                 LIMIT ?
@@ -125,18 +209,161 @@ class SalesAnalytics:
 
             cursor.execute("""
                 SELECT 
-                    DATE(sale_date) as sale_date,
-                    COUNT(*) as transactions,
-                    SUM(total_amount) as revenue
-                FROM sales_transactions
-                WHERE DATE(sale_date) BETWEEN ? AND ?
-                AND status = 'completed'
-                GROUP BY DATE(sale_date)
-                ORDER BY sale_date
+                    day as sale_date,
+                    transactions,
+                    revenue
+                FROM sales_daily_rollup
+                WHERE day BETWEEN ? AND ?
+                ORDER BY day
+            """, (start_date, end_date))
+
+            return cursor.fetchall()
+
+    def get_profit_summary(self, start_date, end_date):
+        """Get revenue, cost of goods and gross profit for date range"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT 
+                    SUM(revenue) as revenue,
+                    SUM(cost) as cost,
+                    SUM(revenue) - SUM(cost) as gross_profit,
+                    (SUM(revenue) - SUM(cost)) * 100.0 / NULLIF(SUM(revenue), 0) as margin
+                FROM sales_daily_product_rollup
+                WHERE day BETWEEN ? AND ?
+            """, (start_date, end_date))
+
+            return cursor.fetchone()
+
+    def get_profit_by_product(self, start_date, end_date):
+        """Get gross profit and margin per product"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT 
+                    p.name,
+                    p.sku,
+                    COALESCE(pc.name, 'Uncategorized') as category,
+                    SUM(r.quantity) as quantity,
+                    SUM(r.revenue) as revenue,
+                    SUM(r.cost) as cost,
+                    SUM(r.revenue) - SUM(r.cost) as gross_profit,
+                    (SUM(r.revenue) - SUM(r.cost)) * 100.0 / NULLIF(SUM(r.revenue), 0) as margin
+                FROM sales_daily_product_rollup r
+                JOIN products p ON r.product_id = p.id
+                LEFT JOIN product_categories pc ON p.category_id = pc.id
+                WHERE r.day BETWEEN ? AND ?
+                GROUP BY r.product_id
+                ORDER BY gross_profit DESC
+            """, (start_date, end_date))
+
+            return cursor.fetchall()
+
+    def get_profit_by_category(self, start_date, end_date):
+        """Get gross profit and margin per product category"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT 
+                    COALESCE(pc.name, 'Uncategorized') as category,
+                    COUNT(DISTINCT r.product_id) as products,
+                    SUM(r.quantity) as quantity,
+                    SUM(r.revenue) as revenue,
+                    SUM(r.cost) as cost,
+                    SUM(r.revenue) - SUM(r.cost) as gross_profit,
+                    (SUM(r.revenue) - SUM(r.cost)) * 100.0 / NULLIF(SUM(r.revenue), 0) as margin
+                FROM sales_daily_product_rollup r
+                JOIN products p ON r.product_id = p.id
+                LEFT JOIN product_categories pc ON p.category_id = pc.id
+                WHERE r.day BETWEEN ? AND ?
+                GROUP BY COALESCE(pc.name, 'Uncategorized')
+                ORDER BY gross_profit DESC
             """, (start_date, end_date))
 
             return cursor.fetchall()
 
+    def get_daily_profit(self, start_date, end_date):
+        """Get gross profit and margin per day"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT 
+                    day as sale_date,
+                    SUM(revenue) as revenue,
+                    SUM(cost) as cost,
+                    SUM(revenue) - SUM(cost) as gross_profit,
+                    (SUM(revenue) - SUM(cost)) * 100.0 / NULLIF(SUM(revenue), 0) as margin
+                FROM sales_daily_product_rollup
+                WHERE day BETWEEN ? AND ?
+                GROUP BY day
+                ORDER BY day
+            """, (start_date, end_date))
+
+            return cursor.fetchall()
+
+    def _customer_filter(self, search):
+        if not search:
+            return "", ()
+        pattern = f"%{search}%"
+        return "WHERE name LIKE ? OR email LIKE ? OR customer_code LIKE ?", (pattern, pattern, pattern)
+
+    def get_customer_count(self, search=None):
+        """Get the number of customers matching a search"""
+        where, params = self._customer_filter(search)
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) as count FROM customers {where}", params)
+            return cursor.fetchone()['count']
+
+    def get_customer_analytics(self, limit=50, offset=0, sort_by='lifetime_spend', search=None):
+        """
+        Get one page of customers with lifetime spend, order count, last purchase and RFM segment
+
+        Args:
+            limit (int): Page size (None for all customers)
+            offset (int): Rows to skip
+            sort_by (str): Key of CUSTOMER_SORT_COLUMNS
+            search (str): Match on name, email or customer code
+
+        Returns:
+            list: Customer rows
+        """
+        if sort_by not in CUSTOMER_SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column '{sort_by}'")
+        direction = "ASC" if sort_by == 'name' else "DESC"
+        where, params = self._customer_filter(search)
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT * FROM ({CUSTOMER_RFM_QUERY})
+                {where}
+                ORDER BY {sort_by} IS NULL, {sort_by} {direction}, id
+                LIMIT ? OFFSET ?
+            """, params + (-1 if limit is None else limit, offset))
+            return cursor.fetchall()
+
+    def get_customer_segments(self):
+        """Get customer count and spend per RFM segment"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT
+                    segment,
+                    COUNT(*) as customers,
+                    SUM(lifetime_spend) as total_spend,
+                    AVG(lifetime_spend) as avg_spend,
+                    AVG(order_count) as avg_orders
+                FROM ({CUSTOMER_RFM_QUERY})
+                GROUP BY segment
+                ORDER BY total_spend DESC
+            """)
+            return cursor.fetchall()
+
 @require_auth
 def main():
     user = get_current_user()
@@ -183,7 +410,7 @@ def main():
             daily_sales = sales_analytics.get_daily_sales(start_date, end_date)
 
             if daily_sales:
-                daily_df = pd.DataFrame(daily_sales)
+                daily_df = pd.DataFrame([dict(row) for row in daily_sales])
 
                 fig = go.Figure()
                 fig.add_trace(go.Scatter(
@@ -224,7 +451,7 @@ def main():
         top_products = sales_analytics.get_top_products(start_date, end_date)
 
         if top_products:
-            top_products_df = pd.DataFrame(top_products)
+            top_products_df = pd.DataFrame([dict(row) for row in top_products])
 
             # Bar chart of top products
             fig = px.bar(
@@ -254,22 +481,139 @@ def main():
         # Sales Trends
         st.subheader("Sales Trends & Patterns")
 
-        # Weekly/Monthly trends would be calculated from actual sales data
-        st.info("Sales trends will be automatically generated from your transaction data.")
+        try:
+            trends = get_sales_trends(start_date, end_date, sales_analytics.db)
+        except Exception as e:
+            st.error(f"Error calculating sales trends: {str(e)}")
+            trends = None
 
-        # Placeholder for trend analysis
-        with st.expander("📊 Trend Analysis Features"):
-            st.markdown("""
-            **Available Trend Analysis:**
-            - Weekly sales patterns
-            - Monthly revenue growth
-            - Seasonal trends
-            - Peak hours analysis
-            - Product performance trends
-            - Customer behavior patterns
-
-            All trends are calculated from your actual sales data to provide accurate insights.
-            """)
+        if trends:
+            daily = trends['daily']
+            heatmap = trends['heatmap']
+            peak_day, peak_hour = heatmap.stack().idxmax()
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                growth_7 = daily['growth_7'].iloc[-1]
+                st.metric("7-Day Growth", "N/A" if pd.isna(growth_7) else f"{growth_7:+.1f}%")
+            with col2:
+                growth_30 = daily['growth_30'].iloc[-1]
+                st.metric("30-Day Growth", "N/A" if pd.isna(growth_30) else f"{growth_30:+.1f}%")
+            with col3:
+                st.metric("Peak Hour", f"{peak_day} {peak_hour:02d}:00")
+            with col4:
+                st.metric("Transactions", f"{trends['transactions']:,}")
+
+            # Daily revenue with rolling averages
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=daily.index, y=daily['revenue'], name='Daily Revenue',
+                                 marker_color='#93c5fd'))
+            fig.add_trace(go.Scatter(x=daily.index, y=daily['sum_7'] / 7, name='7-Day Average',
+                                     line=dict(color='#3b82f6', width=2)))
+            fig.add_trace(go.Scatter(x=daily.index, y=daily['sum_30'] / 30, name='30-Day Average',
+                                     line=dict(color='#f59e0b', width=2)))
+            fig.update_layout(title='Daily Revenue', xaxis_title='Date', yaxis_title='Revenue ($)', height=400)
+            st.plotly_chart(fig, use_container_width=True)
+
+            # Rolling growth against the preceding window
+            growth = daily[['growth_7', 'growth_30']].dropna(how='all')
+            if not growth.empty:
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=growth.index, y=growth['growth_7'], name='7-Day vs Prior 7',
+                                         line=dict(color='#3b82f6')))
+                fig.add_trace(go.Scatter(x=growth.index, y=growth['growth_30'], name='30-Day vs Prior 30',
+                                         line=dict(color='#f59e0b')))
+                fig.add_hline(y=0, line_dash="dash", line_color="gray")
+                fig.update_layout(title='Rolling Revenue Growth', xaxis_title='Date', yaxis_title='Growth (%)',
+                                  height=350)
+                st.plotly_chart(fig, use_container_width=True)
+
+            # Weekday by hour heatmap
+            st.write("**Peak Hours**")
+            heatmap_metric = st.radio("Heatmap Metric", ["Revenue", "Transactions"], horizontal=True)
+            heatmap_fig = px.imshow(
+                heatmap if heatmap_metric == "Revenue" else trends['heatmap_counts'],
+                labels=dict(x="Hour", y="Weekday", color=heatmap_metric),
+                color_continuous_scale='Blues',
+                aspect='auto'
+            )
+            heatmap_fig.update_layout(height=350)
+            st.plotly_chart(heatmap_fig, use_container_width=True)
+            st.caption("Hours are as recorded on the transactions (UTC).")
+
+            # Seasonal decomposition
+            decomposition = trends['decomposition']
+            if decomposition is not None:
+                st.write("**Weekly Seasonality**")
+                col1, col2 = st.columns([2, 1])
+
+                with col1:
+                    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.05,
+                                        subplot_titles=('Trend', 'Weekly Seasonal', 'Residual'))
+                    fig.add_trace(go.Scatter(x=decomposition.index, y=decomposition['observed'], name='Observed',
+                                             line=dict(color='#cbd5e1')), row=1, col=1)
+                    fig.add_trace(go.Scatter(x=decomposition.index, y=decomposition['trend'], name='Trend',
+                                             line=dict(color='#3b82f6', width=2)), row=1, col=1)
+                    fig.add_trace(go.Scatter(x=decomposition.index, y=decomposition['seasonal'], name='Seasonal',
+                                             line=dict(color='#10b981')), row=2, col=1)
+                    fig.add_trace(go.Bar(x=decomposition.index, y=decomposition['residual'], name='Residual',
+                                         marker_color='#94a3b8'), row=3, col=1)
+                    fig.update_layout(height=600, showlegend=False)
+                    st.plotly_chart(fig, use_container_width=True)
+
+                with col2:
+                    weekly = trends['weekly']
+                    fig = px.bar(
+                        x=weekly.index,
+                        y=weekly.values,
+                        labels={'x': 'Weekday', 'y': 'Effect ($)'},
+                        title='Revenue Effect by Weekday',
+                        color=weekly.values,
+                        color_continuous_scale='RdYlGn'
+                    )
+                    fig.update_layout(height=400, coloraxis_showscale=False)
+                    st.plotly_chart(fig, use_container_width=True)
+            else:
+                st.info("Select at least two weeks to see the seasonal decomposition.")
+
+            # Monthly growth
+            monthly = trends['monthly']
+            if len(monthly) > 1:
+                fig = go.Figure()
+                fig.add_trace(go.Bar(x=monthly.index, y=monthly['revenue'], name='Revenue', marker_color='#3b82f6'))
+                fig.add_trace(go.Scatter(x=monthly.index, y=monthly['growth'], name='MoM Growth (%)',
+                                         yaxis='y2', line=dict(color='#f59e0b', width=2)))
+                fig.update_layout(
+                    title='Monthly Revenue Growth',
+                    yaxis=dict(title='Revenue ($)'),
+                    yaxis2=dict(title='Growth (%)', overlaying='y', side='right'),
+                    height=400
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+            # Per-product trends
+            products = trends['products']
+            if not products.empty:
+                st.write("**Product Performance Trends**")
+                product_columns = {
+                    "slope": st.column_config.NumberColumn("Trend ($/day)", format="$%.2f"),
+                    "relative_slope": st.column_config.NumberColumn("Trend (%/day)", format="%.2f%%"),
+                    "avg_daily_revenue": st.column_config.NumberColumn("Avg Daily Revenue", format="$%.2f"),
+                    "total_revenue": st.column_config.NumberColumn("Total Revenue", format="$%.2f"),
+                }
+                display = products.drop(columns='product_id')
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.write("📈 Rising")
+                    st.dataframe(display[display['slope'] > 0].head(10), use_container_width=True,
+                                 hide_index=True, column_config=product_columns)
+                with col2:
+                    st.write("📉 Declining")
+                    st.dataframe(display[display['slope'] < 0].sort_values('slope').head(10),
+                                 use_container_width=True, hide_index=True, column_config=product_columns)
+        else:
+            st.info("No sales data found for the selected date range.")
 
     with tab4:
         # Customer Analytics
@@ -311,70 +655,194 @@ def main():
                 else:
                     st.error("Customer name is required")
 
-        # Customer list
-        with sales_analytics.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM customers ORDER BY created_at DESC")
-            customers = cursor.fetchall()
+        # Customer segments from one grouped query
+        segments = sales_analytics.get_customer_segments()
+        customer_total = sales_analytics.get_customer_count()
 
-        if customers:
-            customers_df = pd.DataFrame(customers)
-            st.dataframe(customers_df, use_container_width=True)
-        else:
-            st.info("No customers registered yet.")
-            
-        # Customer spending analysis
-        if customers:
-            # Calculate total spent for each customer
-            with sales_analytics.db.get_connection() as conn:
-                customers_df['total_spent'] = 0  # Initialize total_spent column
-                for index, customer in customers_df.iterrows():
-                    cursor = conn.cursor()
-                    try:
-                        customer_id = customer.get('id') if isinstance(customer, dict) else customer[0] if hasattr(customer, '__getitem__') else None
-                        if customer_id:
-                            cursor.execute("SELECT SUM(total_amount) FROM sales_transactions WHERE customer_id = ?", (customer_id,))
-                        else:
-                            cursor.execute("SELECT 0")
-                    except (KeyError, IndexError, TypeError):
-                        cursor.execute("SELECT 0")
-                    
-                    result = cursor.fetchone()
-                    total_spent = result[0] if result and result[0] else 0
-                    customers_df.at[index, 'total_spent'] = total_spent
-
-            # Create proper labels for the pie chart
-            if not customers_df.empty:
-                customers_df['customer_label'] = customers_df.apply(
-                    lambda x: f"{x.get('name', x.get('customer_name', 'Customer ' + str(x.name if hasattr(x, 'name') else x.iloc[0] if len(x) > 0 else 'Unknown')))}", axis=1
+        if segments:
+            segments_df = pd.DataFrame([dict(row) for row in segments])
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                fig = px.pie(
+                    segments_df,
+                    values='customers',
+                    names='segment',
+                    title="Customers by RFM Segment"
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+            with col2:
+                top_customers = pd.DataFrame([
+                    dict(row) for row in sales_analytics.get_customer_analytics(limit=10)
+                ])
+                top_customers = top_customers[top_customers['lifetime_spend'] > 0]
+                if not top_customers.empty:
+                    fig = px.bar(
+                        top_customers,
+                        x='name',
+                        y='lifetime_spend',
+                        title="Top Customers by Total Spent"
+                    )
+                    fig.update_layout(xaxis_title="Customer", yaxis_title="Lifetime Spend ($)")
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.info("No completed sales linked to customers yet.")
+
+            st.dataframe(
+                segments_df,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "total_spend": st.column_config.NumberColumn("Total Spend", format="$%.2f"),
+                    "avg_spend": st.column_config.NumberColumn("Avg Spend", format="$%.2f"),
+                    "avg_orders": st.column_config.NumberColumn("Avg Orders", format="%.1f"),
+                }
+            )
+
+        # Customer list, one page at a time
+        if customer_total:
+            col1, col2, col3 = st.columns([2, 1, 1])
+
+            with col1:
+                customer_search = st.text_input("Search Customers", placeholder="Name, email or code")
+
+            with col2:
+                customer_sort = st.selectbox(
+                    "Sort By", list(CUSTOMER_SORT_COLUMNS), format_func=CUSTOMER_SORT_COLUMNS.get
                 )
 
-            fig = px.pie(
-                customers_df, 
-                values='total_spent', 
-                names='customer_label',
-                title="Top Customers by Total Spent"
+            with col3:
+                page_size = st.selectbox("Rows per Page", [25, 50, 100], index=1)
+
+            matching = sales_analytics.get_customer_count(customer_search) if customer_search else customer_total
+            pages = max(1, -(-matching // page_size))
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+
+            customers = sales_analytics.get_customer_analytics(
+                limit=page_size, offset=(page - 1) * page_size, sort_by=customer_sort, search=customer_search
             )
-            st.plotly_chart(fig)
+
+            if customers:
+                customers_df = pd.DataFrame([dict(row) for row in customers])
+                st.dataframe(
+                    customers_df,
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "lifetime_spend": st.column_config.NumberColumn("Lifetime Spend", format="$%.2f"),
+                        "avg_order_value": st.column_config.NumberColumn("Avg Order", format="$%.2f"),
+                    }
+                )
+                first = (page - 1) * page_size + 1
+                st.caption(f"Showing {first:,}-{first + len(customers) - 1:,} of {matching:,} customers")
+            else:
+                st.info("No customers match your search.")
+        else:
+            st.info("No customers registered yet.")
 
     with tab5:
         # Profit Analysis
         st.subheader("Profit Analysis")
 
-        st.info("Profit analysis calculates margins based on your product cost prices and actual sales data.")
+        profit_summary = sales_analytics.get_profit_summary(start_date, end_date)
 
-        # Profit metrics would be calculated from actual cost vs selling price data
-        with st.expander("💰 Profit Calculation Methods"):
-            st.markdown("""
-            **Profit Metrics Calculated:**
-            - Gross Profit: Revenue - Cost of Goods Sold
-            - Net Profit: Gross Profit - Operating Expenses
-            - Profit Margin: (Profit / Revenue) × 100
-            - Product-level profitability
-            - Category-wise profit analysis
-
-            All calculations use your actual product costs and selling prices.
-            """)
+        if profit_summary and profit_summary['revenue']:
+            col1, col2, col3, col4 = st.columns(4)
+
+            with col1:
+                st.metric("Revenue", f"${profit_summary['revenue']:,.2f}")
+
+            with col2:
+                st.metric("Cost of Goods Sold", f"${profit_summary['cost']:,.2f}")
+
+            with col3:
+                st.metric("Gross Profit", f"${profit_summary['gross_profit']:,.2f}")
+
+            with col4:
+                st.metric("Gross Margin", f"{profit_summary['margin']:.1f}%")
+
+            # Daily gross profit and margin
+            daily_profit = sales_analytics.get_daily_profit(start_date, end_date)
+            if daily_profit:
+                daily_profit_df = pd.DataFrame([dict(row) for row in daily_profit])
+
+                fig = go.Figure()
+                fig.add_trace(go.Bar(
+                    x=daily_profit_df['sale_date'],
+                    y=daily_profit_df['gross_profit'],
+                    name='Gross Profit',
+                    marker_color='#10b981'
+                ))
+                fig.add_trace(go.Scatter(
+                    x=daily_profit_df['sale_date'],
+                    y=daily_profit_df['margin'],
+                    name='Margin (%)',
+                    yaxis='y2',
+                    line=dict(color='#f59e0b', width=2)
+                ))
+                fig.update_layout(
+                    title='Daily Gross Profit',
+                    xaxis_title='Date',
+                    yaxis=dict(title='Gross Profit ($)'),
+                    yaxis2=dict(title='Margin (%)', overlaying='y', side='right'),
+                    height=400
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+            profit_columns = {
+                "revenue": st.column_config.NumberColumn("Revenue", format="$%.2f"),
+                "cost": st.column_config.NumberColumn("COGS", format="$%.2f"),
+                "gross_profit": st.column_config.NumberColumn("Gross Profit", format="$%.2f"),
+                "margin": st.column_config.NumberColumn("Margin", format="%.1f%%"),
+            }
+
+            # Category profitability
+            category_profit = sales_analytics.get_profit_by_category(start_date, end_date)
+            if category_profit:
+                category_df = pd.DataFrame([dict(row) for row in category_profit])
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    fig = px.bar(
+                        category_df,
+                        x='category',
+                        y='gross_profit',
+                        title='Gross Profit by Category',
+                        color='margin',
+                        color_continuous_scale='Greens'
+                    )
+                    fig.update_layout(height=400)
+                    st.plotly_chart(fig, use_container_width=True)
+
+                with col2:
+                    st.dataframe(category_df, use_container_width=True, hide_index=True,
+                                 column_config=profit_columns)
+
+            # Product profitability
+            product_profit = sales_analytics.get_profit_by_product(start_date, end_date)
+            if product_profit:
+                product_profit_df = pd.DataFrame([dict(row) for row in product_profit])
+
+                st.write("**Product Profitability**")
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.write("🏆 Most Profitable")
+                    st.dataframe(product_profit_df.head(10), use_container_width=True, hide_index=True,
+                                 column_config=profit_columns)
+
+                with col2:
+                    st.write("⚠️ Lowest Margin")
+                    st.dataframe(product_profit_df.sort_values('margin').head(10), use_container_width=True,
+                                 hide_index=True, column_config=profit_columns)
+
+                st.caption("Cost of goods uses the unit cost recorded at sale time, "
+                           "or the product's current cost price for older sales.")
+        else:
+            st.info("No sales data found for the selected date range.")
 
     # Export functionality
     st.subheader("📄 Export Reports")
@@ -394,8 +862,9 @@ def main():
     with col3:
         if st.button("Export Customer Report"):
             # Export customer data
+            customers = sales_analytics.get_customer_analytics(limit=None)
             if customers:
-                csv = customers_df.to_csv(index=False)
+                csv = pd.DataFrame([dict(row) for row in customers]).to_csv(index=False)
                 st.download_button(
                     label="Download Customer CSV",
                     data=csv,
@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 from auth import init_auth, get_current_user, require_auth
 from database import DatabaseManager
+from utils.product_lookup import product_lookup
+from utils.point_of_sale import point_of_sale, add_to_cart, cart_line, cart_totals
 import streamlit.components.v1 as components
 
 st.set_page_config(page_title="Barcode Scanner", page_icon="📱", layout="wide")
@@ -18,30 +20,15 @@ init_auth()
 class BarcodeManager:
     def __init__(self):
         self.db = DatabaseManager()
+        product_lookup.ensure_warm()
     
     def find_product_by_barcode(self, barcode):
         """Find product by barcode"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT p.*, pc.name as category_name
-                FROM products p
-                LEFT JOIN product_categories pc ON p.category_id = pc.id
-                WHERE p.barcode = ?
-            """, (barcode,))
-            return cursor.fetchone()
+        return product_lookup.find_by_barcode(barcode)
     
     def find_product_by_sku(self, sku):
         """Find product by SKU as fallback"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT p.*, pc.name as category_name
-                FROM products p
-                LEFT JOIN product_categories pc ON p.category_id = pc.id
-                WHERE p.sku = ?
-            """, (sku,))
-            return cursor.fetchone()
+        return product_lookup.find_by_sku(sku)
 
 @require_auth
 def main():
@@ -120,6 +107,22 @@ def main():
             else:
                 st.error("Product not found. Check barcode/SKU or add product to inventory first.")
     
+    # Batch scanning straight into the cart
+    if 'pos_cart' not in st.session_state:
+        st.session_state.pos_cart = []
+    
+    with st.expander("🧾 Batch Scan to Cart"):
+        batch_codes = st.text_area("Barcodes/SKUs (one per line)", placeholder="Scan items one after another")
+        
+        if st.button("Add Scans to Cart") and batch_codes:
+            try:
+                missing = point_of_sale.scan_into_cart(st.session_state.pos_cart, batch_codes.splitlines())
+                if missing:
+                    st.warning(f"Not found: {', '.join(missing)}")
+                st.rerun()
+            except Exception as e:
+                st.error(f"Error scanning items: {str(e)}")
+    
     # Product details and operations
     if 'scanned_product' in st.session_state:
         product = st.session_state.scanned_product
@@ -213,42 +216,25 @@ def main():
             total_amount = (sale_quantity * unit_price) - discount
             st.metric("Total Amount", f"${total_amount:.2f}")
             
-            if st.button("Process Sale"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                process_sale = st.button("Process Sale")
+            
+            with col2:
+                if st.button("🛒 Add to Cart"):
+                    add_to_cart(st.session_state.pos_cart, product, sale_quantity, unit_price, discount)
+                    st.success(f"Added {sale_quantity} x {product['name']} to cart")
+            
+            if process_sale:
                 if sale_quantity <= product['current_stock']:
                     try:
-                        # Record sale transaction
-                        transaction_id = f"QS{datetime.now().strftime('%Y%m%d%H%M%S')}"
-                        
-                        with barcode_manager.db.get_connection() as conn:
-                            cursor = conn.cursor()
-                            
-                            # Insert sale transaction
-                            cursor.execute("""
-                                INSERT INTO sales_transactions 
-                                (transaction_id, total_amount, discount_amount, payment_method, cashier_id)
-                                VALUES (?, ?, ?, ?, ?)
-                            """, (transaction_id, total_amount, discount, payment_method, user['id']))
-                            
-                            sale_id = cursor.lastrowid
-                            
-                            # Insert transaction item
-                            cursor.execute("""
-                                INSERT INTO sales_transaction_items 
-                                (transaction_id, product_id, quantity, unit_price, discount_amount, total_price)
-                                VALUES (?, ?, ?, ?, ?, ?)
-                            """, (sale_id, product['id'], sale_quantity, unit_price, discount, total_amount))
-                            
-                            conn.commit()
-                        
-                        # Update stock
-                        from pages.page_08_Inventory_Management import InventoryManager
-                        inventory_manager = InventoryManager()
-                        inventory_manager.update_stock(
-                            product['id'], sale_quantity, 'sale',
-                            transaction_id, f"Quick sale via barcode scanner", user['id']
+                        sale = point_of_sale.checkout(
+                            [cart_line(product, sale_quantity, unit_price, discount)],
+                            user['id'], payment_method
                         )
                         
-                        st.success(f"Sale processed! Transaction ID: {transaction_id}")
+                        st.success(f"Sale processed! Transaction ID: {sale['transaction_id']}")
                         st.balloons()
                         
                         # Refresh product data
@@ -283,6 +269,47 @@ def main():
             info_df = pd.DataFrame(info_data)
             st.dataframe(info_df, use_container_width=True, hide_index=True)
             
+            # Stock level history from the movement ledger
+            st.write("**Stock History (60 days)**")
+            
+            try:
+                from utils.stock_ledger import stock_ledger
+                
+                # Ledger days are UTC dates of the movement timestamps
+                today = datetime.utcnow().date()
+                history = stock_ledger.stock_history(product['id'], today - timedelta(days=59), today)
+                velocity = stock_ledger.movement_velocity(30, today, [product['id']])
+                sold_per_day = velocity['sold_per_day'].iloc[0] if not velocity.empty else 0.0
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Sold / Day (30d)", f"{sold_per_day:.2f}")
+                with col2:
+                    st.metric("Units In (60d)", int(history['inbound'].sum()))
+                with col3:
+                    st.metric("Units Out (60d)", int(history['outbound'].sum()))
+                
+                st.line_chart(history['stock'])
+
+                from utils.reorder_forecast import reorder_forecaster, FORECAST_STATUSES
+
+                forecast = reorder_forecaster.get_product_forecast(product['id'])
+                if forecast and forecast['status'] in ('out_of_stock', 'critical', 'reorder'):
+                    cover = f"{forecast['days_of_cover']:.1f} days" if forecast['days_of_cover'] is not None else "n/a"
+                    st.warning(
+                        f"{FORECAST_STATUSES[forecast['status']]}: {cover} of cover, projected stockout "
+                        f"{forecast['stockout_date'] or 'n/a'}; reorder {forecast['reorder_quantity']} units."
+                    )
+
+                drift = stock_ledger.reconcile([product['id']])
+                if not drift.empty:
+                    st.warning(
+                        f"Current stock ({product['current_stock']}) differs from the movement ledger "
+                        f"({drift['ledger_stock'].iloc[0]:.0f}); some stock changes were not recorded as movements."
+                    )
+            except Exception as e:
+                st.error(f"Error loading stock history: {str(e)}")
+            
             # Stock history
             st.write("**Recent Stock Movements**")
             
@@ -299,7 +326,7 @@ def main():
                 movements = cursor.fetchall()
             
             if movements:
-                movements_df = pd.DataFrame(movements)
+                movements_df = pd.DataFrame([dict(row) for row in movements])
                 st.dataframe(
                     movements_df[['created_at', 'movement_type', 'quantity', 'reference_number', 'username']],
                     use_container_width=True
@@ -312,6 +339,77 @@ def main():
             del st.session_state.scanned_product
             st.rerun()
     
+    # Cart checkout
+    if st.session_state.pos_cart:
+        st.subheader("🛒 Cart")
+        
+        cart_df = pd.DataFrame(st.session_state.pos_cart)
+        cart_df['line_total'] = cart_df['quantity'] * cart_df['unit_price'] - cart_df['discount']
+        st.dataframe(
+            cart_df[['sku', 'name', 'quantity', 'unit_price', 'discount', 'line_total']],
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "unit_price": st.column_config.NumberColumn("Unit Price", format="$%.2f"),
+                "discount": st.column_config.NumberColumn("Discount", format="$%.2f"),
+                "line_total": st.column_config.NumberColumn("Line Total", format="$%.2f"),
+            }
+        )
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            cart_discount = st.number_input("Order Discount", min_value=0.0, value=0.0, step=0.01)
+        
+        with col2:
+            cart_tax = st.number_input("Tax", min_value=0.0, value=0.0, step=0.01)
+        
+        with col3:
+            cart_payment = st.selectbox("Payment Method", ["Cash", "Card", "Digital"], key="cart_payment")
+        
+        totals = cart_totals(st.session_state.pos_cart, cart_discount, cart_tax)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Items", totals['items'])
+        with col2:
+            st.metric("Cart Total", f"${totals['total']:.2f}")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            if st.button("💳 Checkout"):
+                try:
+                    sale = point_of_sale.checkout(
+                        st.session_state.pos_cart, user['id'], cart_payment,
+                        discount=cart_discount, tax=cart_tax
+                    )
+                    st.session_state.pos_cart = []
+                    st.success(f"Sale processed! Transaction ID: {sale['transaction_id']}")
+                    
+                    # Refresh product data
+                    if 'scanned_product' in st.session_state:
+                        updated_product = barcode_manager.find_product_by_sku(st.session_state.scanned_product['sku'])
+                        if updated_product:
+                            st.session_state.scanned_product = updated_product
+                except Exception as e:
+                    st.error(f"Error processing sale: {str(e)}")
+        
+        with col2:
+            remove_sku = st.selectbox("Line", [line['sku'] for line in st.session_state.pos_cart],
+                                      key="cart_remove_sku", label_visibility="collapsed")
+        
+        with col3:
+            if st.button("Remove Line"):
+                st.session_state.pos_cart = [
+                    line for line in st.session_state.pos_cart if line['sku'] != remove_sku
+                ]
+                st.rerun()
+        
+        if st.button("🗑️ Clear Cart"):
+            st.session_state.pos_cart = []
+            st.rerun()
+    
     # Recent scanned products
     if 'recent_scans' not in st.session_state:
         st.session_state.recent_scans = []
@@ -333,7 +431,37 @@ def main():
                     if st.button("Scan Again", key=f"rescan_{i}"):
                         st.session_state.scanned_product = recent_product
                         st.rerun()
-    
+
+    # Reorder alerts from the stored forecast
+    with st.expander("⚠️ Reorder Alerts"):
+        try:
+            from utils.reorder_forecast import reorder_forecaster, FORECAST_STATUSES
+
+            if st.button("Recompute Forecast"):
+                reorder_forecaster.run_forecast()
+
+            alerts = reorder_forecaster.get_reorder_alerts()
+            if alerts:
+                alerts_df = pd.DataFrame([dict(row) for row in alerts])
+                alerts_df['status'] = alerts_df['status'].map(FORECAST_STATUSES)
+                st.dataframe(
+                    alerts_df[['sku', 'name', 'status', 'current_stock', 'velocity', 'days_of_cover',
+                               'stockout_date', 'reorder_point', 'reorder_quantity']],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        'velocity': st.column_config.NumberColumn('Units / Day', format="%.2f"),
+                        'days_of_cover': st.column_config.NumberColumn('Days of Cover', format="%.1f"),
+                        'stockout_date': 'Projected Stockout',
+                        'reorder_point': 'Reorder Point',
+                        'reorder_quantity': 'Reorder Qty'
+                    }
+                )
+            else:
+                st.success("No products need reordering")
+        except Exception as e:
+            st.error(f"Error loading reorder alerts: {str(e)}")
+
     # Help and tips
     with st.expander("💡 Barcode Scanner Tips"):
         st.markdown("""
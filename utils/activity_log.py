@@ -0,0 +1,202 @@
+import argparse
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Most events written in one transaction
+BATCH_SIZE = 500
+
+# Seconds the writer waits for more events before committing a partial batch
+FLUSH_INTERVAL = 1.0
+
+# Days of activity kept; older rows are pruned by the writer
+RETENTION_DAYS = 365
+
+# Seconds between retention prunes
+PRUNE_INTERVAL = 3600
+
+# Seconds to wait for pending events before reading them back or exiting
+FLUSH_TIMEOUT = 5.0
+
+INSERT_ACTIVITY_SQL = """
+    INSERT INTO user_activity (user_id, action, details, ip_address, user_agent, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLog:
+    """
+    Buffered writer for the user_activity table
+
+    log() only puts the event on an in-process queue; a daemon thread
+    drains the queue and writes events in batches, one transaction per
+    batch, over a connection it keeps open. Events carry the time they were
+    logged, so batching never shifts timestamps. A batch is retried while
+    the database is locked or busy; events the database rejects are dropped
+    and logged without holding up the rest. Pending events are flushed
+    when the process exits.
+    """
+
+    def __init__(self, db_path="stock_app.db", retention_days=RETENTION_DAYS):
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._writer = None
+        self._last_prune = 0.0
+
+    def log(self, user_id, action, details=None, ip_address=None, user_agent=None):
+        """Queue an activity event"""
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        self._queue.put((user_id, action, details, ip_address, user_agent, timestamp))
+        if self._writer is None or not self._writer.is_alive():
+            self._start_writer()
+
+    def _start_writer(self):
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+                self._writer.start()
+
+    def _next_batch(self, pending):
+        # Block for the first event only, then take whatever else is waiting
+        if not pending:
+            try:
+                pending.append(self._queue.get(timeout=FLUSH_INTERVAL))
+            except queue.Empty:
+                return pending
+        while len(pending) < BATCH_SIZE:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        pending = []
+        try:
+            while True:
+                pending = self._next_batch(pending)
+                if pending:
+                    try:
+                        self._write(conn, pending)
+                    except sqlite3.OperationalError:
+                        # Locked or busy: keep the batch and retry on the next pass
+                        time.sleep(FLUSH_INTERVAL)
+                        continue
+                    for _ in pending:
+                        self._queue.task_done()
+                    pending = []
+
+                if time.monotonic() - self._last_prune > PRUNE_INTERVAL:
+                    try:
+                        self._prune(conn)
+                    except sqlite3.Error:
+                        pass
+        finally:
+            conn.close()
+
+    def _write(self, conn, events):
+        # One transaction per batch; if the database rejects an event, the
+        # batch is written row by row and the rejected events are dropped
+        try:
+            with conn:
+                conn.executemany(INSERT_ACTIVITY_SQL, events)
+            return
+        except sqlite3.OperationalError:
+            raise
+        except sqlite3.Error:
+            pass
+
+        with conn:
+            for event in events:
+                try:
+                    conn.execute(INSERT_ACTIVITY_SQL, event)
+                except sqlite3.OperationalError:
+                    raise
+                except sqlite3.Error as e:
+                    logger.warning("Dropped activity event %r: %s", event, e)
+
+    def _prune(self, conn):
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM user_activity WHERE timestamp < datetime('now', ?)",
+                (f'-{self.retention_days} days',)
+            )
+        self._last_prune = time.monotonic()
+        return cursor.rowcount
+
+    def prune(self):
+        """
+        Delete activity older than the retention period
+
+        Returns:
+            int: Rows deleted
+        """
+        self.flush(FLUSH_TIMEOUT)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return self._prune(conn)
+        finally:
+            conn.close()
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued event is written
+
+        Args:
+            timeout (float): Seconds to wait (None: no limit)
+
+        Returns:
+            bool: True if the queue was drained
+        """
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(lambda: self._queue.unfinished_tasks == 0, timeout)
+
+    def pending(self):
+        """Get the number of events not yet written"""
+        return self._queue.unfinished_tasks
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_activity_log(db_path="stock_app.db"):
+    """Get the shared activity log of a database file"""
+    with _logs_lock:
+        if db_path not in _logs:
+            _logs[db_path] = ActivityLog(db_path)
+        return _logs[db_path]
+
+
+@atexit.register
+def flush_all():
+    """Write pending events of every activity log"""
+    for activity_log in list(_logs.values()):
+        activity_log.flush(FLUSH_TIMEOUT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the user activity log")
+    parser.add_argument('--prune', action='store_true', help="Delete activity older than the retention period")
+    parser.add_argument('--retention-days', type=int, default=RETENTION_DAYS, help="Days of activity to keep")
+    args = parser.parse_args()
+
+    if args.prune:
+        activity_log = get_activity_log()
+        activity_log.retention_days = args.retention_days
+        print(f"Pruned {activity_log.prune():,} activity rows older than {args.retention_days} days")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from utils import indicator_kernels
+
+TRADING_DAYS = 252
+
+# Trading Signals rules from the Technical Analysis page and their default parameters
+SIGNAL_RULES = {
+    'sma_trend': {'fast': 20, 'slow': 50},
+    'rsi': {'window': 14, 'oversold': 30, 'overbought': 70},
+    'macd_crossover': {'fast': 12, 'slow': 26, 'signal': 9},
+    'bollinger': {'window': 20, 'num_std': 2},
+    'stochastic': {'k_window': 14, 'd_window': 3, 'oversold': 20, 'overbought': 80}
+}
+
+RULE_LABELS = {
+    'sma_trend': 'SMA Trend',
+    'rsi': 'RSI Thresholds',
+    'macd_crossover': 'MACD Crossover',
+    'bollinger': 'Bollinger Reversion',
+    'stochastic': 'Stochastic Crossover'
+}
+
+# How the positions of several rules are merged into one
+COMBINE_MODES = {
+    'all': 'All rules agree',
+    'majority': 'Majority vote'
+}
+
+# Parameter grids offered for sweeps
+DEFAULT_SWEEP_GRIDS = {
+    'sma_trend': {'fast': [10, 20, 30, 50], 'slow': [50, 100, 150, 200]},
+    'rsi': {'window': [7, 14, 21], 'oversold': [20, 25, 30, 35], 'overbought': [65, 70, 75, 80]},
+    'macd_crossover': {'fast': [8, 12, 16], 'slow': [21, 26, 34], 'signal': [5, 9, 13]},
+    'bollinger': {'window': [10, 20, 30], 'num_std': [1.5, 2, 2.5]},
+    'stochastic': {'k_window': [9, 14, 21], 'd_window': [3, 5], 'oversold': [20, 30], 'overbought': [70, 80]}
+}
+
+METRIC_COLUMNS = [
+    'total_return', 'cagr', 'volatility', 'sharpe', 'max_drawdown',
+    'trades', 'hit_rate', 'turnover', 'exposure'
+]
+
+
+def _cached(cache, key, compute):
+    if cache is None:
+        return compute()
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def _ema(values, span):
+    # Same smoothing as TechnicalAnalysis.calculate_ema
+    return pd.Series(values).ewm(span=span).mean().to_numpy()
+
+
+# Marks bars without an event for _hold_last_event when 0 is itself an event (exit)
+NO_EVENT = 2
+
+
+def _hold_last_event(events, no_event=0):
+    """Carry the last event forward until the next one"""
+    positions = np.arange(len(events))
+    positions[events == no_event] = 0
+    np.maximum.accumulate(positions, out=positions)
+    held = events[positions]
+    held[held == no_event] = 0
+    return held
+
+
+def sma_trend_positions(close, fast=20, slow=50, cache=None, **bars):
+    """Long while close > SMA fast > SMA slow, short while close < SMA fast < SMA slow"""
+    fast_ma = _cached(cache, ('sma', fast), lambda: indicator_kernels.rolling_mean(close, fast))
+    slow_ma = _cached(cache, ('sma', slow), lambda: indicator_kernels.rolling_mean(close, slow))
+    with np.errstate(invalid='ignore'):
+        up = (close > fast_ma) & (fast_ma > slow_ma)
+        down = (close < fast_ma) & (fast_ma < slow_ma)
+    return up.astype(np.int8) - down.astype(np.int8)
+
+
+def rsi_positions(close, window=14, oversold=30, overbought=70, cache=None, **bars):
+    """Go long when RSI drops below oversold, short when it rises above overbought, hold in between"""
+    rsi = _cached(cache, ('rsi', window), lambda: indicator_kernels.rsi(close, window))
+    events = np.zeros(len(close), dtype=np.int8)
+    with np.errstate(invalid='ignore'):
+        events[rsi < oversold] = 1
+        events[rsi > overbought] = -1
+    return _hold_last_event(events)
+
+
+def macd_crossover_positions(close, fast=12, slow=26, signal=9, cache=None, **bars):
+    """Long while MACD is above its signal line (after a bullish crossover), short while below"""
+    macd = _cached(cache, ('macd', fast, slow), lambda: _ema(close, fast) - _ema(close, slow))
+    macd_signal = _cached(cache, ('macd_signal', fast, slow, signal), lambda: _ema(macd, signal))
+    positions = np.sign(macd - macd_signal).astype(np.int8)
+    positions[:slow] = 0
+    return positions
+
+
+def bollinger_positions(close, window=20, num_std=2, cache=None, **bars):
+    """Long below the lower band, short above the upper band, out once price returns to the middle"""
+    middle = _cached(cache, ('sma', window), lambda: indicator_kernels.rolling_mean(close, window))
+    std = _cached(cache, ('std', window), lambda: pd.Series(close).rolling(window).std().to_numpy())
+    long_events = np.full(len(close), NO_EVENT, dtype=np.int8)
+    short_events = np.full(len(close), NO_EVENT, dtype=np.int8)
+    with np.errstate(invalid='ignore'):
+        long_events[close >= middle] = 0
+        long_events[close < middle - num_std * std] = 1
+        short_events[close <= middle] = 0
+        short_events[close > middle + num_std * std] = -1
+    return _hold_last_event(long_events, NO_EVENT) + _hold_last_event(short_events, NO_EVENT)
+
+
+def stochastic_positions(close, k_window=14, d_window=3, oversold=20, overbought=80, cache=None, high=None, low=None):
+    """Go long when %K crosses above %D in oversold territory, short on the mirror case, hold in between"""
+    high = close if high is None else high
+    low = close if low is None else low
+
+    def percent_k():
+        lowest = pd.Series(low).rolling(k_window).min().to_numpy()
+        highest = pd.Series(high).rolling(k_window).max().to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 * (close - lowest) / (highest - lowest)
+
+    k = _cached(cache, ('stoch_k', k_window), percent_k)
+    d = _cached(cache, ('stoch_d', k_window, d_window), lambda: pd.Series(k).rolling(d_window).mean().to_numpy())
+    events = np.zeros(len(close), dtype=np.int8)
+    with np.errstate(invalid='ignore'):
+        events[(k > d) & (k < oversold)] = 1
+        events[(k < d) & (k > overbought)] = -1
+    return _hold_last_event(events)
+
+
+RULE_FUNCTIONS = {
+    'sma_trend': sma_trend_positions,
+    'rsi': rsi_positions,
+    'macd_crossover': macd_crossover_positions,
+    'bollinger': bollinger_positions,
+    'stochastic': stochastic_positions
+}
+
+
+def valid_params(rule, params):
+    """Check that a parameter combination makes sense for a rule"""
+    if rule in ('sma_trend', 'macd_crossover'):
+        return params['fast'] < params['slow']
+    if rule in ('rsi', 'stochastic'):
+        return params['oversold'] < params['overbought']
+    return True
+
+
+def build_positions(close, rules, combine='all', allow_short=False, cache=None, high=None, low=None):
+    """
+    Turn signal rules into a position per bar (-1 short, 0 flat, 1 long)
+
+    Args:
+        close (numpy.ndarray): Closing prices without gaps
+        rules (dict): Rule name -> params (missing params use SIGNAL_RULES defaults)
+        combine (str): 'all' takes a position only when every rule agrees,
+            'majority' follows the sign of the summed rule positions
+        allow_short (bool): Keep short positions instead of going flat
+        cache (dict): Optional memo for indicators shared across calls on the same close
+        high (numpy.ndarray): Optional highs for range-based rules (default: close)
+        low (numpy.ndarray): Optional lows for range-based rules (default: close)
+
+    Returns:
+        numpy.ndarray: int8 positions decided at each bar's close
+    """
+    if not rules:
+        raise ValueError("At least one rule is required")
+    if combine not in COMBINE_MODES:
+        raise ValueError(f"Unknown combine mode '{combine}'")
+
+    close = indicator_kernels.as_float64(close)
+    votes = np.zeros(len(close), dtype=np.int16)
+    agree = None
+    for rule, params in rules.items():
+        if rule not in RULE_FUNCTIONS:
+            raise ValueError(f"Unknown rule '{rule}'")
+        positions = RULE_FUNCTIONS[rule](
+            close, **{**SIGNAL_RULES[rule], **(params or {})}, cache=cache, high=high, low=low
+        )
+        votes += positions
+        agree = positions.copy() if agree is None else np.where(agree == positions, agree, 0)
+
+    combined = agree if combine == 'all' else np.sign(votes)
+    combined = combined.astype(np.int8)
+    if not allow_short:
+        np.maximum(combined, 0, out=combined)
+    return combined
+
+
+def simulate(close, positions, cost_bps=0.0):
+    """
+    Apply positions to price returns, trading at the next bar
+
+    Args:
+        close (numpy.ndarray): Closing prices
+        positions (numpy.ndarray): Position decided at each bar's close
+        cost_bps (float): Cost per unit of position change, in basis points
+
+    Returns:
+        dict: Arrays returns, held, turnover and equity
+    """
+    close = indicator_kernels.as_float64(close)
+    n = len(close)
+    returns = np.zeros(n)
+    if n > 1:
+        np.divide(close[1:], close[:-1], out=returns[1:])
+        returns[1:] -= 1
+
+    # A signal at today's close is held over tomorrow's return
+    held = np.zeros(n)
+    held[1:] = positions[:-1]
+    turnover = np.abs(np.diff(held, prepend=0.0))
+
+    strategy = held * returns - turnover * (cost_bps / 10000)
+    equity = np.cumprod(1 + strategy)
+    return {'returns': strategy, 'held': held, 'turnover': turnover, 'equity': equity}
+
+
+def compute_metrics(simulation, periods_per_year=TRADING_DAYS):
+    """
+    Summarise a simulation
+
+    Args:
+        simulation (dict): Output of simulate()
+        periods_per_year (int): Bars per year for annualisation
+
+    Returns:
+        dict: total_return, cagr, volatility, max_drawdown, hit_rate and exposure
+            as percentages; sharpe; trades; turnover as position changes per year
+    """
+    returns = simulation['returns']
+    held = simulation['held']
+    equity = simulation['equity']
+    n = len(returns)
+    years = n / periods_per_year if n else 0
+
+    final = equity[-1] if n else 1.0
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if n else np.zeros(0)
+    std = returns.std(ddof=1) if n > 1 else 0.0
+
+    # Trades are runs of constant non-zero position
+    in_market = held != 0
+    starts = in_market & (np.diff(held, prepend=0.0) != 0)
+    trade_ids = np.cumsum(starts)
+    trade_log_returns = np.bincount(
+        trade_ids[in_market], weights=np.log1p(returns[in_market]), minlength=trade_ids[-1] + 1 if n else 1
+    )[1:]
+    trades = len(trade_log_returns)
+
+    return {
+        'total_return': (final - 1) * 100,
+        'cagr': (final ** (1 / years) - 1) * 100 if years > 0 and final > 0 else np.nan,
+        'volatility': std * math.sqrt(periods_per_year) * 100,
+        'sharpe': returns.mean() / std * math.sqrt(periods_per_year) if std > 0 else np.nan,
+        'max_drawdown': drawdown.min() * 100 if n else 0.0,
+        'trades': trades,
+        'hit_rate': (trade_log_returns > 0).mean() * 100 if trades else np.nan,
+        'turnover': simulation['turnover'].sum() / years if years > 0 else 0.0,
+        'exposure': in_market.mean() * 100 if n else 0.0
+    }
+
+
+def run_backtest(data, rules, combine='all', allow_short=False, cost_bps=5.0):
+    """
+    Backtest signal rules on one symbol's history
+
+    Args:
+        data (pandas.DataFrame): Bars with a Close column (High/Low used when present)
+        rules (dict): Rule name -> params
+        combine (str): 'all' or 'majority'
+        allow_short (bool): Allow short positions
+        cost_bps (float): Cost per unit of position change, in basis points
+
+    Returns:
+        dict: metrics, plus equity, benchmark (buy & hold equity), drawdown
+            and positions as Series indexed like data
+    """
+    bars = data.dropna(subset=['Close'])
+    close = bars['Close']
+    values = indicator_kernels.as_float64(close)
+    high = indicator_kernels.as_float64(bars['High']) if 'High' in bars else None
+    low = indicator_kernels.as_float64(bars['Low']) if 'Low' in bars else None
+    positions = build_positions(values, rules, combine, allow_short, high=high, low=low)
+    simulation = simulate(values, positions, cost_bps)
+    equity = pd.Series(simulation['equity'], index=close.index)
+
+    return {
+        'metrics': compute_metrics(simulation),
+        'equity': equity,
+        'benchmark': close / close.iloc[0],
+        'drawdown': equity / equity.cummax() - 1,
+        'positions': pd.Series(simulation['held'], index=close.index)
+    }
+
+
+def parameter_grid(grid):
+    """
+    Expand a sweep grid into rule parameter sets
+
+    Args:
+        grid (dict): Rule name -> {param: list of values}
+
+    Returns:
+        list: Dicts of rule name -> params, invalid combinations skipped
+    """
+    per_rule = []
+    for rule, params in grid.items():
+        names = list(params)
+        options = [
+            dict(zip(names, values))
+            for values in itertools.product(*(params[name] for name in names))
+        ]
+        per_rule.append([(rule, p) for p in options if valid_params(rule, {**SIGNAL_RULES[rule], **p})])
+
+    return [dict(choice) for choice in itertools.product(*per_rule)]
+
+
+def _param_columns(rules):
+    return {f"{rule}.{name}": value for rule, params in rules.items() for name, value in params.items()}
+
+
+def sweep_symbol(symbol, close, combos, combine='all', allow_short=False, cost_bps=5.0, high=None, low=None):
+    """
+    Evaluate every parameter combination on one symbol
+
+    Indicators are memoised per symbol, so combinations that share a window
+    reuse it.
+
+    Returns:
+        list: One dict per combination with symbol, parameters and metrics
+    """
+    close = indicator_kernels.as_float64(close)
+    valid = ~np.isnan(close)
+    if not valid.all():
+        close = close[valid]
+        high = high[valid] if high is not None else None
+        low = low[valid] if low is not None else None
+    if len(close) < 2:
+        return []
+
+    cache = {}
+    rows = []
+    for rules in combos:
+        positions = build_positions(close, rules, combine, allow_short, cache=cache, high=high, low=low)
+        metrics = compute_metrics(simulate(close, positions, cost_bps))
+        rows.append({'symbol': symbol, **_param_columns(rules), **metrics})
+    return rows
+
+
+def _sweep_task(task):
+    return sweep_symbol(*task)
+
+
+def run_sweep(bars_by_symbol, grid, combine='all', allow_short=False, cost_bps=5.0, max_workers=None):
+    """
+    Run a parameter sweep over many symbols across a process pool
+
+    Each worker receives one symbol's price arrays as float64 and evaluates
+    the whole grid on it.
+
+    Args:
+        bars_by_symbol (dict): Symbol -> bars with a Close column
+        grid (dict): Rule name -> {param: list of values}
+        combine (str): 'all' or 'majority'
+        allow_short (bool): Allow short positions
+        cost_bps (float): Cost per unit of position change, in basis points
+        max_workers (int): Worker processes (default: CPU count); 1 runs in-process
+
+    Returns:
+        pandas.DataFrame: One row per (symbol, combination)
+    """
+    combos = parameter_grid(grid)
+    tasks = [
+        (
+            symbol, bars['Close'].to_numpy(dtype=np.float64), combos, combine, allow_short, cost_bps,
+            bars['High'].to_numpy(dtype=np.float64) if 'High' in bars else None,
+            bars['Low'].to_numpy(dtype=np.float64) if 'Low' in bars else None
+        )
+        for symbol, bars in bars_by_symbol.items()
+        if bars is not None and not bars.empty
+    ]
+    if not tasks or not combos:
+        return pd.DataFrame()
+
+    workers = max_workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        results = map(_sweep_task, tasks)
+        return pd.DataFrame([row for rows in results for row in rows])
+
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_sweep_task, tasks, chunksize=chunksize)
+        return pd.DataFrame([row for rows in results for row in rows])
+
+
+def summarize_sweep(results, sort_by='sharpe'):
+    """
+    Rank parameter combinations by their median metrics across symbols
+
+    Args:
+        results (pandas.DataFrame): Output of run_sweep()
+        sort_by (str): Metric to rank by
+
+    Returns:
+        pandas.DataFrame: One row per combination with median metrics and symbol count
+    """
+    if results.empty:
+        return results
+
+    params = [col for col in results.columns if '.' in col]
+    summary = results.groupby(params)[METRIC_COLUMNS].median()
+    summary['symbols'] = results.groupby(params)['symbol'].nunique()
+    return summary.sort_values(sort_by, ascending=False).reset_index()
@@ -0,0 +1,191 @@
+import threading
+import time
+import pandas as pd
+
+# Regular US equity session, used to anchor intraday buckets
+SESSION_TIMEZONE = 'America/New_York'
+SESSION_OPEN = pd.Timedelta(hours=9, minutes=30)
+SESSION_CLOSE = pd.Timedelta(hours=16)
+
+# Intraday intervals that can be derived from 1-minute bars
+INTERVAL_MINUTES = {
+    '1m': 1,
+    '2m': 2,
+    '5m': 5,
+    '15m': 15,
+    '30m': 30,
+    '60m': 60,
+    '1h': 60,
+    '90m': 90
+}
+
+OHLCV_AGGREGATION = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum'
+}
+
+
+def to_session_time(index):
+    """Convert a DatetimeIndex to exchange time, assuming UTC when naive"""
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return index.tz_convert(SESSION_TIMEZONE)
+
+
+def bucket_labels(index, interval):
+    """
+    Get the bucket start for every timestamp
+
+    Intraday buckets are anchored at the session open, so 1h bars run
+    9:30-10:30, ..., 15:30-16:00 and never straddle two sessions. Daily
+    buckets are labelled with the session date.
+
+    Args:
+        index (pandas.DatetimeIndex): Timestamps in exchange time
+        interval (str): Target interval ('5m', '15m', '1h', '1d', ...)
+
+    Returns:
+        pandas.DatetimeIndex: Bucket start per timestamp
+    """
+    session_day = index.normalize()
+    if interval == '1d':
+        return session_day
+
+    width = pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+    session_open = session_day + SESSION_OPEN
+    return session_open + ((index - session_open) // width) * width
+
+
+def resample_bars(bars, interval):
+    """
+    Aggregate 1-minute OHLCV bars to a coarser interval
+
+    Args:
+        bars (pandas.DataFrame): 1-minute bars with Open/High/Low/Close/Volume
+        interval (str): Target interval ('5m', '15m', '1h', '1d', ...)
+
+    Returns:
+        pandas.DataFrame: Aggregated bars indexed by bucket start
+    """
+    if bars.empty:
+        return bars[list(OHLCV_AGGREGATION)]
+
+    index = to_session_time(bars.index)
+    time_of_day = index - index.normalize()
+    in_session = (time_of_day >= SESSION_OPEN) & (time_of_day < SESSION_CLOSE)
+
+    session_bars = bars[list(OHLCV_AGGREGATION)].set_axis(index)[in_session]
+    labels = bucket_labels(session_bars.index, interval)
+    return session_bars.groupby(labels).agg(OHLCV_AGGREGATION).rename_axis(bars.index.name)
+
+
+def latest_session(bars):
+    """
+    Keep only the bars of the most recent trading session
+
+    Args:
+        bars (pandas.DataFrame): Bars indexed in exchange time
+
+    Returns:
+        pandas.DataFrame: Bars whose session date is the last one present
+    """
+    if bars.empty:
+        return bars
+    session_day = bars.index.normalize()
+    return bars[session_day == session_day[-1]]
+
+
+class BarAggregator:
+    """
+    Store 1-minute bars per symbol and derive coarser timeframes locally
+
+    Resampled frames are cached per (symbol, interval). Appending bars only
+    recomputes buckets from the one containing the earliest new bar, so a
+    steady stream of fresh minutes touches just the trailing bucket.
+    """
+
+    def __init__(self, max_days=7):
+        self.max_days = max_days
+        self._lock = threading.Lock()
+        self._minute_bars = {}
+        self._resampled = {}
+        self._updated_at = {}
+
+    def append(self, symbol, bars):
+        """
+        Merge new 1-minute bars for a symbol
+
+        Args:
+            symbol (str): Stock symbol
+            bars (pandas.DataFrame): 1-minute OHLCV bars
+        """
+        if bars is None or bars.empty:
+            return
+
+        symbol = symbol.upper()
+        new_bars = bars[list(OHLCV_AGGREGATION)].set_axis(to_session_time(bars.index))
+
+        with self._lock:
+            existing = self._minute_bars.get(symbol)
+            if existing is None:
+                merged = new_bars.sort_index()
+            else:
+                merged = pd.concat([existing, new_bars])
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+
+            cutoff = merged.index[-1].normalize() - pd.Timedelta(days=self.max_days)
+            merged = merged[merged.index >= cutoff]
+            self._minute_bars[symbol] = merged
+            self._updated_at[symbol] = time.monotonic()
+
+            first_new = new_bars.index.min()
+            for (cached_symbol, interval), frame in list(self._resampled.items()):
+                if cached_symbol != symbol:
+                    continue
+                start = bucket_labels(pd.DatetimeIndex([first_new]), interval)[0]
+                tail = resample_bars(merged[merged.index >= start], interval)
+                head = frame[(frame.index < start) & (frame.index >= cutoff)]
+                self._resampled[(symbol, interval)] = pd.concat([head, tail])
+
+    def get_bars(self, symbol, interval='1m', session=None):
+        """
+        Get bars for a symbol at any supported interval
+
+        Args:
+            symbol (str): Stock symbol
+            interval (str): '1m' or a coarser interval ('5m', '15m', '1h', '1d', ...)
+            session (str): None for every stored session, 'latest' for the most recent one
+
+        Returns:
+            pandas.DataFrame: OHLCV bars (empty if nothing is stored)
+        """
+        if session not in (None, 'latest'):
+            raise ValueError(f"Unknown session '{session}'")
+
+        symbol = symbol.upper()
+        with self._lock:
+            minute_bars = self._minute_bars.get(symbol)
+            if minute_bars is None:
+                return pd.DataFrame(columns=list(OHLCV_AGGREGATION))
+            if interval == '1m':
+                bars = minute_bars
+            else:
+                key = (symbol, interval)
+                if key not in self._resampled:
+                    self._resampled[key] = resample_bars(minute_bars, interval)
+                bars = self._resampled[key]
+
+        return latest_session(bars) if session == 'latest' else bars
+
+    def seconds_since_update(self, symbol):
+        """Get seconds since bars for a symbol were last appended, or None"""
+        with self._lock:
+            updated_at = self._updated_at.get(symbol.upper())
+        return time.monotonic() - updated_at if updated_at is not None else None
+
+
+# Global instance
+bar_aggregator = BarAggregator()
@@ -2,6 +2,10 @@ import sqlite3
 from datetime import datetime, timedelta
 import json
 from database import DatabaseManager
+from utils.product_lookup import product_lookup
+
+# Movement types that add to stock; all others remove it
+INBOUND_MOVEMENT_TYPES = ('purchase', 'adjustment_in', 'return')
 
 class BusinessUtils:
     def __init__(self):
@@ -82,6 +86,22 @@ class BusinessUtils:
                 )
             """)
             
+            # Sales transaction items
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sales_transaction_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    transaction_id INTEGER NOT NULL,
+                    product_id INTEGER NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    unit_price REAL NOT NULL,
+                    discount_amount REAL DEFAULT 0,
+                    total_price REAL NOT NULL,
+                    unit_cost REAL,
+                    FOREIGN KEY (transaction_id) REFERENCES sales_transactions (id),
+                    FOREIGN KEY (product_id) REFERENCES products (id)
+                )
+            """)
+            
             # Customers
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS customers (
@@ -96,6 +116,16 @@ class BusinessUtils:
                 )
             """)
             
+            # Scans look products up by barcode
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_products_barcode ON products (barcode)
+            """)
+            
+            # Catalogue imports match suppliers by name
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_suppliers_name ON suppliers (name)
+            """)
+            
             # Stock movements
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS stock_movements (
@@ -114,31 +144,49 @@ class BusinessUtils:
             
             conn.commit()
     
-    def update_stock(self, product_id, quantity, movement_type, reference_number=None, notes=None, user_id=None):
-        """Update product stock and record movement"""
+    def update_stock(self, product_id, quantity, movement_type, reference_number=None, notes=None, user_id=None,
+                     conn=None):
+        """Update product stock and record movement
+
+        When conn is given the change joins the caller's transaction; the
+        caller commits and then invalidates the product in product_lookup.
+        Otherwise it is committed on its own connection.
+        """
+        if conn is not None:
+            self._apply_stock_change(conn.cursor(), product_id, quantity, movement_type,
+                                     reference_number, notes, user_id)
+            return
+
         with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Update product stock
-            if movement_type in ['purchase', 'adjustment_in', 'return']:
-                cursor.execute("""
-                    UPDATE products SET current_stock = current_stock + ?, 
-                    updated_at = CURRENT_TIMESTAMP WHERE id = ?
-                """, (quantity, product_id))
-            else:  # sale, adjustment_out, damage
-                cursor.execute("""
-                    UPDATE products SET current_stock = current_stock - ?, 
-                    updated_at = CURRENT_TIMESTAMP WHERE id = ?
-                """, (quantity, product_id))
-            
-            # Record stock movement
-            cursor.execute("""
-                INSERT INTO stock_movements (product_id, movement_type, quantity, 
-                                           reference_number, notes, user_id)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (product_id, movement_type, quantity, reference_number, notes, user_id))
-            
+            self._apply_stock_change(conn.cursor(), product_id, quantity, movement_type,
+                                     reference_number, notes, user_id)
             conn.commit()
+        product_lookup.invalidate([product_id])
+    
+    def _apply_stock_change(self, cursor, product_id, quantity, movement_type, reference_number, notes, user_id):
+        # Update product stock
+        if movement_type in INBOUND_MOVEMENT_TYPES:
+            cursor.execute("""
+                UPDATE products SET current_stock = current_stock + ?, 
+                updated_at = CURRENT_TIMESTAMP WHERE id = ?
+            """, (quantity, product_id))
+        else:  # sale, adjustment_out, damage
+            cursor.execute("""
+                UPDATE products SET current_stock = current_stock - ?, 
+                updated_at = CURRENT_TIMESTAMP WHERE id = ?
+            """, (quantity, product_id))
+        
+        # Record stock movement
+        cursor.execute("""
+            INSERT INTO stock_movements (product_id, movement_type, quantity, 
+                                       reference_number, notes, user_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (product_id, movement_type, quantity, reference_number, notes, user_id))
+    
+    def import_products(self, path, file_format=None, dry_run=False, progress=None):
+        """Bulk import products from a CSV or JSONL file (see utils.catalog_import)"""
+        from utils.catalog_import import catalog_importer
+        return catalog_importer.import_file(path, file_format, dry_run, progress)
     
     def get_low_stock_products(self):
         """Get products with low stock"""
@@ -155,27 +203,11 @@ class BusinessUtils:
     
     def find_product_by_barcode(self, barcode):
         """Find product by barcode"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT p.*, pc.name as category_name
-                FROM products p
-                LEFT JOIN product_categories pc ON p.category_id = pc.id
-                WHERE p.barcode = ?
-            """, (barcode,))
-            return cursor.fetchone()
+        return product_lookup.find_by_barcode(barcode)
     
     def find_product_by_sku(self, sku):
         """Find product by SKU"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT p.*, pc.name as category_name
-                FROM products p
-                LEFT JOIN product_categories pc ON p.category_id = pc.id
-                WHERE p.sku = ?
-            """, (sku,))
-            return cursor.fetchone()
+        return product_lookup.find_by_sku(sku)
 
 # Initialize business tables on import
 business_utils = BusinessUtils()
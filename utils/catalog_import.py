@@ -0,0 +1,342 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+from database import DatabaseManager
+from utils.product_lookup import product_lookup
+
+# Rows per executemany call while staging
+BATCH_SIZE = 5000
+
+# Rejected rows returned in the import summary
+MAX_REPORTED_ERRORS = 50
+
+# Columns accepted in an import file; category and supplier are given by name
+IMPORT_COLUMNS = [
+    'sku', 'name', 'description', 'category', 'barcode', 'cost_price', 'selling_price',
+    'current_stock', 'minimum_stock', 'maximum_stock', 'location', 'expiry_date', 'supplier', 'image_url'
+]
+
+# Columns copied from staging into products as is
+PRODUCT_COLUMNS = [
+    'sku', 'name', 'description', 'barcode', 'cost_price', 'selling_price',
+    'current_stock', 'minimum_stock', 'maximum_stock', 'location', 'expiry_date', 'image_url'
+]
+
+# Values new products get when the file leaves them empty, as in the products table
+PRODUCT_DEFAULTS = {'current_stock': 0, 'minimum_stock': 10, 'maximum_stock': 1000}
+
+# Columns existing products keep when the file leaves them empty; current_stock
+# is only an opening stock for new products, later changes go through movements
+UPDATE_COLUMNS = [column for column in PRODUCT_COLUMNS if column not in ('sku', 'current_stock')]
+
+# Checks on each row alone; first failing rule wins. Columns are staged with
+# numeric affinity, so text that does not parse as a number keeps typeof 'text'
+ROW_VALIDATION_SQL = """
+    UPDATE catalog_staging SET error = CASE
+        WHEN sku IS NULL THEN 'missing sku'
+        WHEN name IS NULL AND NOT EXISTS (SELECT 1 FROM products p WHERE p.sku = catalog_staging.sku)
+            THEN 'missing name'
+        WHEN cost_price IS NULL AND NOT EXISTS (SELECT 1 FROM products p WHERE p.sku = catalog_staging.sku)
+            THEN 'missing cost_price'
+        WHEN selling_price IS NULL AND NOT EXISTS (SELECT 1 FROM products p WHERE p.sku = catalog_staging.sku)
+            THEN 'missing selling_price'
+        WHEN cost_price IS NOT NULL AND (typeof(cost_price) NOT IN ('integer', 'real') OR cost_price < 0)
+            THEN 'invalid cost_price'
+        WHEN selling_price IS NOT NULL AND (typeof(selling_price) NOT IN ('integer', 'real') OR selling_price < 0)
+            THEN 'invalid selling_price'
+        WHEN current_stock IS NOT NULL AND (typeof(current_stock) != 'integer' OR current_stock < 0)
+            THEN 'invalid current_stock'
+        WHEN minimum_stock IS NOT NULL AND (typeof(minimum_stock) != 'integer' OR minimum_stock < 0)
+            THEN 'invalid minimum_stock'
+        WHEN maximum_stock IS NOT NULL AND (typeof(maximum_stock) != 'integer' OR maximum_stock < 0)
+            THEN 'invalid maximum_stock'
+        WHEN expiry_date IS NOT NULL AND date(expiry_date) IS NULL THEN 'invalid expiry_date'
+    END
+"""
+
+# Checks across rows, run in order after ROW_VALIDATION_SQL and only against
+# rows still valid, so the last valid line of a SKU wins and a rejected row
+# cannot get a valid one rejected
+CROSS_VALIDATION_SQL = [
+    """
+    UPDATE catalog_staging SET error = 'duplicate sku, superseded by a later line'
+    WHERE error IS NULL AND EXISTS (
+        SELECT 1 FROM catalog_staging later
+        WHERE later.sku = catalog_staging.sku AND later.line > catalog_staging.line AND later.error IS NULL
+    )
+    """,
+    # Clashing barcodes are collected before any row is marked
+    """
+    UPDATE catalog_staging SET error = 'barcode repeated for another sku in the file'
+    WHERE error IS NULL AND barcode IN (
+        SELECT barcode FROM catalog_staging
+        WHERE error IS NULL AND barcode IS NOT NULL
+        GROUP BY barcode
+        HAVING COUNT(DISTINCT sku) > 1
+    )
+    """,
+    """
+    UPDATE catalog_staging SET error = 'barcode already used by another product'
+    WHERE error IS NULL AND barcode IS NOT NULL AND EXISTS (
+        SELECT 1 FROM products p
+        WHERE p.barcode = catalog_staging.barcode AND p.sku != catalog_staging.sku
+    )
+    """
+]
+
+# Category and supplier ids by name for the valid staged rows
+STAGED_PRODUCTS = """
+    FROM catalog_staging s
+    LEFT JOIN product_categories pc ON pc.name = s.category
+    LEFT JOIN (SELECT name, MIN(id) as id FROM suppliers GROUP BY name) sup ON sup.name = s.supplier
+    WHERE s.error IS NULL
+"""
+
+UPDATE_PRODUCTS_SQL = f"""
+    UPDATE products SET
+        {', '.join(f'{column} = COALESCE(s.{column}, products.{column})' for column in UPDATE_COLUMNS)},
+        category_id = COALESCE(pc.id, products.category_id),
+        supplier_id = COALESCE(sup.id, products.supplier_id),
+        updated_at = CURRENT_TIMESTAMP
+    {STAGED_PRODUCTS}
+    AND products.sku = s.sku
+"""
+
+INSERT_PRODUCTS_SQL = f"""
+    INSERT INTO products ({', '.join(PRODUCT_COLUMNS)}, category_id, supplier_id)
+    SELECT {', '.join(
+        f'COALESCE(s.{column}, {PRODUCT_DEFAULTS[column]})' if column in PRODUCT_DEFAULTS else f's.{column}'
+        for column in PRODUCT_COLUMNS
+    )}, pc.id, sup.id
+    {STAGED_PRODUCTS}
+    AND NOT EXISTS (SELECT 1 FROM products p WHERE p.sku = s.sku)
+    ORDER BY s.line
+"""
+
+
+def _clean(value):
+    # Empty cells become NULL so they never overwrite existing values
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def read_rows(path, file_format=None):
+    """
+    Stream product rows from a CSV or JSONL file
+
+    Args:
+        path (str): File path
+        file_format (str): 'csv' or 'jsonl' (default: from the file extension)
+
+    Yields:
+        tuple: (line number, *IMPORT_COLUMNS values)
+    """
+    file_format = file_format or os.path.splitext(path)[1].lstrip('.').lower()
+    if file_format not in ('csv', 'jsonl'):
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if file_format == 'csv':
+            reader = csv.DictReader(f)
+            unknown = set(reader.fieldnames or []) - set(IMPORT_COLUMNS)
+            if 'sku' not in (reader.fieldnames or []):
+                raise ValueError("Import file has no sku column")
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+            for record in reader:
+                yield (reader.line_num, *(_clean(record.get(column)) for column in IMPORT_COLUMNS))
+        else:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                unknown = set(record) - set(IMPORT_COLUMNS)
+                if unknown:
+                    raise ValueError(f"Unknown columns on line {line_number}: {', '.join(sorted(unknown))}")
+                yield (line_number, *(_clean(record.get(column)) for column in IMPORT_COLUMNS))
+
+
+class CatalogImporter:
+    """
+    Bulk product import through a staging table
+
+    Rows are streamed into a temporary staging table in batches, validated
+    with set-based SQL, and the valid ones are upserted into products
+    together with any new categories and suppliers in a single
+    transaction. Only one batch is held in memory, so file size does not
+    matter; a failed import leaves the catalogue untouched.
+    """
+
+    def __init__(self):
+        self.db = DatabaseManager()
+
+    def _stage(self, cursor, rows, progress):
+        # Temporary table: private to this connection and dropped with it
+        cursor.execute("DROP TABLE IF EXISTS temp.catalog_staging")
+        cursor.execute("""
+            CREATE TEMP TABLE catalog_staging (
+                line INTEGER NOT NULL,
+                sku TEXT,
+                name TEXT,
+                description TEXT,
+                category TEXT,
+                barcode TEXT,
+                cost_price NUMERIC,
+                selling_price NUMERIC,
+                current_stock NUMERIC,
+                minimum_stock NUMERIC,
+                maximum_stock NUMERIC,
+                location TEXT,
+                expiry_date TEXT,
+                supplier TEXT,
+                image_url TEXT,
+                error TEXT
+            )
+        """)
+
+        insert = f"""
+            INSERT INTO catalog_staging (line, {', '.join(IMPORT_COLUMNS)})
+            VALUES (?, {', '.join('?' * len(IMPORT_COLUMNS))})
+        """
+        staged = 0
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                break
+            cursor.executemany(insert, batch)
+            staged += len(batch)
+            progress('staged', staged)
+
+        # Built after loading so the bulk insert does not maintain them
+        cursor.execute("CREATE INDEX temp.idx_catalog_staging_sku ON catalog_staging (sku, line)")
+        cursor.execute("CREATE INDEX temp.idx_catalog_staging_barcode ON catalog_staging (barcode)")
+        return staged
+
+    def import_rows(self, rows, dry_run=False, progress=None):
+        """
+        Validate and upsert product rows
+
+        Args:
+            rows (iterable): (line number, *IMPORT_COLUMNS values) tuples
+            dry_run (bool): Validate only, change nothing
+            progress (callable): Called as progress(stage, rows) as the import advances
+
+        Returns:
+            dict: rows, inserted, updated, rejected, new_categories,
+                new_suppliers and errors (the first rejected rows with reasons)
+        """
+        progress = progress or (lambda stage, count: None)
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                staged = self._stage(cursor, rows, progress)
+
+                # Staging ran in its own implicit transaction; the rest holds the write lock
+                conn.commit()
+                cursor.execute("BEGIN IMMEDIATE")
+
+                cursor.execute(ROW_VALIDATION_SQL)
+                for statement in CROSS_VALIDATION_SQL:
+                    cursor.execute(statement)
+                cursor.execute("SELECT COUNT(*) FROM catalog_staging WHERE error IS NOT NULL")
+                rejected = cursor.fetchone()[0]
+                progress('validated', staged)
+
+                cursor.execute("""
+                    SELECT line, sku, error FROM catalog_staging
+                    WHERE error IS NOT NULL ORDER BY line LIMIT ?
+                """, (MAX_REPORTED_ERRORS,))
+                errors = [dict(row) for row in cursor.fetchall()]
+
+                cursor.execute("""
+                    INSERT OR IGNORE INTO product_categories (name)
+                    SELECT DISTINCT category FROM catalog_staging
+                    WHERE error IS NULL AND category IS NOT NULL
+                """)
+                new_categories = cursor.rowcount
+
+                cursor.execute("""
+                    INSERT INTO suppliers (name)
+                    SELECT DISTINCT supplier FROM catalog_staging s
+                    WHERE s.error IS NULL AND s.supplier IS NOT NULL
+                    AND NOT EXISTS (SELECT 1 FROM suppliers sup WHERE sup.name = s.supplier)
+                """)
+                new_suppliers = cursor.rowcount
+
+                # Existing SKUs first, so freshly inserted rows are not updated again
+                cursor.execute(UPDATE_PRODUCTS_SQL)
+                updated = cursor.rowcount
+                cursor.execute(INSERT_PRODUCTS_SQL)
+                inserted = cursor.rowcount
+
+                if dry_run:
+                    conn.rollback()
+                else:
+                    conn.commit()
+                    progress('imported', staged - rejected)
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.execute("DROP TABLE IF EXISTS temp.catalog_staging")
+
+        if not dry_run:
+            product_lookup.invalidate()
+
+        return {
+            'rows': staged,
+            'inserted': inserted,
+            'updated': updated,
+            'rejected': rejected,
+            'new_categories': new_categories,
+            'new_suppliers': new_suppliers,
+            'errors': errors
+        }
+
+    def import_file(self, path, file_format=None, dry_run=False, progress=None):
+        """
+        Import products from a CSV or JSONL file
+
+        Args:
+            path (str): File path
+            file_format (str): 'csv' or 'jsonl' (default: from the file extension)
+            dry_run (bool): Validate only, change nothing
+            progress (callable): Called as progress(stage, rows) as the import advances
+
+        Returns:
+            dict: Summary from import_rows()
+        """
+        return self.import_rows(read_rows(path, file_format), dry_run, progress)
+
+
+# Global instance
+catalog_importer = CatalogImporter()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import products from a CSV or JSONL file")
+    parser.add_argument('path', help="CSV or JSONL file")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="File format (default: from the extension)")
+    parser.add_argument('--dry-run', action='store_true', help="Validate without changing the catalogue")
+    args = parser.parse_args()
+
+    def progress(stage, count):
+        print(f"{stage}: {count:,} rows", file=sys.stderr, flush=True)
+
+    summary = catalog_importer.import_file(args.path, args.format, args.dry_run, progress)
+    print(f"Rows: {summary['rows']:,}, inserted: {summary['inserted']:,}, updated: {summary['updated']:,}, "
+          f"rejected: {summary['rejected']:,}, new categories: {summary['new_categories']}, "
+          f"new suppliers: {summary['new_suppliers']}" + (" (dry run)" if args.dry_run else ""))
+    for error in summary['errors']:
+        print(f"  line {error['line']}: {error['sku'] or '-'}: {error['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import numpy as np
+import streamlit as st
+
+# Default gap between stacked subplots, as a fraction of the figure height
+VERTICAL_SPACING = 0.03
+
+
+def direction_colors(up, up_color='green', down_color='red'):
+    """
+    Get one marker color per bar in a single vectorized pass
+
+    Args:
+        up (numpy.ndarray): Boolean mask, True where the bar is drawn as up
+        up_color (str): Color for up bars
+        down_color (str): Color for down bars
+
+    Returns:
+        numpy.ndarray: Color per bar
+    """
+    return np.where(up, up_color, down_color)
+
+
+def candlestick_trace(data, name, **options):
+    """Build a candlestick trace from OHLC bars"""
+    return {
+        'type': 'candlestick',
+        'x': data.index,
+        'open': data['Open'].to_numpy(),
+        'high': data['High'].to_numpy(),
+        'low': data['Low'].to_numpy(),
+        'close': data['Close'].to_numpy(),
+        'name': name,
+        **options
+    }
+
+
+def line_trace(series, name, color=None, width=None, dash=None, **options):
+    """Build a line trace from a date-indexed series"""
+    line = {key: value for key, value in (('color', color), ('width', width), ('dash', dash)) if value is not None}
+    return {
+        'type': 'scatter',
+        'mode': 'lines',
+        'x': series.index,
+        'y': series.to_numpy(),
+        'name': name,
+        'line': line,
+        **options
+    }
+
+
+def bar_trace(series, name, colors=None, **options):
+    """Build a bar trace from a date-indexed series"""
+    trace = {'type': 'bar', 'x': series.index, 'y': series.to_numpy(), 'name': name, **options}
+    if colors is not None:
+        trace['marker'] = {'color': colors}
+    return trace
+
+
+def volume_trace(data, name='Volume', **options):
+    """Build a volume bar trace colored green/red by candle direction"""
+    colors = direction_colors(data['Close'].to_numpy() >= data['Open'].to_numpy())
+    return bar_trace(data['Volume'], name, colors=colors, **options)
+
+
+def histogram_trace(series, name, **options):
+    """Build a bar trace colored green/red by sign"""
+    return bar_trace(series, name, colors=direction_colors(series.to_numpy() >= 0), **options)
+
+
+def _axis_names(row):
+    suffix = '' if row == 1 else str(row)
+    return f'x{suffix}', f'y{suffix}', f'xaxis{suffix}', f'yaxis{suffix}'
+
+
+def build_figure(spec):
+    """
+    Build a Plotly figure dict from a declarative spec in one pass
+
+    Rows are stacked top to bottom and share the x axis, like
+    ``make_subplots(shared_xaxes=True)``, without constructing any Plotly
+    graph objects.
+
+    Args:
+        spec (dict): Figure spec with keys
+            rows (list): Row dicts with traces, and optionally height, title,
+                y_title, y_range and hlines (dicts with y, color, dash,
+                opacity, text)
+            title (str): Figure title
+            height (int): Figure height in pixels
+            x_title (str): Title of the bottom x axis
+            vertical_spacing (float): Gap between rows
+            layout (dict): Extra layout properties
+
+    Returns:
+        dict: Figure dict accepted by st.plotly_chart
+    """
+    rows = spec['rows']
+    spacing = spec.get('vertical_spacing', VERTICAL_SPACING) if len(rows) > 1 else 0
+    heights = np.array([row.get('height', 1.0) for row in rows], dtype=np.float64)
+    heights = heights / heights.sum() * (1 - spacing * (len(rows) - 1))
+
+    data = []
+    layout = {'annotations': [], 'shapes': []}
+    top = 1.0
+    for number, row in enumerate(rows, start=1):
+        x_ref, y_ref, x_axis, y_axis = _axis_names(number)
+        bottom = max(top - heights[number - 1], 0.0)
+        last_row = number == len(rows)
+
+        layout[x_axis] = {
+            'anchor': y_ref,
+            'domain': [0.0, 1.0],
+            'rangeslider': {'visible': False},
+            'showticklabels': last_row
+        }
+        if number > 1:
+            layout[x_axis]['matches'] = 'x'
+        if last_row and spec.get('x_title'):
+            layout[x_axis]['title'] = {'text': spec['x_title']}
+
+        layout[y_axis] = {'anchor': x_ref, 'domain': [bottom, top]}
+        if row.get('y_title'):
+            layout[y_axis]['title'] = {'text': row['y_title']}
+        if row.get('y_range'):
+            layout[y_axis]['range'] = row['y_range']
+
+        if row.get('title'):
+            layout['annotations'].append({
+                'text': row['title'], 'x': 0.5, 'xref': 'paper', 'xanchor': 'center',
+                'y': top, 'yref': 'paper', 'yanchor': 'bottom',
+                'showarrow': False, 'font': {'size': 16}
+            })
+
+        for hline in row.get('hlines', []):
+            layout['shapes'].append({
+                'type': 'line', 'xref': f'{x_ref} domain', 'x0': 0, 'x1': 1,
+                'yref': y_ref, 'y0': hline['y'], 'y1': hline['y'],
+                'line': {'color': hline.get('color'), 'dash': hline.get('dash', 'dash')},
+                'opacity': hline.get('opacity', 1.0)
+            })
+            if hline.get('text'):
+                layout['annotations'].append({
+                    'text': hline['text'], 'x': 1, 'xref': f'{x_ref} domain', 'xanchor': 'right',
+                    'y': hline['y'], 'yref': y_ref, 'yanchor': 'bottom', 'showarrow': False
+                })
+
+        for trace in row['traces']:
+            data.append({**trace, 'xaxis': x_ref, 'yaxis': y_ref})
+
+        top = bottom - spacing
+
+    if spec.get('title'):
+        layout['title'] = {'text': spec['title']}
+    if spec.get('height'):
+        layout['height'] = spec['height']
+    layout.update(spec.get('layout', {}))
+
+    return {'data': data, 'layout': layout}
+
+
+def data_version(data):
+    """
+    Get a cheap fingerprint of a bar frame
+
+    Changes when bars are appended, the window shifts or the last bar updates.
+
+    Args:
+        data (pandas.DataFrame): OHLCV bars
+
+    Returns:
+        tuple: Hashable version key
+    """
+    if data is None or data.empty:
+        return (0,)
+    return (len(data), str(data.index[0]), str(data.index[-1]), float(data['Close'].iloc[-1]))
+
+
+@st.cache_data(ttl=300, max_entries=100, show_spinner=False)
+def cached_figure(chart, symbol, period, indicators, version, _build):
+    """
+    Get a figure dict, building it only on a cache miss
+
+    Args:
+        chart (str): Name of the chart, so different charts never share entries
+        symbol (str): Stock symbol
+        period (str): Data period
+        indicators (tuple): Hashable description of the indicators and options shown
+        version (tuple): Data version from data_version()
+        _build (callable): Builds the figure dict (not hashed)
+
+    Returns:
+        dict: Figure dict accepted by st.plotly_chart
+    """
+    return _build()
+
+
+@st.cache_data(ttl=300, max_entries=100, show_spinner=False)
+def cached_indicators(symbol, period, spec, version, _compute):
+    """
+    Get computed indicators, running the computation only on a cache miss
+
+    Args:
+        symbol (str): Stock symbol
+        period (str): Data period
+        spec (str): Hashable description of the indicators requested
+        version (tuple): Data version from data_version()
+        _compute (callable): Computes the indicators (not hashed)
+
+    Returns:
+        object: Result of _compute()
+    """
+    return _compute()
@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+# Plot area width the downsampling targets; one line point per pixel is
+# already more than the browser can show
+CHART_PIXEL_WIDTH = 1200
+MAX_LINE_POINTS = CHART_PIXEL_WIDTH
+
+# Candles need a few pixels each to stay legible
+MAX_CANDLES = CHART_PIXEL_WIDTH // 4
+
+
+def lttb_indices(y, n_out):
+    """
+    Pick the points that best preserve a line's shape (Largest-Triangle-Three-Buckets)
+
+    Bars are evenly spaced, so positions are used as the x axis.
+
+    Args:
+        y (numpy.ndarray): Values without NaNs
+        n_out (int): Number of points to keep
+
+    Returns:
+        numpy.ndarray: Sorted positions of the kept points
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(n, dtype=np.float64)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    anchor = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[i + 1] = anchor
+
+    return selected
+
+
+def downsample_series(series, n_out=MAX_LINE_POINTS):
+    """
+    Downsample a line trace with LTTB
+
+    Args:
+        series (pandas.Series): Line values indexed by date
+        n_out (int): Maximum number of points
+
+    Returns:
+        pandas.Series: At most n_out points, NaNs dropped
+    """
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+    return series.iloc[lttb_indices(series.to_numpy(), n_out)]
+
+
+def downsample_frame(frame, by, n_out=MAX_LINE_POINTS):
+    """
+    Downsample several aligned lines using the points LTTB picks for one of them
+
+    Keeps paired traces such as Bollinger bands or MACD/signal on the same x values.
+
+    Args:
+        frame (pandas.DataFrame): Lines as columns
+        by (str): Column that drives point selection
+        n_out (int): Maximum number of points
+
+    Returns:
+        pandas.DataFrame: At most n_out rows
+    """
+    frame = frame.dropna()
+    if len(frame) <= n_out:
+        return frame
+    return frame.iloc[lttb_indices(frame[by].to_numpy(), n_out)]
+
+
+def aggregate_ohlc(data, n_out=MAX_CANDLES):
+    """
+    Merge consecutive bars into at most n_out candles
+
+    Each candle keeps the first open, highest high, lowest low, last close
+    and summed volume of its bucket, labelled with the bucket's first date.
+
+    Args:
+        data (pandas.DataFrame): OHLCV bars
+        n_out (int): Maximum number of candles
+
+    Returns:
+        pandas.DataFrame: Aggregated OHLCV bars
+    """
+    n = len(data)
+    if n <= n_out:
+        return data
+
+    bucket_size = -(-n // n_out)
+    buckets = np.arange(n) // bucket_size
+    aggregation = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last'}
+    if 'Volume' in data.columns:
+        aggregation['Volume'] = 'sum'
+
+    candles = data.groupby(buckets).agg(aggregation)
+    candles.index = data.index[::bucket_size]
+    return candles
+
+
+def _index_timestamp(value, index):
+    timestamp = pd.Timestamp(value)
+    if index.tz is not None and timestamp.tz is None:
+        timestamp = timestamp.tz_localize(index.tz)
+    return timestamp
+
+
+def slice_range(data, start=None, end=None):
+    """
+    Get the full-resolution slice of a frame for a zoomed view
+
+    Args:
+        data (pandas.DataFrame or pandas.Series): Data indexed by date
+        start: First date to keep (inclusive), or None
+        end: Last date to keep (inclusive, whole day), or None
+
+    Returns:
+        Same type as data
+    """
+    mask = np.ones(len(data), dtype=bool)
+    if start is not None:
+        mask &= data.index >= _index_timestamp(start, data.index)
+    if end is not None:
+        mask &= data.index < _index_timestamp(end, data.index).normalize() + pd.Timedelta(days=1)
+    return data[mask]
@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.market_snapshot import download_history
+from utils.risk_analytics import closes_version
+
+# Symbols per batched history download
+DOWNLOAD_CHUNK = 200
+
+# Fewest overlapping returns for a pair to get a correlation
+MIN_OVERLAP = 20
+
+# Rolling correlation is evaluated every ROLLING_STEP bars
+ROLLING_STEP = 5
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_closes(symbols, period="1y"):
+    """
+    Get daily closes for many symbols with batched downloads
+
+    Args:
+        symbols (tuple): Stock symbols
+        period (str): History period
+
+    Returns:
+        pandas.DataFrame: Closes with one column per symbol that has data
+    """
+    symbols = list(symbols)
+    history = {}
+    for start in range(0, len(symbols), DOWNLOAD_CHUNK):
+        history.update(download_history(symbols[start:start + DOWNLOAD_CHUNK], period=period))
+    if not history:
+        return pd.DataFrame()
+    return pd.DataFrame({symbol: bars['Close'] for symbol, bars in history.items()}).sort_index()
+
+
+def pairwise_correlation(returns, min_overlap=MIN_OVERLAP):
+    """
+    Pearson correlation of every column pair over the rows where both are present
+
+    Missing values are masked rather than dropped row-wise, and all pairs come
+    from five matrix products instead of a loop over pairs.
+
+    Args:
+        returns (numpy.ndarray): (days, symbols) returns with NaN for missing
+        min_overlap (int): Pairs with fewer shared rows get NaN
+
+    Returns:
+        numpy.ndarray: (symbols, symbols) correlation matrix
+    """
+    mask = ~np.isnan(returns)
+    values = np.where(mask, returns, 0.0)
+    weights = mask.astype(np.float64)
+
+    counts = weights.T @ weights
+    sums = values.T @ weights
+    squares = (values * values).T @ weights
+    products = values.T @ values
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = products - sums * sums.T / counts
+        variance_x = squares - sums * sums / counts
+        variance_y = variance_x.T
+        corr = covariance / np.sqrt(variance_x * variance_y)
+    corr[counts < min_overlap] = np.nan
+    np.clip(corr, -1, 1, out=corr)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def cluster_order(corr):
+    """
+    Order symbols so that correlated ones sit together
+
+    Average-linkage agglomerative clustering on the distance sqrt((1 - corr) / 2),
+    with Lance-Williams updates on one distance matrix; the leaf order of
+    the resulting tree is returned.
+
+    Args:
+        corr (numpy.ndarray): Correlation matrix (NaN treated as 0)
+
+    Returns:
+        list: Column positions in clustered order
+    """
+    n = len(corr)
+    if n < 3:
+        return list(range(n))
+
+    distance = np.sqrt(np.clip((1 - np.nan_to_num(corr, nan=0.0)) / 2, 0, None))
+    np.fill_diagonal(distance, np.inf)
+    sizes = np.ones(n)
+    members = {i: [i] for i in range(n)}
+    active = np.ones(n, dtype=bool)
+
+    for _ in range(n - 1):
+        flat = np.argmin(distance)
+        a, b = divmod(flat, n)
+        if a > b:
+            a, b = b, a
+
+        # Merge b into a; the new row is the size-weighted mean of both
+        merged = (distance[a] * sizes[a] + distance[b] * sizes[b]) / (sizes[a] + sizes[b])
+        distance[a] = merged
+        distance[:, a] = merged
+        distance[a, a] = np.inf
+        distance[b] = np.inf
+        distance[:, b] = np.inf
+
+        sizes[a] += sizes[b]
+        members[a] = members[a] + members.pop(b)
+        active[b] = False
+
+    return members[int(np.flatnonzero(active)[0])]
+
+
+def rolling_average_correlation(returns, window, step=ROLLING_STEP, min_overlap=MIN_OVERLAP):
+    """
+    Mean off-diagonal correlation over a sliding window
+
+    Args:
+        returns (numpy.ndarray): (days, symbols) returns with NaN for missing
+        window (int): Window length in bars
+        step (int): Bars between evaluations
+
+    Returns:
+        tuple: (end positions, mean pairwise correlation at each)
+    """
+    n, k = returns.shape
+    ends = np.arange(window, n + 1, step)
+    if len(ends) and ends[-1] != n:
+        ends = np.append(ends, n)
+    upper = np.triu_indices(k, 1)
+    averages = np.array([
+        np.nanmean(pairwise_correlation(returns[end - window:end], min(min_overlap, window))[upper])
+        if k > 1 else np.nan
+        for end in ends
+    ])
+    return ends, averages
+
+
+def correlation_analysis(closes, window=63):
+    """
+    Full-window and rolling correlation analysis of a close matrix
+
+    Args:
+        closes (pandas.DataFrame): Daily closes, one column per symbol
+        window (int): Rolling window in bars
+
+    Returns:
+        dict: symbols (clustered order), correlation (full window), recent
+            (last window), rolling (mean pairwise correlation), pairs (ranked
+            pair table), window and observations, or None
+    """
+    closes = closes.dropna(axis=1, thresh=MIN_OVERLAP + 1)
+    if closes.shape[1] < 2:
+        return None
+
+    prices = closes.to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = prices[1:] / prices[:-1] - 1
+
+    corr = pairwise_correlation(returns)
+    order = cluster_order(corr)
+    symbols = [closes.columns[i] for i in order]
+    ordered = corr[np.ix_(order, order)]
+
+    window = min(window, len(returns))
+    recent = pairwise_correlation(returns[-window:], min(MIN_OVERLAP, window))[np.ix_(order, order)]
+
+    ends, averages = rolling_average_correlation(returns, window)
+
+    upper = np.triu_indices(len(symbols), 1)
+    pairs = pd.DataFrame({
+        'symbol_a': np.asarray(symbols)[upper[0]],
+        'symbol_b': np.asarray(symbols)[upper[1]],
+        'correlation': ordered[upper],
+        'recent_correlation': recent[upper]
+    }).dropna(subset=['correlation'])
+    pairs['change'] = pairs['recent_correlation'] - pairs['correlation']
+
+    return {
+        'symbols': symbols,
+        'correlation': pd.DataFrame(ordered, index=symbols, columns=symbols),
+        'recent': pd.DataFrame(recent, index=symbols, columns=symbols),
+        'rolling': pd.Series(averages, index=closes.index[ends]),
+        'pairs': pairs.sort_values('correlation', ascending=False).reset_index(drop=True),
+        'window': window,
+        'observations': len(returns)
+    }
+
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def cached_analysis(symbols, window, data_key, _closes):
+    """
+    Memoize an analysis per (symbol set, window, data version)
+
+    Args:
+        symbols (tuple): Sorted symbols analysed
+        window (int): Rolling window
+        data_key (tuple): closes_version() of the close matrix
+        _closes (pandas.DataFrame): Close matrix (not hashed)
+
+    Returns:
+        dict: Output of correlation_analysis()
+    """
+    return correlation_analysis(_closes, window)
+
+
+def analyze_symbols(symbols, period="1y", window=63):
+    """
+    Run the correlation analysis for any number of symbols
+
+    Args:
+        symbols (list): Stock symbols
+        period (str): History period
+        window (int): Rolling window in bars
+
+    Returns:
+        dict: Output of correlation_analysis() plus 'missing' symbols, or None
+    """
+    symbols = tuple(sorted({symbol.upper() for symbol in symbols if symbol}))
+    if len(symbols) < 2:
+        return None
+
+    closes = cached_closes(symbols, period)
+    if closes.empty:
+        return None
+
+    analysis = cached_analysis(symbols, window, closes_version(closes), closes)
+    if analysis is None:
+        return None
+    return {**analysis, 'missing': [symbol for symbol in symbols if symbol not in analysis['symbols']]}
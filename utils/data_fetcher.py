@@ -2,6 +2,7 @@ import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 import streamlit as st
+from utils.bar_aggregator import bar_aggregator
 
 class DataFetcher:
     def __init__(self):
@@ -84,6 +85,9 @@ class DataFetcher:
             
             if data.empty:
                 return None
+            
+            # Keep the minute bars so coarser timeframes can be derived locally
+            bar_aggregator.append(symbol, data)
                 
             latest = data.iloc[-1]
             previous_close = ticker.info.get('previousClose', latest['Open'])
@@ -100,6 +104,30 @@ class DataFetcher:
             st.error(f"Error fetching real-time data for {symbol}: {str(e)}")
             return None
     
+    def get_intraday_bars(self, symbol, interval="5m", session=None):
+        """
+        Get intraday bars resampled locally from stored 1-minute bars
+        
+        Args:
+            symbol (str): Stock symbol
+            interval (str): Bar interval ('1m', '5m', '15m', '1h', '1d')
+            session (str): None for every stored session, 'latest' for the most recent one
+            
+        Returns:
+            pandas.DataFrame: OHLCV bars
+        """
+        age = bar_aggregator.seconds_since_update(symbol)
+        if age is None or age > self.cache_duration:
+            try:
+                # Seed up to a week of minutes once, then only top up the current day
+                period = "5d" if age is None else "1d"
+                data = yf.Ticker(symbol).history(period=period, interval="1m")
+                bar_aggregator.append(symbol, data)
+            except Exception as e:
+                st.error(f"Error fetching intraday data for {symbol}: {str(e)}")
+        
+        return bar_aggregator.get_bars(symbol, interval, session)
+    
     @st.cache_data(ttl=300)
     def search_symbols(_self, query):
         """
@@ -220,8 +248,8 @@ class DataFetcher:
         for name, symbol in indices.items():
             try:
                 ticker = yf.Ticker(symbol)
-                # Get 1 day data with 5-minute intervals for intraday chart
-                data = ticker.history(period="1d", interval="5m")
+                # Today's 5-minute bars for the intraday chart, derived from 1-minute bars
+                data = _self.get_intraday_bars(symbol, "5m", session='latest')
                 
                 # Also get basic info
                 info = ticker.info
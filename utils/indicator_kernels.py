@@ -0,0 +1,201 @@
+import math
+import numpy as np
+
+# Smoothing methods accepted by the RSI and ATR kernels
+SMOOTHING_METHODS = ('wilder', 'sma')
+
+# Largest block used by linear_recurrence; smaller decays get shorter blocks
+# so the in-block scaling by decay ** -k stays far from overflow
+RECURRENCE_BLOCK = 256
+
+
+def as_float64(values):
+    """Get values as a contiguous float64 array without copying when possible"""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def linear_recurrence(values, decay, initial=0.0, scale=1.0):
+    """
+    Evaluate y[i] = decay * y[i-1] + scale * values[i] over a whole array
+
+    The series is split into fixed-size blocks. Every block is solved at once
+    with a scaled cumulative sum, and only the carry between blocks is
+    propagated in Python, so the loop runs len(values) / block times.
+
+    Args:
+        values (numpy.ndarray): float64 input terms
+        decay (float): Multiplier applied to the previous output, 0 <= decay <= 1
+        initial (float): Output before the first element
+        scale (float): Multiplier applied to every input term
+
+    Returns:
+        numpy.ndarray: Output array, same length as values
+    """
+    n = len(values)
+    if n == 0:
+        return np.empty(0)
+    if decay <= 0:
+        return values * scale
+
+    block = RECURRENCE_BLOCK
+    if decay < 1:
+        block = max(1, min(block, int(300 / -math.log(decay))))
+    blocks = -(-n // block)
+
+    # One scratch buffer: every step below runs in place
+    partial = np.zeros(blocks * block)
+    np.multiply(values, scale, out=partial[:n])
+    partial = partial.reshape(blocks, block)
+
+    powers = decay ** np.arange(block)
+    partial /= powers
+    np.cumsum(partial, axis=1, out=partial)
+    partial *= powers
+
+    carries = np.empty(blocks)
+    carry = initial
+    block_decay = decay ** block
+    for i, last in enumerate(partial[:, -1]):
+        carries[i] = carry
+        carry = last + block_decay * carry
+
+    partial += carries[:, None] * (powers * decay)
+    return partial.ravel()[:n]
+
+
+def rolling_mean(values, window, start=0):
+    """
+    Simple moving average from a single cumulative sum
+
+    Args:
+        values (numpy.ndarray): float64 input
+        window (int): Window length
+        start (int): First position holding a valid input
+
+    Returns:
+        numpy.ndarray: Averages, NaN until the first full window
+    """
+    out = np.full(len(values), np.nan)
+    if len(values) - start < window:
+        return out
+
+    totals = np.empty(len(values) - start + 1)
+    totals[0] = 0.0
+    np.cumsum(values[start:], out=totals[1:])
+    valid = out[start + window - 1:]
+    np.subtract(totals[window:], totals[:-window], out=valid)
+    valid /= window
+    return out
+
+
+def wilder_average(values, window, start=0):
+    """
+    Wilder's smoothed moving average
+
+    Seeded with the simple average of the first window values, then
+    avg[i] = avg[i-1] + (values[i] - avg[i-1]) / window.
+
+    Args:
+        values (numpy.ndarray): float64 input
+        window (int): Smoothing period
+        start (int): First position holding a valid input
+
+    Returns:
+        numpy.ndarray: Averages, NaN until the seed position
+    """
+    out = np.full(len(values), np.nan)
+    seed_at = start + window - 1
+    if seed_at >= len(values):
+        return out
+
+    seed = values[start:seed_at + 1].mean()
+    out[seed_at] = seed
+    out[seed_at + 1:] = linear_recurrence(values[seed_at + 1:], 1 - 1 / window, seed, scale=1 / window)
+    return out
+
+
+def _smooth(values, window, method, start=0):
+    if method == 'wilder':
+        return wilder_average(values, window, start)
+    if method == 'sma':
+        return rolling_mean(values, window, start)
+    raise ValueError(f"Unknown smoothing method '{method}', expected one of {SMOOTHING_METHODS}")
+
+
+def rsi(close, window=14, method='wilder'):
+    """
+    Relative Strength Index
+
+    Args:
+        close (numpy.ndarray): Closing prices without gaps
+        window (int): Lookback period
+        method (str): 'wilder' (standard) or 'sma' (simple average of gains and losses)
+
+    Returns:
+        numpy.ndarray: RSI values, NaN during warm-up
+    """
+    close = as_float64(close)
+    n = len(close)
+    gains = np.zeros(n)
+    losses = np.zeros(n)
+    if n > 1:
+        np.subtract(close[1:], close[:-1], out=gains[1:])
+        np.negative(gains[1:], out=losses[1:])
+        np.maximum(gains, 0.0, out=gains)
+        np.maximum(losses, 0.0, out=losses)
+
+    # The first bar has no change, so averaging starts at position 1
+    avg_gain = _smooth(gains, window, method, start=1)
+    avg_loss = _smooth(losses, window, method, start=1)
+
+    # 100 - 100 / (1 + gain / loss) without the intermediate ratio
+    np.add(avg_gain, avg_loss, out=avg_loss)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(avg_gain, avg_loss, out=avg_gain)
+    avg_gain *= 100
+    return avg_gain
+
+
+def true_range(high, low, close):
+    """
+    True range: the largest of high - low and the gaps to the previous close
+
+    Args:
+        high (numpy.ndarray): High prices
+        low (numpy.ndarray): Low prices
+        close (numpy.ndarray): Closing prices
+
+    Returns:
+        numpy.ndarray: True range, high - low on the first bar
+    """
+    high = as_float64(high)
+    low = as_float64(low)
+    close = as_float64(close)
+
+    out = np.subtract(high, low)
+    if len(out) > 1:
+        gap = np.empty(len(out) - 1)
+        np.subtract(high[1:], close[:-1], out=gap)
+        np.abs(gap, out=gap)
+        np.maximum(out[1:], gap, out=out[1:])
+        np.subtract(low[1:], close[:-1], out=gap)
+        np.abs(gap, out=gap)
+        np.maximum(out[1:], gap, out=out[1:])
+    return out
+
+
+def atr(high, low, close, window=14, method='wilder'):
+    """
+    Average True Range
+
+    Args:
+        high (numpy.ndarray): High prices
+        low (numpy.ndarray): Low prices
+        close (numpy.ndarray): Closing prices
+        window (int): Lookback period
+        method (str): 'wilder' (standard) or 'sma'
+
+    Returns:
+        numpy.ndarray: ATR values, NaN during warm-up
+    """
+    return _smooth(true_range(high, low, close), window, method)
@@ -0,0 +1,131 @@
+import heapq
+import math
+import threading
+from datetime import datetime
+import streamlit as st
+from utils.market_snapshot import get_market_snapshot
+
+MOVER_KINDS = ('gainers', 'losers', 'volume')
+
+
+class TopK:
+    """Bounded min-heap holding the k highest-scoring symbols seen so far"""
+
+    def __init__(self, k):
+        self.k = k
+        self._heap = []
+        self._members = {}
+
+    def push(self, symbol, score, payload=None):
+        """
+        Offer a symbol to the heap in O(log k)
+
+        Args:
+            symbol (str): Stock symbol
+            score (float): Ranking score, higher is better
+            payload: Value returned alongside the symbol
+        """
+        if score is None or math.isnan(score):
+            return
+
+        if symbol in self._members:
+            # Re-scored member: rebuild the k-sized heap in place
+            self._members[symbol] = (score, payload)
+            self._heap = [(s, sym) for sym, (s, _) in self._members.items()]
+            heapq.heapify(self._heap)
+            return
+
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (score, symbol))
+        elif score > self._heap[0][0]:
+            _, evicted = heapq.heapreplace(self._heap, (score, symbol))
+            del self._members[evicted]
+        else:
+            return
+        self._members[symbol] = (score, payload)
+
+    def items(self):
+        """Get (symbol, score, payload) tuples, best first"""
+        return sorted(
+            ((symbol, score, payload) for symbol, (score, payload) in self._members.items()),
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+
+def mover_scores(quote):
+    """Get the ranking score of a quote for each mover kind"""
+    return {
+        'gainers': quote.get('percent_change'),
+        'losers': -quote['percent_change'] if quote.get('percent_change') is not None else None,
+        'volume': quote.get('volume_ratio')
+    }
+
+
+class MarketMovers:
+    """
+    Top-k gainers, losers and volume spikes maintained incrementally
+
+    Quotes stream in chunk by chunk during a universe scan and are pushed
+    into bounded heaps, so memory stays O(k) whatever the universe size.
+    Readers see the heaps of the last completed scan; until the first scan
+    completes they see the scan in flight.
+    """
+
+    def __init__(self, k=10):
+        self.k = k
+        self._lock = threading.Lock()
+        self._building = self._new_heaps()
+        self._published = None
+        self.updated_at = None
+
+    def _new_heaps(self):
+        return {kind: TopK(self.k) for kind in MOVER_KINDS}
+
+    def update(self, quotes):
+        """
+        Feed a batch of quotes into the running scan
+
+        Args:
+            quotes (dict): Quotes keyed by symbol
+        """
+        with self._lock:
+            for symbol, quote in quotes.items():
+                for kind, score in mover_scores(quote).items():
+                    self._building[kind].push(symbol, score, quote)
+
+    def publish(self):
+        """Publish the running scan and start a new one"""
+        with self._lock:
+            self._published = {kind: heap.items() for kind, heap in self._building.items()}
+            self._building = self._new_heaps()
+            self.updated_at = datetime.now()
+
+    def get_movers(self, kind, limit=None):
+        """
+        Get the current top movers
+
+        Args:
+            kind (str): 'gainers', 'losers' or 'volume'
+            limit (int): Maximum number of quotes to return (default: k)
+
+        Returns:
+            list: Quote dicts, best first
+        """
+        limit = min(limit or self.k, self.k)
+        with self._lock:
+            if self._published is not None:
+                items = self._published[kind]
+            else:
+                items = self._building[kind].items()
+        return [payload for _, _, payload in items[:limit]]
+
+
+@st.cache_resource
+def get_market_movers():
+    """Get the process-wide movers tracker, fed by the market snapshot's universe scan"""
+    snapshot = get_market_snapshot()
+    movers = MarketMovers()
+    movers.update(snapshot.get_universe_quotes())
+    snapshot.add_quote_listener(movers.update, movers.publish)
+    return movers
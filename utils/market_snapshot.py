@@ -0,0 +1,323 @@
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+import yfinance as yf
+import streamlit as st
+from utils.stock_symbols import StockSymbolFetcher
+from utils.bar_aggregator import bar_aggregator
+
+# Fixed universe served from memory to the Dashboard and Market Overview pages
+DASHBOARD_INDICES = {
+    'S&P 500 (SPY)': 'SPY',
+    'NASDAQ (QQQ)': 'QQQ',
+    'DOW (DIA)': 'DIA',
+    'VIX': '^VIX'
+}
+
+MARKET_INDICES = {
+    'S&P 500': '^GSPC',
+    'NASDAQ': '^IXIC',
+    'DOW': '^DJI',
+    'Russell 2000': '^RUT',
+    'VIX': '^VIX'
+}
+
+SECTOR_ETFS = {
+    'Technology': 'XLK',
+    'Healthcare': 'XLV',
+    'Financials': 'XLF',
+    'Energy': 'XLE',
+    'Consumer Discretionary': 'XLY',
+    'Utilities': 'XLU',
+    'Real Estate': 'XLRE',
+    'Materials': 'XLB',
+    'Industrials': 'XLI',
+    'Consumer Staples': 'XLP',
+    'Communication': 'XLC'
+}
+
+def download_history(symbols, period="5d", interval="1d"):
+    """
+    Download bars for many symbols with a single batched request
+
+    Args:
+        symbols (list): Stock symbols
+        period (str): Period for data
+        interval (str): Bar interval
+
+    Returns:
+        dict: Dictionary with symbol as key and OHLCV DataFrame as value
+    """
+    if not symbols:
+        return {}
+
+    data = yf.download(
+        list(symbols),
+        period=period,
+        interval=interval,
+        group_by='ticker',
+        auto_adjust=True,
+        threads=True,
+        progress=False
+    )
+
+    if data is None or data.empty:
+        return {}
+
+    history = {}
+    if isinstance(data.columns, pd.MultiIndex):
+        available = set(data.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol in available:
+                frame = data[symbol].dropna(how='all')
+                if not frame.empty:
+                    history[symbol] = frame
+    elif len(symbols) == 1:
+        frame = data.dropna(how='all')
+        if not frame.empty:
+            history[symbols[0]] = frame
+
+    return history
+
+
+def load_universe():
+    """
+    Load the symbol universe with sector codes, excluding ETFs
+
+    Returns:
+        list: Symbol dicts with at least 'symbol' and 'sector'
+    """
+    symbols = StockSymbolFetcher().get_all_symbols()
+    return [s for s in symbols if s.get('symbol') and s.get('sector') and s['sector'] != 'ETF']
+
+
+def build_quote(symbol, data):
+    """
+    Build a quote dict from daily bars
+
+    Args:
+        symbol (str): Stock symbol
+        data (pandas.DataFrame): Daily OHLCV bars, oldest first
+
+    Returns:
+        dict: Quote data or None when no bars are available
+    """
+    if data is None or data.empty:
+        return None
+
+    latest = data.iloc[-1]
+    price = latest['Close']
+    previous_close = data['Close'].iloc[-2] if len(data) > 1 else latest['Open']
+    if pd.isna(price) or pd.isna(previous_close) or previous_close == 0:
+        return None
+
+    change = price - previous_close
+    avg_volume = data['Volume'].iloc[:-1].mean() if len(data) > 1 else None
+    volume_ratio = latest['Volume'] / avg_volume if avg_volume else None
+    return {
+        'symbol': symbol,
+        'price': price,
+        'open': latest['Open'],
+        'previous_close': previous_close,
+        'change': change,
+        'percent_change': (change / previous_close) * 100,
+        'volume': latest['Volume'],
+        'avg_volume': avg_volume,
+        'volume_ratio': volume_ratio,
+        'timestamp': data.index[-1]
+    }
+
+
+class MarketSnapshot:
+    """In-memory market snapshot refreshed on a schedule by a background thread"""
+
+    def __init__(self, refresh_interval=60, universe_interval=300, chunk_size=200):
+        self.refresh_interval = refresh_interval
+        self.universe_interval = universe_interval
+        self.chunk_size = chunk_size
+        self.symbols = sorted(
+            set(DASHBOARD_INDICES.values())
+            | set(MARKET_INDICES.values())
+            | set(SECTOR_ETFS.values())
+        )
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._quotes = {}
+        self._universe = None
+        self._universe_quotes = {}
+        self._universe_scanned_at = None
+        self._jobs = []
+        self._quote_listeners = []
+        self.updated_at = None
+        self.universe_updated_at = None
+
+    def refresh(self):
+        """Download the fixed universe in two batched requests and swap it in"""
+        daily = download_history(self.symbols, period="5d")
+        intraday = download_history(list(MARKET_INDICES.values()), period="1d", interval="1m")
+        for symbol, bars in intraday.items():
+            bar_aggregator.append(symbol, bars)
+
+        quotes = {}
+        for symbol, data in daily.items():
+            quote = build_quote(symbol, data)
+            if quote:
+                quotes[symbol] = quote
+
+        with self._lock:
+            # Keep the last good values for symbols that failed this round
+            self._quotes = {**self._quotes, **quotes}
+            self.updated_at = datetime.now()
+
+    def get_universe(self):
+        """Get the cached symbol universe, loading it on first use"""
+        if self._universe is None:
+            self._universe = load_universe()
+        return self._universe
+
+    def add_quote_listener(self, on_quotes, on_complete=None):
+        """
+        Subscribe to universe quotes as each chunk of the scan arrives
+
+        Args:
+            on_quotes (callable): Called with a dict of quotes keyed by symbol
+            on_complete (callable): Called without arguments when a scan finishes
+        """
+        with self._lock:
+            self._quote_listeners.append((on_quotes, on_complete))
+
+    def scan_universe(self):
+        """Refresh daily quotes for the whole symbol universe chunk by chunk"""
+        symbols = [s['symbol'] for s in self.get_universe()]
+        for start in range(0, len(symbols), self.chunk_size):
+            if self._stop_event.is_set():
+                return
+            chunk = symbols[start:start + self.chunk_size]
+            try:
+                # A month of bars gives the average volume behind volume_ratio
+                history = download_history(chunk, period="1mo")
+            except Exception:
+                continue
+
+            quotes = {}
+            for symbol, data in history.items():
+                quote = build_quote(symbol, data)
+                if quote:
+                    quotes[symbol] = quote
+
+            with self._lock:
+                self._universe_quotes.update(quotes)
+                listeners = list(self._quote_listeners)
+            for on_quotes, _ in listeners:
+                on_quotes(quotes)
+
+        self._universe_scanned_at = time.monotonic()
+        self.universe_updated_at = datetime.now()
+        with self._lock:
+            listeners = list(self._quote_listeners)
+        for _, on_complete in listeners:
+            if on_complete:
+                on_complete()
+
+    def register_job(self, job, interval=300):
+        """
+        Register a callable to run on the refresh thread
+
+        Args:
+            job (callable): Called without arguments
+            interval (int): Minimum seconds between runs
+        """
+        with self._lock:
+            self._jobs.append({'job': job, 'interval': interval, 'last_run': None})
+
+    def _run_due_work(self):
+        scanned_at = self._universe_scanned_at
+        if scanned_at is None or time.monotonic() - scanned_at >= self.universe_interval:
+            try:
+                self.scan_universe()
+            except Exception:
+                pass
+
+        with self._lock:
+            jobs = list(self._jobs)
+        for entry in jobs:
+            last_run = entry['last_run']
+            if last_run is not None and time.monotonic() - last_run < entry['interval']:
+                continue
+            try:
+                entry['job']()
+            except Exception:
+                pass
+            entry['last_run'] = time.monotonic()
+
+    def _run(self):
+        self._run_due_work()
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:
+                pass
+            self._run_due_work()
+
+    def start(self):
+        """Start the background refresh thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="market-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop_event.set()
+
+    def get_quote(self, symbol):
+        """Get the latest snapshot quote for a symbol"""
+        with self._lock:
+            return self._quotes.get(symbol)
+
+    def get_quotes(self, symbols):
+        """Get snapshot quotes for the symbols that have data"""
+        with self._lock:
+            return {symbol: self._quotes[symbol] for symbol in symbols if symbol in self._quotes}
+
+    def get_universe_quotes(self):
+        """Get a copy of the latest daily quotes for the symbol universe"""
+        with self._lock:
+            return dict(self._universe_quotes)
+
+    def get_market_indices(self):
+        """
+        Get major market indices in the same shape as DataFetcher.get_market_indices
+
+        Returns:
+            dict: Market indices data
+        """
+        indices_data = {}
+        with self._lock:
+            for name, symbol in MARKET_INDICES.items():
+                quote = self._quotes.get(symbol)
+                if not quote:
+                    continue
+                indices_data[name] = {
+                    'symbol': symbol,
+                    'price': quote['price'],
+                    'change': quote['change'],
+                    'percent_change': quote['percent_change'],
+                    'data': bar_aggregator.get_bars(symbol, '5m', session='latest')
+                }
+        return indices_data
+
+
+@st.cache_resource
+def get_market_snapshot():
+    """Get the process-wide market snapshot shared by every session"""
+    snapshot = MarketSnapshot()
+    try:
+        snapshot.refresh()
+    except Exception:
+        pass
+    snapshot.start()
+    return snapshot
@@ -0,0 +1,234 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.risk_analytics import load_closes, holdings_version, closes_version
+
+SIMULATION_METHODS = {
+    'bootstrap': 'Historical Bootstrap',
+    'gbm': 'Geometric Brownian Motion'
+}
+
+# Percentiles drawn as the fan chart bands
+FAN_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Memory budget for one chunk's (paths x days x assets) log returns
+CHUNK_BYTES = 32 * 1024 * 1024
+
+# Portfolio value is tracked as log(value / starting value) in fixed bins,
+# so chunks merge by adding counts and no path is kept
+LOG_RANGE = (-3.0, 3.0)
+HISTOGRAM_BINS = 4000
+
+
+def chunk_size(horizon, assets, budget=CHUNK_BYTES):
+    """Number of paths whose log returns fit in the memory budget"""
+    return max(1, budget // (horizon * max(assets, 1) * 8))
+
+
+def gbm_parameters(log_returns):
+    """
+    Fit per-day drift and correlated shock loadings from historical log returns
+
+    Args:
+        log_returns (numpy.ndarray): (days, assets) daily log returns
+
+    Returns:
+        tuple: (drift vector, Cholesky factor of the covariance)
+    """
+    cov = np.atleast_2d(np.cov(log_returns, rowvar=False))
+    # Tiny ridge keeps the factorisation stable for nearly collinear holdings
+    cov = cov + np.eye(len(cov)) * 1e-12
+    return log_returns.mean(axis=0), np.linalg.cholesky(cov)
+
+
+def simulate_chunk(method, model, start_values, paths, horizon, seed):
+    """
+    Simulate a chunk of portfolio paths and bin their values per day
+
+    Args:
+        method (str): 'bootstrap' or 'gbm'
+        model (tuple): ('bootstrap') historical log returns, or ('gbm') drift and Cholesky factor
+        start_values (numpy.ndarray): Current value of each position
+        paths (int): Paths in this chunk
+        horizon (int): Trading days to simulate
+        seed (numpy.random.SeedSequence): Seed for this chunk
+
+    Returns:
+        tuple: (day x bin counts, sum of values per day)
+    """
+    rng = np.random.default_rng(seed)
+    if method == 'bootstrap':
+        history = model[0]
+        log_returns = history[rng.integers(0, len(history), size=(paths, horizon))]
+    else:
+        drift, cholesky = model
+        log_returns = rng.standard_normal((paths, horizon, len(drift)))
+        log_returns = log_returns @ cholesky.T
+        log_returns += drift
+
+    # Asset growth factors -> portfolio value per path and day
+    np.cumsum(log_returns, axis=1, out=log_returns)
+    np.exp(log_returns, out=log_returns)
+    values = log_returns @ start_values
+    del log_returns
+
+    total = start_values.sum()
+    log_ratio = np.log(values / total)
+    low, high = LOG_RANGE
+    bins = ((log_ratio - low) * (HISTOGRAM_BINS / (high - low))).astype(np.int64)
+    np.clip(bins, 0, HISTOGRAM_BINS - 1, out=bins)
+    bins += np.arange(horizon) * HISTOGRAM_BINS
+    counts = np.bincount(bins.ravel(), minlength=horizon * HISTOGRAM_BINS).reshape(horizon, HISTOGRAM_BINS)
+    return counts, values.sum(axis=0)
+
+
+def _simulate_task(task):
+    return simulate_chunk(*task)
+
+
+def histogram_percentiles(counts, percentiles):
+    """
+    Read percentiles off per-day histograms
+
+    Args:
+        counts (numpy.ndarray): (days, bins) path counts
+        percentiles (tuple): Percentiles in [0, 100]
+
+    Returns:
+        numpy.ndarray: (days, len(percentiles)) log(value / start) at each percentile
+    """
+    cumulative = np.cumsum(counts, axis=1)
+    targets = cumulative[:, -1:] * (np.asarray(percentiles, dtype=np.float64) / 100)
+    positions = np.stack([(cumulative < targets[:, [i]]).sum(axis=1) for i in range(len(percentiles))], axis=1)
+    low, high = LOG_RANGE
+    width = (high - low) / HISTOGRAM_BINS
+    return low + (positions + 0.5) * width
+
+
+def run_simulation(closes, shares, method='bootstrap', paths=10000, horizon=252, seed=None, max_workers=None):
+    """
+    Simulate future portfolio value from historical daily closes
+
+    Paths are generated in chunks sized to CHUNK_BYTES. Each chunk gets its own
+    child of one SeedSequence, so a seed gives the same result for any worker
+    count.
+
+    Args:
+        closes (pandas.DataFrame): Aligned closes with a column per holding
+        shares (dict): Symbol -> shares held
+        method (str): 'bootstrap' resamples whole historical days (keeping
+            cross-asset correlation); 'gbm' draws correlated normal shocks
+        paths (int): Number of simulated paths
+        horizon (int): Trading days to simulate
+        seed (int): Random seed
+        max_workers (int): Worker processes (default: CPU count); 1 runs in-process
+
+    Returns:
+        dict: fan (percentile values and mean per future date), start_value,
+            terminal percentiles, probability_of_loss and expected_value, or None
+    """
+    if method not in SIMULATION_METHODS:
+        raise ValueError(f"Unknown simulation method '{method}'")
+
+    symbols = [symbol for symbol in shares if symbol in closes.columns]
+    if not symbols or len(closes) < 3:
+        return None
+
+    prices = closes[symbols].to_numpy(dtype=np.float64)
+    log_returns = np.diff(np.log(prices), axis=0)
+    start_values = prices[-1] * np.array([shares[symbol] for symbol in symbols], dtype=np.float64)
+    start_value = start_values.sum()
+    if start_value <= 0:
+        return None
+
+    model = (log_returns,) if method == 'bootstrap' else gbm_parameters(log_returns)
+
+    size = chunk_size(horizon, len(symbols))
+    chunks = [min(size, paths - start) for start in range(0, paths, size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = [(method, model, start_values, count, horizon, child) for count, child in zip(chunks, seeds)]
+
+    counts = np.zeros((horizon, HISTOGRAM_BINS), dtype=np.int64)
+    value_sums = np.zeros(horizon)
+    workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        results = map(_simulate_task, tasks)
+        for chunk_counts, chunk_sums in results:
+            counts += chunk_counts
+            value_sums += chunk_sums
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk_counts, chunk_sums in executor.map(_simulate_task, tasks):
+                counts += chunk_counts
+                value_sums += chunk_sums
+
+    levels = histogram_percentiles(counts, FAN_PERCENTILES)
+    dates = pd.bdate_range(pd.Timestamp(closes.index[-1]).tz_localize(None), periods=horizon + 1)
+    fan = pd.DataFrame(
+        start_value * np.exp(np.vstack([np.zeros(len(FAN_PERCENTILES)), levels])),
+        index=dates,
+        columns=[f"p{p}" for p in FAN_PERCENTILES]
+    )
+    fan['mean'] = np.concatenate([[start_value], value_sums / paths])
+
+    low, high = LOG_RANGE
+    loss_bins = int((0 - low) * HISTOGRAM_BINS / (high - low))
+    return {
+        'fan': fan,
+        'start_value': start_value,
+        'expected_value': fan['mean'].iloc[-1],
+        'terminal': fan.iloc[-1][[f"p{p}" for p in FAN_PERCENTILES]].to_dict(),
+        'probability_of_loss': counts[-1, :loss_bins].sum() / paths * 100,
+        'paths': paths,
+        'horizon': horizon,
+        'method': method,
+        'history_days': len(log_returns)
+    }
+
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def cached_simulation(holdings_key, data_key, method, paths, horizon, seed, _closes):
+    """
+    Get a simulation, rerunning only when the holdings, bars or settings change
+
+    Args:
+        holdings_key (tuple): holdings_version() of the holdings
+        data_key (tuple): closes_version() of the close matrix
+        method (str): Simulation method
+        paths (int): Number of paths
+        horizon (int): Trading days
+        seed (int): Random seed
+        _closes (pandas.DataFrame): Close matrix (not hashed)
+
+    Returns:
+        dict: Output of run_simulation()
+    """
+    return run_simulation(_closes, dict(holdings_key), method, paths, horizon, seed)
+
+
+def simulate_portfolio(data_fetcher, shares, method='bootstrap', paths=10000, horizon=252, period="2y", seed=42):
+    """
+    Run a Monte Carlo simulation for the holdings from cached daily closes
+
+    Args:
+        data_fetcher: DataFetcher instance
+        shares (dict): Symbol -> shares held
+        method (str): 'bootstrap' or 'gbm'
+        paths (int): Number of paths
+        horizon (int): Trading days to simulate
+        period (str): History the model is fitted on
+        seed (int): Random seed
+
+    Returns:
+        dict: Output of run_simulation(), or None
+    """
+    shares = {symbol: count for symbol, count in shares.items() if count > 0}
+    if not shares:
+        return None
+
+    closes = load_closes(data_fetcher, list(shares), period)
+    if closes.empty:
+        return None
+    return cached_simulation(holdings_version(shares), closes_version(closes), method, paths, horizon, seed, closes)
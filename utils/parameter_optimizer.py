@@ -0,0 +1,483 @@
+"""
+Grid / random search over indicator parameters
+
+Price arrays for every symbol are packed into one shared memory block that
+worker processes attach to by name, so tasks only carry a symbol position and
+a chunk of parameter combinations. Results are stored per (rule, symbol,
+history, parameters) and reused on later runs over the same bars.
+
+Run from the repository root:
+    python -m utils.parameter_optimizer --rule rsi --symbols AAPL MSFT --period 5y [--search random --samples 100]
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from database import DatabaseManager
+from utils.backtesting import (
+    METRIC_COLUMNS, RULE_LABELS, build_positions, compute_metrics, simulate, summarize_sweep, valid_params
+)
+
+# Parameter ranges searched around the default indicator settings
+SEARCH_SPACES = {
+    'rsi': {'window': list(range(5, 31)), 'oversold': [20, 25, 30, 35], 'overbought': [65, 70, 75, 80]},
+    'macd_crossover': {'fast': list(range(6, 19, 2)), 'slow': list(range(20, 41, 2)), 'signal': list(range(5, 14))},
+    'bollinger': {'window': list(range(10, 51, 5)), 'num_std': [1.0, 1.5, 2.0, 2.5, 3.0]},
+    'stochastic': {
+        'k_window': list(range(5, 29, 3)), 'd_window': [2, 3, 4, 5], 'oversold': [10, 20, 30], 'overbought': [70, 80, 90]
+    },
+    'sma_trend': {'fast': [5, 10, 15, 20, 30, 50], 'slow': [50, 75, 100, 150, 200]}
+}
+
+SEARCH_METHODS = ('grid', 'random')
+
+# Combinations evaluated per worker task; neighbouring combinations share
+# indicator windows, so each task memoises them
+TASK_SIZE = 64
+
+# Rows of the shared price block
+PRICE_FIELDS = ('Close', 'High', 'Low')
+
+
+def _normalize(value):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def params_key(params):
+    """Get a canonical JSON key for a parameter set (2 and 2.0 map to the same key)"""
+    return json.dumps({name: _normalize(value) for name, value in params.items()}, sort_keys=True)
+
+
+def grid_combinations(rule, space=None):
+    """
+    Expand a search space into every valid parameter set
+
+    Args:
+        rule (str): Rule name
+        space (dict): Param -> list of values (default: SEARCH_SPACES[rule])
+
+    Returns:
+        list: Parameter dicts
+    """
+    space = space or SEARCH_SPACES[rule]
+    names = list(space)
+    shape = [len(space[name]) for name in names]
+    combos = []
+    for position in np.ndindex(*shape):
+        params = {name: space[name][i] for name, i in zip(names, position)}
+        if valid_params(rule, params):
+            combos.append(params)
+    return combos
+
+
+def random_combinations(rule, samples, space=None, seed=None):
+    """
+    Draw distinct valid parameter sets uniformly from a search space
+
+    Positions are drawn without replacement and decoded from the flat index,
+    so the full grid is never materialised.
+
+    Args:
+        rule (str): Rule name
+        samples (int): Number of parameter sets wanted
+        space (dict): Param -> list of values (default: SEARCH_SPACES[rule])
+        seed (int): Random seed
+
+    Returns:
+        list: Up to samples parameter dicts, in grid order
+    """
+    space = space or SEARCH_SPACES[rule]
+    names = list(space)
+    shape = tuple(len(space[name]) for name in names)
+    total = int(np.prod(shape))
+    rng = np.random.default_rng(seed)
+
+    # Draw extra positions so invalid combinations can be dropped
+    drawn = rng.choice(total, size=min(total, samples * 2), replace=False)
+    combos = []
+    for flat in np.sort(drawn):
+        position = np.unravel_index(flat, shape)
+        params = {name: space[name][i] for name, i in zip(names, position)}
+        if valid_params(rule, params):
+            combos.append(params)
+    if len(combos) > samples:
+        keep = np.sort(rng.choice(len(combos), size=samples, replace=False))
+        combos = [combos[i] for i in keep]
+    return combos
+
+
+class SharedPriceArrays:
+    """
+    Close/High/Low of many symbols packed into one shared memory block
+
+    Symbols are laid end to end along the second axis; offsets[i]:offsets[i + 1]
+    is symbol i. Missing highs and lows fall back to the close.
+    """
+
+    def __init__(self, bars_by_symbol):
+        frames = []
+        self.symbols = []
+        self.data_ends = []
+        for symbol, bars in bars_by_symbol.items():
+            if bars is None or bars.empty:
+                continue
+            bars = bars.dropna(subset=['Close'])
+            if len(bars) < 2:
+                continue
+            frames.append(bars)
+            self.symbols.append(symbol)
+            self.data_ends.append(str(bars.index[-1]))
+
+        self.offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+        np.cumsum([len(bars) for bars in frames], out=self.offsets[1:])
+        shape = (len(PRICE_FIELDS), int(self.offsets[-1]))
+
+        self._memory = shared_memory.SharedMemory(create=True, size=max(8, shape[0] * shape[1] * 8))
+        self.array = np.ndarray(shape, dtype=np.float64, buffer=self._memory.buf)
+        for i, bars in enumerate(frames):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            close = bars['Close'].to_numpy(dtype=np.float64)
+            self.array[0, start:end] = close
+            for row, field in enumerate(PRICE_FIELDS[1:], start=1):
+                values = bars[field].to_numpy(dtype=np.float64) if field in bars else close
+                self.array[row, start:end] = np.where(np.isnan(values), close, values)
+
+    @property
+    def name(self):
+        return self._memory.name
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    def release(self):
+        """Free the shared block; views into it must not be used afterwards"""
+        self.array = None
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+# Set in each worker by _attach_prices
+_worker_memory = None
+_worker_prices = None
+
+
+def _attach_prices(name, shape):
+    global _worker_memory, _worker_prices
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    _worker_prices = np.ndarray(shape, dtype=np.float64, buffer=_worker_memory.buf)
+
+
+def evaluate_combinations(prices, start, end, rule, combos, allow_short=False, cost_bps=5.0):
+    """
+    Backtest parameter sets of one rule on one symbol's slice of a price block
+
+    Args:
+        prices (numpy.ndarray): (3, n) Close/High/Low block
+        start (int): First bar of the symbol
+        end (int): End of the symbol's bars
+        rule (str): Rule name
+        combos (list): Parameter dicts
+        allow_short (bool): Allow short positions
+        cost_bps (float): Cost per unit of position change, in basis points
+
+    Returns:
+        list: Metrics dicts, one per combination
+    """
+    close, high, low = prices[0, start:end], prices[1, start:end], prices[2, start:end]
+    cache = {}
+    results = []
+    for params in combos:
+        positions = build_positions(close, {rule: params}, allow_short=allow_short, cache=cache, high=high, low=low)
+        results.append(compute_metrics(simulate(close, positions, cost_bps)))
+    return results
+
+
+def _evaluate_task(task):
+    symbol_index, start, end, rule, combos, allow_short, cost_bps = task
+    return symbol_index, combos, evaluate_combinations(_worker_prices, start, end, rule, combos, allow_short, cost_bps)
+
+
+class ParameterOptimizer:
+    def __init__(self):
+        self.db = DatabaseManager()
+        self.init_optimizer_tables()
+
+    def init_optimizer_tables(self):
+        """Initialize the optimization results table"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            # One row per evaluated (rule, symbol, history, parameters)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS indicator_optimization_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    rule TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    data_end TEXT NOT NULL,
+                    allow_short BOOLEAN NOT NULL,
+                    cost_bps REAL NOT NULL,
+                    params TEXT NOT NULL,
+                    total_return REAL,
+                    cagr REAL,
+                    volatility REAL,
+                    sharpe REAL,
+                    max_drawdown REAL,
+                    trades INTEGER,
+                    hit_rate REAL,
+                    turnover REAL,
+                    exposure REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(rule, symbol, period, data_end, allow_short, cost_bps, params)
+                )
+            """)
+
+            conn.commit()
+
+    def load_stored_results(self, rule, symbols, data_ends, period, allow_short, cost_bps):
+        """
+        Get stored results that match the current bars of each symbol
+
+        Returns:
+            dict: (symbol, params key) -> metrics dict
+        """
+        stored = {}
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            for symbol, data_end in zip(symbols, data_ends):
+                cursor.execute(f"""
+                    SELECT params, {', '.join(METRIC_COLUMNS)}
+                    FROM indicator_optimization_results
+                    WHERE rule = ? AND symbol = ? AND period = ? AND data_end = ?
+                    AND allow_short = ? AND cost_bps = ?
+                """, (rule, symbol, period, data_end, bool(allow_short), float(cost_bps)))
+                for row in cursor.fetchall():
+                    stored[(symbol, row['params'])] = {
+                        column: np.nan if row[column] is None else row[column] for column in METRIC_COLUMNS
+                    }
+        return stored
+
+    def save_results(self, rule, period, allow_short, cost_bps, rows):
+        """
+        Store evaluated combinations
+
+        Args:
+            rows (list): Tuples of (symbol, data_end, params key, metrics dict)
+        """
+        if not rows:
+            return
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(f"""
+                INSERT OR REPLACE INTO indicator_optimization_results
+                (rule, symbol, period, data_end, allow_short, cost_bps, params, {', '.join(METRIC_COLUMNS)})
+                VALUES (?, ?, ?, ?, ?, ?, ?, {', '.join('?' * len(METRIC_COLUMNS))})
+            """, [
+                (rule, symbol, period, data_end, bool(allow_short), float(cost_bps), key,
+                 *(None if pd.isna(metrics[column]) else float(metrics[column]) for column in METRIC_COLUMNS))
+                for symbol, data_end, key, metrics in rows
+            ])
+            conn.commit()
+
+    def optimize(self, bars_by_symbol, rule, search='grid', samples=50, period='5y', allow_short=False,
+                 cost_bps=5.0, space=None, seed=None, max_workers=None, progress=None):
+        """
+        Evaluate indicator parameter sets over many symbols in parallel
+
+        Combinations already stored for the same bars are read back instead of
+        recomputed.
+
+        Args:
+            bars_by_symbol (dict): Symbol -> OHLC bars
+            rule (str): Rule name from SEARCH_SPACES
+            search (str): 'grid' for every combination, 'random' for a sample
+            samples (int): Number of combinations for random search
+            period (str): History period the bars cover, part of the storage key
+            allow_short (bool): Allow short positions
+            cost_bps (float): Cost per unit of position change, in basis points
+            space (dict): Param -> list of values (default: SEARCH_SPACES[rule])
+            seed (int): Random seed for random search
+            max_workers (int): Worker processes (default: CPU count); 1 runs in-process
+            progress (callable): Called with (completed tasks, total tasks)
+
+        Returns:
+            pandas.DataFrame: One row per (symbol, combination) with "rule.param"
+                columns, metrics and a stored flag
+        """
+        if rule not in SEARCH_SPACES and space is None:
+            raise ValueError(f"Unknown rule '{rule}'")
+        if search not in SEARCH_METHODS:
+            raise ValueError(f"Unknown search method '{search}', expected one of {SEARCH_METHODS}")
+
+        if search == 'grid':
+            combos = grid_combinations(rule, space)
+        else:
+            combos = random_combinations(rule, samples, space, seed)
+        keys = [params_key(params) for params in combos]
+
+        with SharedPriceArrays(bars_by_symbol) as prices:
+            stored = self.load_stored_results(rule, prices.symbols, prices.data_ends, period, allow_short, cost_bps)
+
+            tasks = []
+            for i, symbol in enumerate(prices.symbols):
+                missing = [params for params, key in zip(combos, keys) if (symbol, key) not in stored]
+                for chunk_start in range(0, len(missing), TASK_SIZE):
+                    tasks.append((
+                        i, int(prices.offsets[i]), int(prices.offsets[i + 1]), rule,
+                        missing[chunk_start:chunk_start + TASK_SIZE], allow_short, cost_bps
+                    ))
+
+            computed = []
+            workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+            if workers <= 1:
+                for done, task in enumerate(tasks, start=1):
+                    index, start, end, _, chunk, _, _ = task
+                    computed.append((index, chunk, evaluate_combinations(
+                        prices.array, start, end, rule, chunk, allow_short, cost_bps
+                    )))
+                    if progress:
+                        progress(done, len(tasks))
+            else:
+                with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_attach_prices, initargs=(prices.name, prices.shape)
+                ) as executor:
+                    futures = [executor.submit(_evaluate_task, task) for task in tasks]
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        computed.append(future.result())
+                        if progress:
+                            progress(done, len(tasks))
+
+            new_rows = [
+                (prices.symbols[index], prices.data_ends[index], params_key(params), metrics)
+                for index, chunk, results in computed
+                for params, metrics in zip(chunk, results)
+            ]
+            self.save_results(rule, period, allow_short, cost_bps, new_rows)
+
+            fresh = {(symbol, key): metrics for symbol, _, key, metrics in new_rows}
+            rows = []
+            for symbol in prices.symbols:
+                for params, key in zip(combos, keys):
+                    was_stored = (symbol, key) in stored
+                    metrics = stored[(symbol, key)] if was_stored else fresh[(symbol, key)]
+                    rows.append({
+                        'symbol': symbol,
+                        **{f"{rule}.{name}": value for name, value in params.items()},
+                        **metrics,
+                        'stored': was_stored
+                    })
+
+        return pd.DataFrame(rows)
+
+    def get_best_params(self, rule, symbol=None, metric='sharpe', period=None, allow_short=None, cost_bps=None):
+        """
+        Get the stored parameter set with the best average metric
+
+        Only each symbol's latest data_end counts, so older runs over
+        shorter histories do not dilute the score.
+
+        Args:
+            rule (str): Rule name
+            symbol (str): Restrict to one symbol (default: all symbols)
+            metric (str): Metric column to maximise
+            period (str): Restrict to one history period
+            allow_short (bool): Restrict to runs with this short-selling setting
+            cost_bps (float): Restrict to runs with this trading cost
+
+        Returns:
+            dict: params, score and symbols, or None if nothing is stored
+        """
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric '{metric}'")
+
+        conditions = ["rule = ?"]
+        values = [rule]
+        if symbol:
+            conditions.append("symbol = ?")
+            values.append(symbol)
+        if period:
+            conditions.append("period = ?")
+            values.append(period)
+        if allow_short is not None:
+            conditions.append("allow_short = ?")
+            values.append(bool(allow_short))
+        if cost_bps is not None:
+            conditions.append("cost_bps = ?")
+            values.append(float(cost_bps))
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                WITH matching AS (
+                    SELECT * FROM indicator_optimization_results
+                    WHERE {' AND '.join(conditions)}
+                ),
+                latest AS (
+                    SELECT symbol, MAX(data_end) AS data_end FROM matching GROUP BY symbol
+                )
+                SELECT params, AVG({metric}) AS score, COUNT(DISTINCT symbol) AS symbols
+                FROM matching
+                JOIN latest USING (symbol, data_end)
+                WHERE {metric} IS NOT NULL
+                GROUP BY params
+                ORDER BY score DESC
+                LIMIT 1
+            """, values)
+            row = cursor.fetchone()
+
+        if row is None:
+            return None
+        return {'params': json.loads(row['params']), 'score': row['score'], 'symbols': row['symbols']}
+
+
+def main():
+    from utils.market_snapshot import download_history
+
+    parser = argparse.ArgumentParser(description="Search indicator parameters over stock histories")
+    parser.add_argument('--rule', choices=list(SEARCH_SPACES), required=True, help="Signal rule to optimise")
+    parser.add_argument('--symbols', nargs='+', required=True, help="Stock symbols")
+    parser.add_argument('--period', default='5y', help="History period to download")
+    parser.add_argument('--search', choices=SEARCH_METHODS, default='grid', help="Search method")
+    parser.add_argument('--samples', type=int, default=50, help="Combinations for random search")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for random search")
+    parser.add_argument('--allow-short', action='store_true', help="Allow short positions")
+    parser.add_argument('--cost-bps', type=float, default=5.0, help="Cost per trade in basis points")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--rank-by', choices=METRIC_COLUMNS, default='sharpe', help="Metric to rank by")
+    parser.add_argument('--top', type=int, default=20, help="Rows to print")
+    args = parser.parse_args()
+
+    symbols = sorted({symbol.upper() for symbol in args.symbols})
+    bars = download_history(symbols, period=args.period)
+    if not bars:
+        parser.error("No price history could be downloaded")
+
+    results = ParameterOptimizer().optimize(
+        bars, args.rule, search=args.search, samples=args.samples, period=args.period,
+        allow_short=args.allow_short, cost_bps=args.cost_bps, seed=args.seed, max_workers=args.workers,
+        progress=lambda done, total: print(f"\r{done}/{total} tasks", end="", flush=True)
+    )
+    print()
+    if results.empty:
+        print("No results")
+        return
+
+    print(f"{RULE_LABELS[args.rule]}: {len(results)} evaluations, {int(results['stored'].sum())} reused")
+    summary = summarize_sweep(results.drop(columns='stored'), sort_by=args.rank_by)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(summary.head(args.top).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+from collections import Counter
+from datetime import datetime
+from uuid import uuid4
+from database import DatabaseManager
+from utils.business_utils import business_utils
+from utils.product_lookup import product_lookup
+from utils.sales_rollups import sales_rollups
+
+# Transaction id prefix for till sales
+TRANSACTION_PREFIX = 'POS'
+
+
+def cart_line(product, quantity=1, unit_price=None, discount=0.0):
+    """
+    Build a cart line from a product row
+
+    Args:
+        product: Product row (sqlite3.Row or dict)
+        quantity (int): Units
+        unit_price (float): Price per unit (default: selling price)
+        discount (float): Line discount amount
+
+    Returns:
+        dict: Cart line
+    """
+    return {
+        'product_id': product['id'],
+        'sku': product['sku'],
+        'name': product['name'],
+        'quantity': int(quantity),
+        'unit_price': float(product['selling_price'] if unit_price is None else unit_price),
+        'discount': float(discount)
+    }
+
+
+def add_to_cart(cart, product, quantity=1, unit_price=None, discount=0.0):
+    """
+    Add units of a product to a cart, merging with an existing line at the same price
+
+    Args:
+        cart (list): Cart lines, modified in place
+
+    Returns:
+        list: The cart
+    """
+    line = cart_line(product, quantity, unit_price, discount)
+    for existing in cart:
+        if existing['product_id'] == line['product_id'] and existing['unit_price'] == line['unit_price']:
+            existing['quantity'] += line['quantity']
+            existing['discount'] += line['discount']
+            return cart
+    cart.append(line)
+    return cart
+
+
+def cart_totals(cart, discount=0.0, tax=0.0):
+    """
+    Totals of a cart
+
+    Args:
+        cart (list): Cart lines
+        discount (float): Order-level discount
+        tax (float): Tax amount
+
+    Returns:
+        dict: subtotal, discount (line + order), tax, total and items
+    """
+    subtotal = sum(line['quantity'] * line['unit_price'] for line in cart)
+    line_discounts = sum(line['discount'] for line in cart)
+    return {
+        'subtotal': subtotal,
+        'discount': line_discounts + discount,
+        'tax': tax,
+        'total': subtotal - line_discounts - discount + tax,
+        'items': sum(line['quantity'] for line in cart)
+    }
+
+
+def allocate_order_discount(cart, discount):
+    """
+    Spread an order-level discount over the cart lines by line value
+
+    Shares are rounded to cents; the rounding remainder goes to the most
+    valuable line so the shares add up to the order discount exactly.
+
+    Args:
+        cart (list): Cart lines
+        discount (float): Order-level discount
+
+    Returns:
+        list: Total discount per line (line discount plus its share), in cart order
+    """
+    line_discounts = [line['discount'] for line in cart]
+    if not discount or not cart:
+        return line_discounts
+
+    values = [line['quantity'] * line['unit_price'] - line['discount'] for line in cart]
+    total_value = sum(values)
+    if total_value > 0:
+        shares = [round(discount * value / total_value, 2) for value in values]
+    else:
+        shares = [0.0] * len(cart)
+    largest = max(range(len(cart)), key=lambda i: values[i])
+    shares[largest] = round(shares[largest] + discount - sum(shares), 2)
+
+    return [line_discount + share for line_discount, share in zip(line_discounts, shares)]
+
+
+class PointOfSale:
+    """
+    Till operations that write a whole sale in one transaction
+
+    Scans only touch the in-memory cart; checkout then writes the sale, its
+    lines and the stock movements together, so a failed sale leaves no
+    partial rows and stock never drifts from recorded sales.
+    """
+
+    def __init__(self):
+        self.db = DatabaseManager()
+
+    def resolve_codes(self, codes):
+        """
+        Look up many scanned barcodes or SKUs from the product index
+
+        Args:
+            codes (list): Scanned codes; repeats count as extra units
+
+        Returns:
+            tuple: (list of (product row, count) in scan order, list of unknown codes)
+        """
+        counts = Counter(code.strip() for code in codes if code and code.strip())
+        if not counts:
+            return [], []
+
+        products = product_lookup.find_many(counts)
+        found = [(products[code], count) for code, count in counts.items() if code in products]
+        missing = [code for code in counts if code not in products]
+        return found, missing
+
+    def scan_into_cart(self, cart, codes):
+        """
+        Add a batch of scanned codes to a cart
+
+        Returns:
+            list: Codes that matched no product
+        """
+        found, missing = self.resolve_codes(codes)
+        for product, count in found:
+            add_to_cart(cart, product, count)
+        return missing
+
+    def checkout(self, cart, cashier_id, payment_method, customer_id=None, discount=0.0, tax=0.0, notes=None):
+        """
+        Record a sale atomically
+
+        Stock is checked under the write lock, then the transaction, every
+        line (with its cost at sale time) and every stock movement are
+        committed together. Transaction ids embed the row id, so concurrent
+        tills can never collide.
+
+        Args:
+            cart (list): Cart lines
+            cashier_id (int): User making the sale
+            payment_method (str): Payment method
+            customer_id (int): Optional customer
+            discount (float): Order-level discount
+            tax (float): Tax amount
+            notes (str): Optional notes
+
+        Returns:
+            dict: transaction_id plus the cart totals
+
+        Raises:
+            ValueError: If the cart is empty or stock is insufficient
+        """
+        if not cart:
+            raise ValueError("Cart is empty")
+
+        quantities = Counter()
+        for line in cart:
+            quantities[line['product_id']] += line['quantity']
+        totals = cart_totals(cart, discount, tax)
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                product_ids = list(quantities)
+                cursor.execute(f"""
+                    SELECT id, name, current_stock, cost_price FROM products
+                    WHERE id IN ({', '.join('?' * len(product_ids))})
+                """, product_ids)
+                products = {row['id']: row for row in cursor.fetchall()}
+
+                for product_id, quantity in quantities.items():
+                    product = products.get(product_id)
+                    if product is None:
+                        raise ValueError(f"Product {product_id} no longer exists")
+                    if product['current_stock'] < quantity:
+                        raise ValueError(
+                            f"Insufficient stock for {product['name']}! Available: {product['current_stock']}"
+                        )
+
+                # Unique placeholder first, then the readable id derived from the row id
+                cursor.execute("""
+                    INSERT INTO sales_transactions
+                    (transaction_id, customer_id, total_amount, discount_amount, tax_amount,
+                     payment_method, cashier_id, notes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (uuid4().hex, customer_id, totals['total'], totals['discount'], totals['tax'],
+                      payment_method, cashier_id, notes))
+                sale_id = cursor.lastrowid
+                transaction_id = f"{TRANSACTION_PREFIX}{datetime.now().strftime('%Y%m%d')}-{sale_id:06d}"
+                cursor.execute("UPDATE sales_transactions SET transaction_id = ? WHERE id = ?",
+                               (transaction_id, sale_id))
+
+                # Lines carry their share of the order discount, so line revenue adds up to the sale
+                cursor.executemany("""
+                    INSERT INTO sales_transaction_items
+                    (transaction_id, product_id, quantity, unit_price, discount_amount, total_price, unit_cost)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (sale_id, line['product_id'], line['quantity'], line['unit_price'], line_discount,
+                     line['quantity'] * line['unit_price'] - line_discount,
+                     products[line['product_id']]['cost_price'])
+                    for line, line_discount in zip(cart, allocate_order_discount(cart, discount))
+                ])
+
+                for product_id, quantity in quantities.items():
+                    business_utils.update_stock(product_id, quantity, 'sale', transaction_id,
+                                                "Point of sale", cashier_id, conn=conn)
+
+                if customer_id is not None:
+                    cursor.execute("UPDATE customers SET last_purchase_date = CURRENT_TIMESTAMP WHERE id = ?",
+                                   (customer_id,))
+
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+        product_lookup.invalidate(list(quantities))
+        sales_rollups.refresh()
+        return {'transaction_id': transaction_id, **totals}
+
+
+# Global instance
+point_of_sale = PointOfSale()
@@ -0,0 +1,296 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.backtesting import TRADING_DAYS
+from utils.risk_analytics import load_closes, holdings_version, closes_version
+
+OPTIMIZATION_TARGETS = {
+    'min_variance': 'Minimum Variance',
+    'max_sharpe': 'Maximum Sharpe',
+    'risk_parity': 'Risk Parity'
+}
+
+RISK_FREE_RATE = 0.04
+
+FRONTIER_POINTS = 40
+
+# Frontier points are spread over worker processes from this many assets
+PARALLEL_MIN_ASSETS = 50
+
+SOLVER_MAX_ITERATIONS = 5000
+SOLVER_TOLERANCE = 1e-10
+
+
+def project_simplex(weights):
+    """
+    Project each row onto the long-only, fully invested simplex
+
+    Args:
+        weights (numpy.ndarray): (rows, assets) unconstrained weights
+
+    Returns:
+        numpy.ndarray: Rows that are >= 0 and sum to 1
+    """
+    sorted_desc = -np.sort(-weights, axis=1)
+    cumulative = np.cumsum(sorted_desc, axis=1) - 1
+    ranks = np.arange(1, weights.shape[1] + 1)
+    active = sorted_desc - cumulative / ranks > 0
+    last = weights.shape[1] - 1 - np.argmax(active[:, ::-1], axis=1)
+    theta = cumulative[np.arange(len(weights)), last] / (last + 1)
+    return np.maximum(weights - theta[:, None], 0)
+
+
+def solve_mean_variance(cov, mean, tradeoffs):
+    """
+    Minimise w'Σw - t·μ'w over the long-only simplex for many t at once
+
+    Accelerated projected gradient (FISTA) on a (points, assets) weight
+    matrix, so every frontier point advances in the same matrix products.
+
+    Args:
+        cov (numpy.ndarray): Annualised covariance
+        mean (numpy.ndarray): Annualised expected returns
+        tradeoffs (numpy.ndarray): Return tradeoff t per point (0 = minimum variance)
+
+    Returns:
+        numpy.ndarray: (points, assets) optimal weights
+    """
+    assets = len(mean)
+    step = 1 / (2 * np.linalg.eigvalsh(cov)[-1])
+    linear = np.outer(tradeoffs, mean)
+
+    weights = np.full((len(tradeoffs), assets), 1 / assets)
+    momentum = weights.copy()
+    t = 1.0
+    for _ in range(SOLVER_MAX_ITERATIONS):
+        gradient = 2 * momentum @ cov - linear
+        updated = project_simplex(momentum - step * gradient)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + ((t - 1) / t_next) * (updated - weights)
+        change = np.abs(updated - weights).max()
+        weights, t = updated, t_next
+        if change < SOLVER_TOLERANCE:
+            break
+    return weights
+
+
+def _solve_task(task):
+    return solve_mean_variance(*task)
+
+
+def risk_parity_weights(cov, iterations=SOLVER_MAX_ITERATIONS, tolerance=SOLVER_TOLERANCE):
+    """
+    Weights whose contributions to portfolio variance are equal
+
+    Multiplicative fixed-point updates w <- w * sqrt(target / contribution),
+    renormalised each step.
+
+    Args:
+        cov (numpy.ndarray): Covariance matrix
+
+    Returns:
+        numpy.ndarray: Long-only weights summing to 1
+    """
+    volatility = np.sqrt(np.diag(cov))
+    weights = 1 / volatility
+    weights /= weights.sum()
+    target = 1 / len(weights)
+    for _ in range(iterations):
+        contribution = weights * (cov @ weights)
+        contribution /= contribution.sum()
+        updated = weights * np.sqrt(target / contribution)
+        updated /= updated.sum()
+        if np.abs(updated - weights).max() < tolerance:
+            return updated
+        weights = updated
+    return weights
+
+
+def portfolio_statistics(weights, mean, cov, risk_free_rate=RISK_FREE_RATE):
+    """
+    Expected return, volatility and Sharpe ratio of one or many weight rows
+
+    Returns:
+        tuple: Arrays (return, volatility, sharpe), annualised
+    """
+    weights = np.atleast_2d(weights)
+    returns = weights @ mean
+    volatility = np.sqrt(np.einsum('ij,jk,ik->i', weights, cov, weights))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (returns - risk_free_rate) / volatility
+    return returns, volatility, sharpe
+
+
+def efficient_frontier(mean, cov, points=FRONTIER_POINTS, max_workers=None):
+    """
+    Long-only efficient frontier
+
+    Tradeoffs run from 0 (minimum variance) to where the highest-return asset
+    takes the whole portfolio. Large portfolios split the points over a
+    process pool.
+
+    Returns:
+        numpy.ndarray: (points, assets) weights ordered by increasing return
+    """
+    spread = mean.max() - mean.min()
+    if spread <= 0:
+        return solve_mean_variance(cov, mean, np.zeros(1))
+
+    scale = 2 * np.linalg.eigvalsh(cov)[-1] / spread
+    tradeoffs = np.concatenate([[0.0], np.geomspace(scale * 1e-3, scale * 10, points - 1)])
+
+    workers = min(max_workers or os.cpu_count() or 1, points)
+    if workers <= 1 or len(mean) < PARALLEL_MIN_ASSETS:
+        return solve_mean_variance(cov, mean, tradeoffs)
+
+    tasks = [(cov, mean, chunk) for chunk in np.array_split(tradeoffs, workers)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return np.vstack(list(executor.map(_solve_task, tasks)))
+
+
+def optimize_weights(closes, shares, risk_free_rate=RISK_FREE_RATE, points=FRONTIER_POINTS, max_workers=None):
+    """
+    Optimal weights and the efficient frontier for the current holdings
+
+    Args:
+        closes (pandas.DataFrame): Aligned closes with a column per holding
+        shares (dict): Symbol -> shares held
+        risk_free_rate (float): Annual risk-free rate for Sharpe
+        points (int): Frontier points
+        max_workers (int): Worker processes for the frontier
+
+    Returns:
+        dict: symbols, prices, current weights, targets (name -> weights),
+            statistics per portfolio and the frontier, or None
+    """
+    symbols = [symbol for symbol in shares if symbol in closes.columns]
+    if len(symbols) < 2 or len(closes) < 3:
+        return None
+
+    prices = closes[symbols].to_numpy(dtype=np.float64)
+    returns = prices[1:] / prices[:-1] - 1
+    mean = returns.mean(axis=0) * TRADING_DAYS
+    cov = np.cov(returns, rowvar=False) * TRADING_DAYS
+
+    values = prices[-1] * np.array([shares[symbol] for symbol in symbols], dtype=np.float64)
+    current = values / values.sum()
+
+    frontier = efficient_frontier(mean, cov, points, max_workers)
+    frontier_return, frontier_volatility, frontier_sharpe = portfolio_statistics(frontier, mean, cov, risk_free_rate)
+
+    targets = {
+        'min_variance': frontier[0],
+        'max_sharpe': frontier[int(np.nanargmax(frontier_sharpe))],
+        'risk_parity': risk_parity_weights(cov)
+    }
+
+    rows = []
+    for name, weights in [('current', current)] + list(targets.items()):
+        expected, volatility, sharpe = portfolio_statistics(weights, mean, cov, risk_free_rate)
+        rows.append({
+            'portfolio': name,
+            'expected_return': expected[0] * 100,
+            'volatility': volatility[0] * 100,
+            'sharpe': sharpe[0]
+        })
+
+    return {
+        'symbols': symbols,
+        'prices': prices[-1],
+        'current': current,
+        'targets': targets,
+        'statistics': pd.DataFrame(rows),
+        'frontier': pd.DataFrame({
+            'expected_return': frontier_return * 100,
+            'volatility': frontier_volatility * 100,
+            'sharpe': frontier_sharpe
+        }),
+        'assets': pd.DataFrame({
+            'symbol': symbols,
+            'expected_return': mean * 100,
+            'volatility': np.sqrt(np.diag(cov)) * 100
+        })
+    }
+
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def cached_optimization(holdings_key, data_key, risk_free_rate, _closes):
+    """
+    Get optimal weights, recomputing only when the holdings or bars change
+
+    Args:
+        holdings_key (tuple): holdings_version() of the holdings
+        data_key (tuple): closes_version() of the close matrix
+        risk_free_rate (float): Annual risk-free rate
+        _closes (pandas.DataFrame): Close matrix (not hashed)
+
+    Returns:
+        dict: Output of optimize_weights()
+    """
+    return optimize_weights(_closes, dict(holdings_key), risk_free_rate)
+
+
+def rebalance_trades(optimization, shares, target):
+    """
+    Trades that move the current holdings to a target allocation
+
+    Args:
+        optimization (dict): Output of optimize_weights()
+        shares (dict): Symbol -> shares held
+        target (str): Key of optimization['targets']
+
+    Returns:
+        pandas.DataFrame: One row per symbol with current and target weights,
+            shares to trade and trade value
+    """
+    symbols = optimization['symbols']
+    prices = optimization['prices']
+    held = np.array([shares[symbol] for symbol in symbols], dtype=np.float64)
+    total = (held * prices).sum()
+    weights = optimization['targets'][target]
+    target_shares = total * weights / prices
+    trade_shares = target_shares - held
+
+    trades = pd.DataFrame({
+        'symbol': symbols,
+        'current_weight': optimization['current'] * 100,
+        'target_weight': weights * 100,
+        'price': prices,
+        'current_shares': held,
+        'target_shares': target_shares,
+        'trade_shares': trade_shares,
+        'trade_value': trade_shares * prices
+    })
+    trades['action'] = np.where(trades['trade_shares'] > 0, 'buy', 'sell')
+    trades.loc[np.isclose(trades['trade_shares'], 0, atol=1e-4), 'action'] = 'hold'
+    return trades
+
+
+def holdings_shares(holdings):
+    """Get symbol -> shares from holding dicts, skipping closed positions"""
+    return {holding['symbol']: holding['shares'] for holding in holdings if holding['shares'] > 0}
+
+
+def optimize_holdings(data_fetcher, holdings, period="2y", risk_free_rate=RISK_FREE_RATE):
+    """
+    Optimise a set of holdings from cached daily closes
+
+    Args:
+        data_fetcher: DataFetcher instance
+        holdings (list): Holding dicts with symbol and shares, e.g. portfolio_data['holdings']
+        period (str): History used for expected returns and covariance
+        risk_free_rate (float): Annual risk-free rate
+
+    Returns:
+        tuple: (optimization dict or None, holdings dict)
+    """
+    shares = holdings_shares(holdings)
+    if len(shares) < 2:
+        return None, shares
+
+    closes = load_closes(data_fetcher, list(shares), period)
+    if closes.empty:
+        return None, shares
+    return cached_optimization(holdings_version(shares), closes_version(closes), risk_free_rate, closes), shares
@@ -0,0 +1,155 @@
+import threading
+import time
+from database import DatabaseManager
+
+# Seconds before a full reload picks up product changes made by other processes
+CACHE_TTL = 300
+
+PRODUCT_QUERY = """
+    SELECT p.*, pc.name as category_name
+    FROM products p
+    LEFT JOIN product_categories pc ON p.category_id = pc.id
+"""
+
+
+class ProductLookup:
+    """
+    In-memory barcode and SKU index over the products table
+
+    The whole catalogue is loaded once and kept in hash maps, so a scan is a
+    dict lookup instead of a connection and a join. Writers call
+    invalidate() with the products they changed after committing; a full
+    reload every CACHE_TTL seconds catches changes from other processes.
+    """
+
+    def __init__(self):
+        self.db = DatabaseManager()
+        self._lock = threading.Lock()
+        self._by_id = {}
+        self._by_barcode = {}
+        self._by_sku = {}
+        self._loaded_at = None
+
+    def warm(self):
+        """Load every product into the index"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(PRODUCT_QUERY)
+            products = [dict(row) for row in cursor.fetchall()]
+
+        by_id = {product['id']: product for product in products}
+        by_barcode = {product['barcode']: product for product in products if product['barcode']}
+        by_sku = {product['sku']: product for product in products}
+        with self._lock:
+            self._by_id, self._by_barcode, self._by_sku = by_id, by_barcode, by_sku
+            self._loaded_at = time.monotonic()
+
+    def ensure_warm(self):
+        """Load the index if it is empty or older than CACHE_TTL"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > CACHE_TTL:
+            self.warm()
+
+    def _store(self, product):
+        # Caller holds the lock; replaces any keys of the previous version
+        self._drop(product['id'])
+        self._by_id[product['id']] = product
+        self._by_sku[product['sku']] = product
+        if product['barcode']:
+            self._by_barcode[product['barcode']] = product
+
+    def _drop(self, product_id):
+        # Caller holds the lock
+        previous = self._by_id.pop(product_id, None)
+        if previous is None:
+            return
+        if self._by_sku.get(previous['sku']) is previous:
+            del self._by_sku[previous['sku']]
+        if previous['barcode'] and self._by_barcode.get(previous['barcode']) is previous:
+            del self._by_barcode[previous['barcode']]
+
+    def _load_code(self, code):
+        # Miss: the product may have been added since the last load
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(PRODUCT_QUERY + " WHERE p.barcode = ? OR p.sku = ?", (code, code))
+            rows = [dict(row) for row in cursor.fetchall()]
+        if not rows:
+            return None
+        with self._lock:
+            for product in rows:
+                self._store(product)
+        return next((product for product in rows if product['barcode'] == code), rows[0])
+
+    def find_by_barcode(self, barcode):
+        """Find product by barcode"""
+        self.ensure_warm()
+        product = self._by_barcode.get(barcode)
+        if product is None:
+            product = self._load_code(barcode)
+            if product is not None and product['barcode'] != barcode:
+                return None
+        return dict(product) if product else None
+
+    def find_by_sku(self, sku):
+        """Find product by SKU"""
+        self.ensure_warm()
+        product = self._by_sku.get(sku)
+        if product is None:
+            product = self._load_code(sku)
+            if product is not None and product['sku'] != sku:
+                return None
+        return dict(product) if product else None
+
+    def find(self, code):
+        """Find product by barcode, then by SKU"""
+        self.ensure_warm()
+        product = self._by_barcode.get(code) or self._by_sku.get(code) or self._load_code(code)
+        return dict(product) if product else None
+
+    def find_many(self, codes):
+        """
+        Resolve many barcodes or SKUs
+
+        Args:
+            codes (iterable): Scanned codes
+
+        Returns:
+            dict: code -> product dict for every code that matched
+        """
+        self.ensure_warm()
+        found = {}
+        for code in set(codes):
+            product = self._by_barcode.get(code) or self._by_sku.get(code) or self._load_code(code)
+            if product:
+                found[code] = dict(product)
+        return found
+
+    def invalidate(self, product_ids=None):
+        """
+        Reload changed products after their changes are committed
+
+        Args:
+            product_ids (list): Products to reload (default: the whole index)
+        """
+        if product_ids is None:
+            with self._lock:
+                self._loaded_at = None
+            return
+        if self._loaded_at is None or not product_ids:
+            return
+
+        product_ids = list(set(product_ids))
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(PRODUCT_QUERY + f" WHERE p.id IN ({', '.join('?' * len(product_ids))})", product_ids)
+            products = [dict(row) for row in cursor.fetchall()]
+
+        with self._lock:
+            for product_id in product_ids:
+                self._drop(product_id)
+            for product in products:
+                self._store(product)
+
+
+# Global instance
+product_lookup = ProductLookup()
@@ -0,0 +1,264 @@
+import argparse
+from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+from database import DatabaseManager
+from utils.sales_rollups import sales_rollups
+from utils.stock_ledger import stock_ledger
+
+# Days of history behind the demand velocity
+LOOKBACK_DAYS = 30
+
+# Days between placing and receiving a reorder, plus a safety buffer
+LEAD_TIME_DAYS = 7
+SAFETY_DAYS = 3
+
+# Seconds before alerts trigger a new forecast run
+FORECAST_MAX_AGE = 3600
+
+FORECAST_STATUSES = {
+    'out_of_stock': 'Out of Stock',
+    'critical': 'Critical',
+    'reorder': 'Reorder',
+    'ok': 'OK',
+    'no_demand': 'No Demand'
+}
+
+# Statuses that raise an inventory alert, most urgent first
+ALERT_STATUSES = ('out_of_stock', 'critical', 'reorder')
+
+FORECAST_COLUMNS = ['product_id', 'current_stock', 'velocity', 'days_of_cover', 'stockout_date',
+                    'reorder_point', 'reorder_quantity', 'status']
+
+
+def forecast_frame(products, velocity, today, lead_time_days=LEAD_TIME_DAYS, safety_days=SAFETY_DAYS):
+    """
+    Days of cover, stockout date and reorder quantity for every product at once
+
+    Args:
+        products (pandas.DataFrame): id, current_stock, minimum_stock, maximum_stock
+        velocity (pandas.Series): Units used per day, indexed by product id
+        today (datetime.date): Forecast date
+        lead_time_days (int): Reorder lead time
+        safety_days (int): Extra days of cover to hold
+
+    Returns:
+        pandas.DataFrame: One row per product with FORECAST_COLUMNS
+    """
+    stock = products['current_stock'].to_numpy(dtype=np.float64)
+    minimum = products['minimum_stock'].fillna(0).to_numpy(dtype=np.float64)
+    maximum = products['maximum_stock'].fillna(0).to_numpy(dtype=np.float64)
+    rate = velocity.reindex(products['id']).fillna(0).to_numpy(dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cover = np.where(rate > 0, np.maximum(stock, 0) / rate, np.inf)
+    reorder_point = np.maximum(np.ceil(rate * (lead_time_days + safety_days)), minimum)
+    needs_reorder = stock <= reorder_point
+    quantity = np.where(needs_reorder, np.maximum(np.maximum(maximum, reorder_point) - stock, 0), 0)
+
+    status = np.select(
+        [stock <= 0, cover < lead_time_days, needs_reorder, rate > 0],
+        ['out_of_stock', 'critical', 'reorder', 'ok'],
+        default='no_demand'
+    )
+
+    finite = np.isfinite(cover)
+    stockout = np.full(len(stock), None, dtype=object)
+    stockout[finite] = [
+        (today + timedelta(days=int(days))).isoformat() for days in np.floor(cover[finite])
+    ]
+
+    return pd.DataFrame({
+        'product_id': products['id'].to_numpy(),
+        'current_stock': stock.astype(np.int64),
+        'velocity': rate,
+        'days_of_cover': np.where(finite, cover, np.nan),
+        'stockout_date': stockout,
+        'reorder_point': reorder_point.astype(np.int64),
+        'reorder_quantity': quantity.astype(np.int64),
+        'status': status
+    }, columns=FORECAST_COLUMNS)
+
+
+class ReorderForecaster:
+    def __init__(self):
+        self.db = DatabaseManager()
+        self.init_forecast_tables()
+
+    def init_forecast_tables(self):
+        """Initialize the reorder forecast table"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            # Latest forecast per product
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS reorder_forecasts (
+                    product_id INTEGER PRIMARY KEY,
+                    current_stock INTEGER NOT NULL,
+                    velocity REAL NOT NULL,
+                    days_of_cover REAL,
+                    stockout_date DATE,
+                    reorder_point INTEGER NOT NULL,
+                    reorder_quantity INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    computed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (product_id) REFERENCES products (id)
+                )
+            """)
+
+            # Alerts read one status group in urgency order
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_reorder_forecasts_status
+                ON reorder_forecasts (status, days_of_cover)
+            """)
+
+            conn.commit()
+
+    def load_velocity(self, days=LOOKBACK_DAYS, end_date=None):
+        """
+        Units used per day per product over the lookback window
+
+        Sales come from recorded sale lines and from 'sale' stock movements;
+        the larger of the two is used so a sale logged in only one place
+        still counts, and other outbound movements (damage, adjustments)
+        are added on top.
+
+        Returns:
+            pandas.Series: Units per day, indexed by product id
+        """
+        end_date = end_date or date.today()
+        start_date = end_date - timedelta(days=days - 1)
+
+        sales_rollups.refresh()
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT product_id, SUM(quantity) as sold
+                FROM sales_daily_product_rollup
+                WHERE day BETWEEN ? AND ?
+                GROUP BY product_id
+            """, (str(start_date), str(end_date)))
+            line_sales = pd.Series({row['product_id']: row['sold'] for row in cursor.fetchall()}, dtype=np.float64)
+
+        movements = stock_ledger.movement_velocity(days, end_date).set_index('product_id')
+        movement_sales = movements['sold'].astype(np.float64)
+        other_outbound = (movements['outbound'] - movements['sold']).astype(np.float64)
+
+        sold = pd.concat([line_sales, movement_sales], axis=1).fillna(0).max(axis=1)
+        used = sold.add(other_outbound, fill_value=0)
+        return used / days
+
+    def run_forecast(self, days=LOOKBACK_DAYS, lead_time_days=LEAD_TIME_DAYS, safety_days=SAFETY_DAYS):
+        """
+        Forecast every product and store the results
+
+        Returns:
+            pandas.DataFrame: Output of forecast_frame()
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, current_stock, minimum_stock, maximum_stock FROM products")
+            products = pd.DataFrame([dict(row) for row in cursor.fetchall()],
+                                    columns=['id', 'current_stock', 'minimum_stock', 'maximum_stock'])
+
+        forecast = forecast_frame(products, self.load_velocity(days), date.today(), lead_time_days, safety_days)
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM reorder_forecasts")
+            cursor.executemany(f"""
+                INSERT INTO reorder_forecasts ({', '.join(FORECAST_COLUMNS)})
+                VALUES ({', '.join('?' * len(FORECAST_COLUMNS))})
+            """, [
+                (int(row.product_id), int(row.current_stock), float(row.velocity),
+                 None if pd.isna(row.days_of_cover) else float(row.days_of_cover), row.stockout_date,
+                 int(row.reorder_point), int(row.reorder_quantity), row.status)
+                for row in forecast.itertuples(index=False)
+            ])
+            conn.commit()
+
+        return forecast
+
+    def forecast_age(self):
+        """Get seconds since the last forecast run, or None if it never ran"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MAX(computed_at) FROM reorder_forecasts")
+            computed_at = cursor.fetchone()[0]
+        if computed_at is None:
+            return None
+        return (datetime.utcnow() - datetime.fromisoformat(computed_at)).total_seconds()
+
+    def get_reorder_alerts(self, statuses=ALERT_STATUSES, max_age=FORECAST_MAX_AGE, limit=None):
+        """
+        Get products that need reordering, most urgent first
+
+        Re-runs the forecast first if it is older than max_age seconds.
+
+        Args:
+            statuses (tuple): Forecast statuses to include
+            max_age (int): Oldest acceptable forecast in seconds (None: never re-run)
+            limit (int): Maximum rows (None for all)
+
+        Returns:
+            list: Forecast rows joined with product name, SKU and stock limits
+        """
+        age = self.forecast_age()
+        if age is None or (max_age is not None and age > max_age):
+            self.run_forecast()
+
+        placeholders = ', '.join('?' * len(statuses))
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT
+                    f.*,
+                    p.name,
+                    p.sku,
+                    p.minimum_stock,
+                    p.maximum_stock
+                FROM reorder_forecasts f
+                JOIN products p ON p.id = f.product_id
+                WHERE f.status IN ({placeholders})
+                ORDER BY
+                    CASE f.status WHEN 'out_of_stock' THEN 0 WHEN 'critical' THEN 1 ELSE 2 END,
+                    f.days_of_cover IS NULL,
+                    f.days_of_cover,
+                    f.reorder_quantity DESC
+                LIMIT ?
+            """, (*statuses, -1 if limit is None else limit))
+            return cursor.fetchall()
+
+    def get_product_forecast(self, product_id):
+        """Get the stored forecast of one product"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM reorder_forecasts WHERE product_id = ?", (product_id,))
+            return cursor.fetchone()
+
+
+# Global instance
+reorder_forecaster = ReorderForecaster()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast stockouts and reorder quantities for all products")
+    parser.add_argument('--days', type=int, default=LOOKBACK_DAYS, help="Days of history for velocity")
+    parser.add_argument('--lead-time', type=int, default=LEAD_TIME_DAYS, help="Reorder lead time in days")
+    parser.add_argument('--safety-days', type=int, default=SAFETY_DAYS, help="Extra days of cover to hold")
+    args = parser.parse_args()
+
+    forecast = reorder_forecaster.run_forecast(args.days, args.lead_time, args.safety_days)
+    counts = forecast['status'].value_counts()
+    print(", ".join(f"{FORECAST_STATUSES[status]}: {counts.get(status, 0)}" for status in FORECAST_STATUSES))
+
+    alerts = forecast[forecast['status'].isin(ALERT_STATUSES)].copy()
+    alerts['urgency'] = alerts['status'].map({status: i for i, status in enumerate(ALERT_STATUSES)})
+    alerts = alerts.sort_values(['urgency', 'days_of_cover']).drop(columns='urgency')
+    if not alerts.empty:
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(alerts.round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.backtesting import TRADING_DAYS
+
+# Market proxy for beta
+BENCHMARK_SYMBOL = 'SPY'
+
+# Confidence levels reported for VaR and CVaR
+VAR_CONFIDENCE_LEVELS = (0.95, 0.99)
+
+# Fewest overlapping daily returns needed for meaningful estimates
+MIN_RISK_OBSERVATIONS = 20
+
+
+def load_closes(data_fetcher, symbols, period="1y"):
+    """
+    Build an aligned close matrix from the cached daily bars
+
+    Args:
+        data_fetcher: DataFetcher instance (get_stock_data is cached)
+        symbols (list): Stock symbols
+        period (str): History period
+
+    Returns:
+        pandas.DataFrame: Closes with one column per symbol that has data,
+            restricted to dates where every symbol traded
+    """
+    closes = {}
+    for symbol in dict.fromkeys(symbols):
+        data = data_fetcher.get_stock_data(symbol, period)
+        if data is not None and not data.empty:
+            closes[symbol] = data['Close']
+    if not closes:
+        return pd.DataFrame()
+    return pd.DataFrame(closes).dropna()
+
+
+def holdings_version(shares):
+    """Get a hashable key for the holdings (symbol -> shares)"""
+    return tuple(sorted((symbol, round(float(count), 6)) for symbol, count in shares.items()))
+
+
+def closes_version(closes):
+    """Get a cheap fingerprint of a close matrix that changes when new bars arrive"""
+    if closes.empty:
+        return (0,)
+    return (len(closes), str(closes.index[0]), str(closes.index[-1]), tuple(closes.iloc[-1].round(6)))
+
+
+def compute_risk(closes, shares, benchmark_symbol=BENCHMARK_SYMBOL, confidence_levels=VAR_CONFIDENCE_LEVELS):
+    """
+    Compute portfolio risk from a close matrix in one vectorized pass
+
+    Positions are valued at the last close in the matrix.
+
+    Args:
+        closes (pandas.DataFrame): Aligned closes with a column per holding and the benchmark
+        shares (dict): Symbol -> shares held
+        benchmark_symbol (str): Column used as the market for beta
+        confidence_levels (tuple): VaR/CVaR confidence levels
+
+    Returns:
+        dict: Risk figures (see keys below), or None without enough history
+    """
+    symbols = [symbol for symbol in shares if symbol in closes.columns]
+    if not symbols or len(closes) <= MIN_RISK_OBSERVATIONS:
+        return None
+
+    prices = closes[symbols].to_numpy(dtype=np.float64)
+    returns = prices[1:] / prices[:-1] - 1
+    values = prices[-1] * np.array([shares[symbol] for symbol in symbols], dtype=np.float64)
+    total_value = values.sum()
+    if total_value <= 0:
+        return None
+    weights = values / total_value
+    n = len(returns)
+
+    # Daily covariance and correlation
+    demeaned = returns - returns.mean(axis=0)
+    cov = demeaned.T @ demeaned / (n - 1)
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.outer(std, std)
+
+    # Portfolio volatility and each position's share of it
+    portfolio_returns = returns @ weights
+    portfolio_variance = weights @ cov @ weights
+    portfolio_std = np.sqrt(portfolio_variance)
+    marginal = cov @ weights / portfolio_std if portfolio_std > 0 else np.zeros(len(symbols))
+    contribution = weights * marginal
+
+    # Beta of every holding and of the portfolio against the benchmark
+    betas = np.full(len(symbols), np.nan)
+    portfolio_beta = np.nan
+    if benchmark_symbol in closes.columns:
+        market = closes[benchmark_symbol].to_numpy(dtype=np.float64)
+        market_returns = market[1:] / market[:-1] - 1
+        market_demeaned = market_returns - market_returns.mean()
+        market_variance = market_demeaned @ market_demeaned
+        if market_variance > 0:
+            betas = demeaned.T @ market_demeaned / market_variance
+            portfolio_beta = weights @ betas
+
+    # Historical VaR/CVaR from the empirical distribution, parametric from a normal fit
+    levels = np.asarray(confidence_levels, dtype=np.float64)
+    cutoffs = np.quantile(portfolio_returns, 1 - levels)
+    tails = portfolio_returns[:, None] <= cutoffs
+    tail_means = (portfolio_returns[:, None] * tails).sum(axis=0) / np.maximum(tails.sum(axis=0), 1)
+    mean = portfolio_returns.mean()
+    normal = NormalDist()
+    z = np.array([normal.inv_cdf(level) for level in levels])
+    density = np.array([normal.pdf(value) for value in z])
+
+    var_table = pd.DataFrame({
+        'confidence': levels * 100,
+        'historical_var': -cutoffs,
+        'historical_cvar': -tail_means,
+        'parametric_var': z * portfolio_std - mean,
+        'parametric_cvar': portfolio_std * density / (1 - levels) - mean
+    })
+    for column in ('historical_var', 'historical_cvar', 'parametric_var', 'parametric_cvar'):
+        var_table[f'{column}_value'] = var_table[column] * total_value
+        var_table[column] *= 100
+
+    annualize = np.sqrt(TRADING_DAYS)
+    positions = pd.DataFrame({
+        'symbol': symbols,
+        'value': values,
+        'weight': weights * 100,
+        'volatility': std * annualize * 100,
+        'beta': betas,
+        'risk_contribution': contribution * annualize * 100,
+        'risk_contribution_pct': contribution / portfolio_std * 100 if portfolio_std > 0 else np.zeros(len(symbols))
+    })
+
+    return {
+        'total_value': total_value,
+        'observations': n,
+        'start': closes.index[0],
+        'end': closes.index[-1],
+        'volatility': portfolio_std * annualize * 100,
+        'daily_volatility': portfolio_std * 100,
+        'beta': portfolio_beta,
+        'covariance': pd.DataFrame(cov * TRADING_DAYS, index=symbols, columns=symbols),
+        'correlation': pd.DataFrame(corr, index=symbols, columns=symbols),
+        'positions': positions,
+        'var': var_table,
+        'portfolio_returns': pd.Series(portfolio_returns, index=closes.index[1:])
+    }
+
+
+@st.cache_data(max_entries=50, show_spinner=False)
+def cached_risk(holdings_key, data_key, benchmark_symbol, _closes):
+    """
+    Get risk figures, recomputing only when the holdings or the bars change
+
+    Args:
+        holdings_key (tuple): holdings_version() of the holdings
+        data_key (tuple): closes_version() of the close matrix
+        benchmark_symbol (str): Benchmark column
+        _closes (pandas.DataFrame): Close matrix (not hashed)
+
+    Returns:
+        dict: Output of compute_risk()
+    """
+    return compute_risk(_closes, dict(holdings_key), benchmark_symbol)
+
+
+def get_portfolio_risk(data_fetcher, shares, period="1y", benchmark_symbol=BENCHMARK_SYMBOL):
+    """
+    Get risk analytics for a portfolio from cached daily closes
+
+    Args:
+        data_fetcher: DataFetcher instance
+        shares (dict): Symbol -> shares held
+        period (str): History period
+        benchmark_symbol (str): Market proxy for beta
+
+    Returns:
+        dict: Output of compute_risk() plus 'missing' symbols without data, or None
+    """
+    shares = {symbol: count for symbol, count in shares.items() if count > 0}
+    if not shares:
+        return None
+
+    closes = load_closes(data_fetcher, list(shares) + [benchmark_symbol], period)
+    if closes.empty:
+        return None
+
+    risk = cached_risk(holdings_version(shares), closes_version(closes), benchmark_symbol, closes)
+    if risk is None:
+        return None
+    return {**risk, 'missing': [symbol for symbol in shares if symbol not in closes.columns]}
@@ -0,0 +1,273 @@
+import argparse
+from database import DatabaseManager
+
+# Name of the high-water mark row for the daily rollups
+ROLLUP_NAME = 'daily_sales'
+
+# Per-day totals of completed sales from transactions (id_from, id_to];
+# day_filter optionally limits the sale days
+DAILY_ROLLUP_SQL = """
+    INSERT INTO sales_daily_rollup (day, transactions, revenue, discount, tax, net_revenue)
+    SELECT
+        DATE(sale_date),
+        COUNT(*),
+        SUM(total_amount),
+        SUM(COALESCE(discount_amount, 0)),
+        SUM(COALESCE(tax_amount, 0)),
+        SUM(total_amount - COALESCE(discount_amount, 0) - COALESCE(tax_amount, 0))
+    FROM sales_transactions
+    WHERE id > ? AND id <= ? AND status = 'completed'{day_filter}
+    GROUP BY DATE(sale_date)
+    ON CONFLICT(day) DO UPDATE SET
+        transactions = transactions + excluded.transactions,
+        revenue = revenue + excluded.revenue,
+        discount = discount + excluded.discount,
+        tax = tax + excluded.tax,
+        net_revenue = net_revenue + excluded.net_revenue
+"""
+
+# Per-(day, product) totals of completed sale lines, as above; cost uses the
+# unit cost recorded at sale time, or the product's cost price for older lines
+PRODUCT_ROLLUP_SQL = """
+    INSERT INTO sales_daily_product_rollup
+    (day, product_id, transactions, quantity, revenue, discount, cost, unit_price_sum, line_count)
+    SELECT
+        DATE(st.sale_date),
+        sti.product_id,
+        COUNT(DISTINCT st.id),
+        SUM(sti.quantity),
+        SUM(sti.total_price),
+        SUM(COALESCE(sti.discount_amount, 0)),
+        SUM(sti.quantity * COALESCE(sti.unit_cost, p.cost_price, 0)),
+        SUM(sti.unit_price),
+        COUNT(*)
+    FROM sales_transactions st
+    JOIN sales_transaction_items sti ON sti.transaction_id = st.id
+    LEFT JOIN products p ON sti.product_id = p.id
+    WHERE st.id > ? AND st.id <= ? AND st.status = 'completed'{day_filter}
+    GROUP BY DATE(st.sale_date), sti.product_id
+    ON CONFLICT(day, product_id) DO UPDATE SET
+        transactions = transactions + excluded.transactions,
+        quantity = quantity + excluded.quantity,
+        revenue = revenue + excluded.revenue,
+        discount = discount + excluded.discount,
+        cost = cost + excluded.cost,
+        unit_price_sum = unit_price_sum + excluded.unit_price_sum,
+        line_count = line_count + excluded.line_count
+"""
+
+
+class SalesRollups:
+    """
+    Materialized daily sales totals kept current from a high-water mark
+
+    Each refresh folds the completed transactions with an id above the stored
+    mark into the day and (day, product) tables, so reports over any date
+    range read a few hundred rollup rows instead of every sale. Transactions
+    are rolled up once; days whose sales are edited afterwards (status
+    changes, refunds) are corrected with rebuild().
+    """
+
+    def __init__(self):
+        self.db = DatabaseManager()
+        self.init_rollup_tables()
+
+    def init_rollup_tables(self):
+        """Initialize the rollup and high-water mark tables"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            # One row per sale day
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sales_daily_rollup (
+                    day DATE PRIMARY KEY,
+                    transactions INTEGER NOT NULL DEFAULT 0,
+                    revenue REAL NOT NULL DEFAULT 0,
+                    discount REAL NOT NULL DEFAULT 0,
+                    tax REAL NOT NULL DEFAULT 0,
+                    net_revenue REAL NOT NULL DEFAULT 0
+                )
+            """)
+
+            # One row per product sold on a day
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sales_daily_product_rollup (
+                    day DATE NOT NULL,
+                    product_id INTEGER NOT NULL,
+                    transactions INTEGER NOT NULL DEFAULT 0,
+                    quantity INTEGER NOT NULL DEFAULT 0,
+                    revenue REAL NOT NULL DEFAULT 0,
+                    discount REAL NOT NULL DEFAULT 0,
+                    cost REAL NOT NULL DEFAULT 0,
+                    unit_price_sum REAL NOT NULL DEFAULT 0,
+                    line_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, product_id),
+                    FOREIGN KEY (product_id) REFERENCES products (id)
+                )
+            """)
+
+            # Last sales_transactions.id folded into each rollup
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sales_rollup_state (
+                    name TEXT PRIMARY KEY,
+                    last_transaction_id INTEGER NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Sale lines record their unit cost; older tables gain the column
+            cursor.execute("PRAGMA table_info(sales_transaction_items)")
+            item_columns = [column['name'] for column in cursor.fetchall()]
+            if item_columns and 'unit_cost' not in item_columns:
+                cursor.execute("ALTER TABLE sales_transaction_items ADD COLUMN unit_cost REAL")
+
+            # Rollups created before cost tracking are rebuilt on the next refresh
+            cursor.execute("PRAGMA table_info(sales_daily_product_rollup)")
+            if 'cost' not in [column['name'] for column in cursor.fetchall()]:
+                cursor.execute("ALTER TABLE sales_daily_product_rollup ADD COLUMN cost REAL NOT NULL DEFAULT 0")
+                cursor.execute("DELETE FROM sales_daily_rollup")
+                cursor.execute("DELETE FROM sales_daily_product_rollup")
+                cursor.execute("DELETE FROM sales_rollup_state WHERE name = ?", (ROLLUP_NAME,))
+
+            conn.commit()
+
+    def _ensure_item_index(self, cursor):
+        # Catch-up joins new transactions to their lines
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sales_transaction_items_transaction
+            ON sales_transaction_items (transaction_id)
+        """)
+
+    def _high_water_mark(self, cursor):
+        cursor.execute("SELECT last_transaction_id FROM sales_rollup_state WHERE name = ?", (ROLLUP_NAME,))
+        row = cursor.fetchone()
+        return row['last_transaction_id'] if row else 0
+
+    def _latest_transaction_id(self, cursor):
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM sales_transactions")
+        return cursor.fetchone()[0]
+
+    def _set_high_water_mark(self, cursor, transaction_id):
+        cursor.execute("""
+            INSERT INTO sales_rollup_state (name, last_transaction_id, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(name) DO UPDATE SET
+                last_transaction_id = excluded.last_transaction_id,
+                updated_at = excluded.updated_at
+        """, (ROLLUP_NAME, transaction_id))
+
+    def _fold(self, cursor, after_id, through_id, start_date=None, end_date=None):
+        """Add transactions (after_id, through_id] to both rollups"""
+        if through_id <= after_id:
+            return
+        if start_date is None:
+            cursor.execute(DAILY_ROLLUP_SQL.format(day_filter=""), (after_id, through_id))
+            cursor.execute(PRODUCT_ROLLUP_SQL.format(day_filter=""), (after_id, through_id))
+        else:
+            params = (after_id, through_id, start_date, end_date)
+            cursor.execute(DAILY_ROLLUP_SQL.format(day_filter=" AND DATE(sale_date) BETWEEN ? AND ?"), params)
+            cursor.execute(PRODUCT_ROLLUP_SQL.format(day_filter=" AND DATE(st.sale_date) BETWEEN ? AND ?"), params)
+
+    def get_high_water_mark(self):
+        """Get the last transaction id included in the rollups"""
+        with self.db.get_connection() as conn:
+            return self._high_water_mark(conn.cursor())
+
+    def get_version(self):
+        """
+        Get a key that changes whenever the rollups change
+
+        Returns:
+            tuple: (high-water mark, time of the last refresh or rebuild)
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT last_transaction_id, updated_at FROM sales_rollup_state WHERE name = ?",
+                           (ROLLUP_NAME,))
+            row = cursor.fetchone()
+            return (row['last_transaction_id'], row['updated_at']) if row else (0, None)
+
+    def refresh(self):
+        """
+        Fold transactions recorded since the last refresh into the rollups
+
+        Cheap when nothing is new. The mark is re-read under a write lock so
+        concurrent refreshes never count a transaction twice.
+
+        Returns:
+            int: High-water mark after the refresh
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            last_id = self._high_water_mark(cursor)
+            if self._latest_transaction_id(cursor) <= last_id:
+                return last_id
+
+            self._ensure_item_index(cursor)
+            conn.commit()
+
+            cursor.execute("BEGIN IMMEDIATE")
+            last_id = self._high_water_mark(cursor)
+            latest_id = self._latest_transaction_id(cursor)
+            if latest_id > last_id:
+                self._fold(cursor, last_id, latest_id)
+                self._set_high_water_mark(cursor, latest_id)
+            conn.commit()
+            return latest_id
+
+    def rebuild(self, start_date=None, end_date=None):
+        """
+        Recompute rollup days from the sales tables
+
+        Args:
+            start_date: First day to rebuild (default: all days)
+            end_date: Last day to rebuild (default: all days)
+
+        Returns:
+            int: High-water mark after the rebuild
+        """
+        start_date = str(start_date) if start_date else '0000-01-01'
+        end_date = str(end_date) if end_date else '9999-12-31'
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            self._ensure_item_index(cursor)
+            conn.commit()
+
+            cursor.execute("BEGIN IMMEDIATE")
+            last_id = self._high_water_mark(cursor)
+            latest_id = self._latest_transaction_id(cursor)
+
+            # Catch up every day first so days outside the range stay current
+            self._fold(cursor, last_id, latest_id)
+            for table in ('sales_daily_rollup', 'sales_daily_product_rollup'):
+                cursor.execute(f"DELETE FROM {table} WHERE day BETWEEN ? AND ?", (start_date, end_date))
+            self._fold(cursor, 0, latest_id, start_date, end_date)
+
+            self._set_high_water_mark(cursor, latest_id)
+            conn.commit()
+            return latest_id
+
+
+# Global instance
+sales_rollups = SalesRollups()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bring the daily sales rollups up to date")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute rollup days instead of catching up")
+    parser.add_argument('--start', default=None, help="First day to rebuild (YYYY-MM-DD)")
+    parser.add_argument('--end', default=None, help="Last day to rebuild (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    before = sales_rollups.get_high_water_mark()
+    if args.rebuild:
+        after = sales_rollups.rebuild(args.start, args.end)
+        print(f"Rebuilt rollups through transaction {after}")
+    else:
+        after = sales_rollups.refresh()
+        print(f"Rolled up transactions {before + 1}-{after}" if after > before else "Rollups are up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+from datetime import timedelta
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.sales_rollups import sales_rollups
+
+WEEKDAY_LABELS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Rolling windows (days) for growth rates
+GROWTH_WINDOWS = (7, 30)
+
+# Period of the seasonal decomposition (days)
+SEASONAL_PERIOD = 7
+
+# Fewest calendar days for a decomposition or product slope
+MIN_TREND_DAYS = 14
+
+
+def load_transaction_arrays(db, start_date, end_date):
+    """
+    Load completed sales in a date range as compact arrays
+
+    Args:
+        db: DatabaseManager instance
+        start_date: First day (inclusive)
+        end_date: Last day (inclusive)
+
+    Returns:
+        tuple: (epoch seconds int64 array, amounts float64 array)
+    """
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT CAST(strftime('%s', sale_date) AS INTEGER), total_amount
+            FROM sales_transactions
+            WHERE sale_date >= ? AND sale_date < ?
+            AND status = 'completed'
+        """, (str(start_date), str(end_date + timedelta(days=1))))
+        rows = cursor.fetchall()
+
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    data = np.array([tuple(row) for row in rows], dtype=np.float64)
+    return data[:, 0].astype(np.int64), data[:, 1]
+
+
+def load_daily_revenue(db, start_date, end_date):
+    """Get revenue per calendar day from the daily rollup, with zeros for days without sales"""
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT day, revenue FROM sales_daily_rollup
+            WHERE day BETWEEN ? AND ?
+        """, (start_date, end_date))
+        rows = cursor.fetchall()
+
+    days = pd.date_range(start_date, end_date, freq='D')
+    revenue = pd.Series({pd.Timestamp(row['day']): row['revenue'] for row in rows}, dtype=np.float64)
+    return revenue.reindex(days, fill_value=0.0)
+
+
+def load_product_matrix(db, start_date, end_date):
+    """
+    Get daily revenue per product from the product rollup
+
+    Returns:
+        tuple: (days x products revenue matrix as a DataFrame, products DataFrame)
+    """
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT r.day, r.product_id, r.revenue, p.name, p.sku
+            FROM sales_daily_product_rollup r
+            JOIN products p ON r.product_id = p.id
+            WHERE r.day BETWEEN ? AND ?
+        """, (start_date, end_date))
+        rows = [dict(row) for row in cursor.fetchall()]
+
+    days = pd.date_range(start_date, end_date, freq='D')
+    if not rows:
+        return pd.DataFrame(index=days), pd.DataFrame(columns=['product_id', 'name', 'sku'])
+
+    sales = pd.DataFrame(rows)
+    sales['day'] = pd.to_datetime(sales['day'])
+    products = sales[['product_id', 'name', 'sku']].drop_duplicates('product_id')
+    matrix = sales.pivot_table(index='day', columns='product_id', values='revenue', aggfunc='sum', fill_value=0.0)
+    return matrix.reindex(days, fill_value=0.0), products
+
+
+def weekday_hour_heatmap(epochs, amounts):
+    """
+    Revenue and transaction counts by weekday and hour
+
+    Args:
+        epochs (numpy.ndarray): Sale times in epoch seconds
+        amounts (numpy.ndarray): Sale amounts
+
+    Returns:
+        tuple: (revenue, transactions) DataFrames of 7 weekdays x 24 hours
+    """
+    # 1970-01-01 was a Thursday, so (days + 3) % 7 puts Monday at 0
+    weekday = (epochs // 86400 + 3) % 7
+    hour = (epochs % 86400) // 3600
+    cells = weekday * 24 + hour
+
+    revenue = np.bincount(cells, weights=amounts, minlength=7 * 24).reshape(7, 24)
+    counts = np.bincount(cells, minlength=7 * 24).reshape(7, 24)
+    return (
+        pd.DataFrame(revenue, index=WEEKDAY_LABELS, columns=range(24)),
+        pd.DataFrame(counts, index=WEEKDAY_LABELS, columns=range(24))
+    )
+
+
+def rolling_growth(daily, windows=GROWTH_WINDOWS):
+    """
+    Rolling revenue sums and their growth against the preceding window
+
+    Args:
+        daily (pandas.Series): Revenue per calendar day
+
+    Returns:
+        pandas.DataFrame: revenue plus sum_{w} and growth_{w} (%) per window
+    """
+    frame = pd.DataFrame({'revenue': daily})
+    for window in windows:
+        total = daily.rolling(window, min_periods=window).sum()
+        previous = total.shift(window)
+        frame[f'sum_{window}'] = total
+        frame[f'growth_{window}'] = (total / previous.where(previous > 0) - 1) * 100
+    return frame
+
+
+def monthly_growth(daily):
+    """Get revenue per calendar month and month-over-month growth (%)"""
+    monthly = daily.resample('MS').sum()
+    return pd.DataFrame({
+        'revenue': monthly,
+        'growth': (monthly / monthly.shift(1).where(monthly.shift(1) > 0) - 1) * 100
+    })
+
+
+def seasonal_decomposition(daily, period=SEASONAL_PERIOD):
+    """
+    Additive decomposition into trend, seasonal and residual parts
+
+    The trend is a centred moving average over one period (a 2xN average for
+    even periods); the seasonal part is the mean detrended value per phase,
+    centred to sum to zero.
+
+    Args:
+        daily (pandas.Series): Revenue per calendar day
+        period (int): Season length in days
+
+    Returns:
+        pandas.DataFrame: observed, trend, seasonal and residual, or None if
+            the range is too short
+    """
+    if len(daily) < max(2 * period, MIN_TREND_DAYS):
+        return None
+
+    values = daily.to_numpy(dtype=np.float64)
+    if period % 2:
+        kernel = np.full(period, 1 / period)
+    else:
+        kernel = np.r_[0.5, np.ones(period - 1), 0.5] / period
+    half = len(kernel) // 2
+    trend = np.full(len(values), np.nan)
+    trend[half:len(values) - half] = np.convolve(values, kernel, mode='valid')
+
+    detrended = values - trend
+    phase = np.arange(len(values)) % period
+    valid = ~np.isnan(detrended)
+    sums = np.bincount(phase[valid], weights=detrended[valid], minlength=period)
+    counts = np.bincount(phase[valid], minlength=period)
+    pattern = sums / np.maximum(counts, 1)
+    pattern -= pattern.mean()
+    seasonal = pattern[phase]
+
+    return pd.DataFrame({
+        'observed': values,
+        'trend': trend,
+        'seasonal': seasonal,
+        'residual': values - trend - seasonal
+    }, index=daily.index)
+
+
+def weekly_seasonality(decomposition):
+    """Get the seasonal effect per weekday from a daily decomposition"""
+    weekday = decomposition.index.dayofweek
+    effect = decomposition['seasonal'].groupby(weekday).first()
+    return pd.Series(effect.to_numpy(), index=[WEEKDAY_LABELS[day] for day in effect.index])
+
+
+def product_trend_slopes(matrix, products):
+    """
+    Least-squares revenue trend of every product at once
+
+    Args:
+        matrix (pandas.DataFrame): Days x products revenue
+        products (pandas.DataFrame): product_id, name, sku
+
+    Returns:
+        pandas.DataFrame: Per product slope ($/day), relative slope (% of mean
+            daily revenue per day), mean daily revenue and total revenue
+    """
+    if matrix.shape[1] == 0 or len(matrix) < MIN_TREND_DAYS:
+        return pd.DataFrame(columns=['product_id', 'name', 'sku', 'slope', 'relative_slope',
+                                     'avg_daily_revenue', 'total_revenue'])
+
+    values = matrix.to_numpy(dtype=np.float64)
+    t = np.arange(len(values), dtype=np.float64)
+    t -= t.mean()
+    means = values.mean(axis=0)
+    slopes = t @ (values - means) / (t @ t)
+
+    trends = pd.DataFrame({
+        'product_id': matrix.columns,
+        'slope': slopes,
+        'relative_slope': np.where(means > 0, slopes / np.where(means > 0, means, 1) * 100, np.nan),
+        'avg_daily_revenue': means,
+        'total_revenue': values.sum(axis=0)
+    })
+    trends = products.merge(trends, on='product_id', how='right')
+    return trends.sort_values('slope', ascending=False).reset_index(drop=True)
+
+
+def compute_trends(db, start_date, end_date):
+    """
+    Full trend analysis of a date range
+
+    Returns:
+        dict: heatmap and heatmap_counts, daily (rolling growth frame),
+            monthly, decomposition, weekly (seasonal effect per weekday),
+            products (trend slopes) and transactions, or None without sales
+    """
+    epochs, amounts = load_transaction_arrays(db, start_date, end_date)
+    if len(epochs) == 0:
+        return None
+
+    daily = load_daily_revenue(db, start_date, end_date)
+    heatmap, heatmap_counts = weekday_hour_heatmap(epochs, amounts)
+    decomposition = seasonal_decomposition(daily)
+    matrix, products = load_product_matrix(db, start_date, end_date)
+
+    return {
+        'heatmap': heatmap,
+        'heatmap_counts': heatmap_counts,
+        'daily': rolling_growth(daily),
+        'monthly': monthly_growth(daily),
+        'decomposition': decomposition,
+        'weekly': weekly_seasonality(decomposition) if decomposition is not None else None,
+        'products': product_trend_slopes(matrix, products),
+        'transactions': len(epochs)
+    }
+
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def cached_trends(start_date, end_date, data_key, _db):
+    """
+    Memoize a trend analysis per (date range, rollup version)
+
+    Args:
+        start_date: First day
+        end_date: Last day
+        data_key (tuple): sales_rollups.get_version()
+        _db: DatabaseManager instance (not hashed)
+
+    Returns:
+        dict: Output of compute_trends()
+    """
+    return compute_trends(_db, start_date, end_date)
+
+
+def get_sales_trends(start_date, end_date, db=None):
+    """
+    Trend analysis of a date range, recomputed only when sales change
+
+    Args:
+        start_date: First day
+        end_date: Last day
+        db: DatabaseManager instance (default: the rollups' database)
+
+    Returns:
+        dict: Output of compute_trends(), or None without sales
+    """
+    sales_rollups.refresh()
+    return cached_trends(start_date, end_date, sales_rollups.get_version(), db or sales_rollups.db)
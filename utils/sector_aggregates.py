@@ -0,0 +1,186 @@
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.market_snapshot import SECTOR_ETFS, download_history, get_market_snapshot
+
+# Trading-day lookbacks for each horizon (YTD is anchored to the prior year's last close)
+SECTOR_HORIZONS = {'1d': 1, '5d': 5, '1mo': 21}
+HORIZON_LABELS = list(SECTOR_HORIZONS) + ['YTD']
+
+# Map the sector codes used by the symbol universe onto the SPDR sector names
+UNIVERSE_SECTOR_MAP = {
+    'technology': 'Technology',
+    'health care': 'Healthcare',
+    'healthcare': 'Healthcare',
+    'finance': 'Financials',
+    'financials': 'Financials',
+    'financial services': 'Financials',
+    'energy': 'Energy',
+    'consumer discretionary': 'Consumer Discretionary',
+    'utilities': 'Utilities',
+    'real estate': 'Real Estate',
+    'basic materials': 'Materials',
+    'materials': 'Materials',
+    'industrials': 'Industrials',
+    'consumer staples': 'Consumer Staples',
+    'communication': 'Communication',
+    'communication services': 'Communication',
+    'telecommunications': 'Communication'
+}
+
+
+def normalize_sector(sector):
+    """Map a universe sector code to a SPDR sector name, or None if unknown"""
+    return UNIVERSE_SECTOR_MAP.get((sector or '').strip().lower())
+
+
+def compute_sector_returns(closes):
+    """
+    Compute percentage returns over every horizon in one vectorized pass
+
+    Args:
+        closes (pandas.DataFrame): Daily closes, one column per ETF
+
+    Returns:
+        pandas.DataFrame: One row per ETF with Price and a column per horizon
+    """
+    closes = closes.sort_index().ffill()
+    latest = closes.iloc[-1]
+
+    returns = {'Price': latest}
+    for label, lookback in SECTOR_HORIZONS.items():
+        if len(closes) > lookback:
+            returns[label] = (latest / closes.iloc[-1 - lookback] - 1) * 100
+        else:
+            returns[label] = pd.Series(np.nan, index=closes.columns)
+
+    year_start = pd.Timestamp(year=closes.index[-1].year, month=1, day=1, tz=closes.index.tz)
+    prior_year = closes[closes.index < year_start]
+    base = prior_year.iloc[-1] if not prior_year.empty else closes[closes.index >= year_start].iloc[0]
+    returns['YTD'] = (latest / base - 1) * 100
+
+    return pd.DataFrame(returns)
+
+
+def compute_sector_breadth(universe, quotes, top_n=3):
+    """
+    Compute advance/decline breadth and top movers per sector
+
+    Args:
+        universe (list): Symbol dicts with 'symbol' and 'sector'
+        quotes (dict): Daily quotes keyed by symbol
+        top_n (int): Number of contributors and detractors to keep per sector
+
+    Returns:
+        pandas.DataFrame: One row per sector
+    """
+    rows = []
+    for entry in universe:
+        sector = normalize_sector(entry.get('sector'))
+        quote = quotes.get(entry['symbol'])
+        if sector and quote:
+            rows.append((sector, entry['symbol'], quote['percent_change']))
+
+    if not rows:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(rows, columns=['Sector', 'Symbol', 'Change %'])
+    df['Advancing'] = df['Change %'] > 0
+    df['Declining'] = df['Change %'] < 0
+
+    grouped = df.groupby('Sector')
+    breadth = pd.DataFrame({
+        'Advancers': grouped['Advancing'].sum(),
+        'Decliners': grouped['Declining'].sum(),
+        'Members': grouped.size(),
+        'Avg Change %': grouped['Change %'].mean()
+    })
+    breadth['Unchanged'] = breadth['Members'] - breadth['Advancers'] - breadth['Decliners']
+    breadth['A/D Ratio'] = breadth['Advancers'] / breadth['Decliners'].replace(0, np.nan)
+
+    ranked = df.sort_values('Change %', ascending=False)
+    leaders = ranked[ranked['Advancing']].groupby('Sector').head(top_n)
+    laggards = ranked[ranked['Declining']].iloc[::-1].groupby('Sector').head(top_n)
+    breadth['Top Contributors'] = leaders.groupby('Sector')['Symbol'].agg(', '.join)
+    breadth['Top Detractors'] = laggards.groupby('Sector')['Symbol'].agg(', '.join)
+    breadth[['Top Contributors', 'Top Detractors']] = breadth[['Top Contributors', 'Top Detractors']].fillna('')
+
+    return breadth.sort_values('Avg Change %', ascending=False).reset_index()
+
+
+class SectorAggregator:
+    """Precomputed sector performance and breadth, refreshed incrementally"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._lock = threading.Lock()
+        self._closes = pd.DataFrame()
+        self._ranked = {}
+        self._breadth = pd.DataFrame()
+        self.updated_at = None
+
+    def refresh_performance(self):
+        """Append the latest ETF closes and recompute horizon returns"""
+        # A full year seeds the YTD horizon; afterwards only recent bars are fetched
+        period = "1y" if self._closes.empty else "5d"
+        history = download_history(list(SECTOR_ETFS.values()), period=period)
+        latest = pd.DataFrame({symbol: data['Close'] for symbol, data in history.items()})
+        if latest.empty:
+            return
+
+        closes = pd.concat([self._closes, latest])
+        closes = closes[~closes.index.duplicated(keep='last')].sort_index()
+        closes = closes[closes.index >= closes.index[-1] - pd.Timedelta(days=400)]
+
+        performance = compute_sector_returns(closes)
+        names = {etf: sector for sector, etf in SECTOR_ETFS.items()}
+        performance.insert(0, 'Sector', performance.index.map(names))
+        performance = performance.rename_axis('ETF').reset_index()
+
+        ranked = {
+            horizon: performance.sort_values(horizon, ascending=False).reset_index(drop=True)
+            for horizon in HORIZON_LABELS
+        }
+
+        with self._lock:
+            self._closes = closes
+            self._ranked = ranked
+            self.updated_at = datetime.now()
+
+    def refresh_breadth(self):
+        """Recompute breadth from the snapshot's universe quotes"""
+        breadth = compute_sector_breadth(
+            self.snapshot.get_universe(), self.snapshot.get_universe_quotes()
+        )
+        with self._lock:
+            self._breadth = breadth
+
+    def refresh(self):
+        """Refresh performance and breadth"""
+        self.refresh_performance()
+        self.refresh_breadth()
+
+    def get_performance(self, horizon='1d'):
+        """Get sector performance ranked by the given horizon"""
+        with self._lock:
+            return self._ranked.get(horizon, pd.DataFrame())
+
+    def get_breadth(self):
+        """Get advance/decline breadth per sector"""
+        with self._lock:
+            return self._breadth
+
+
+@st.cache_resource
+def get_sector_aggregator():
+    """Get the process-wide sector aggregator, scheduled on the market snapshot thread"""
+    snapshot = get_market_snapshot()
+    aggregator = SectorAggregator(snapshot)
+    try:
+        aggregator.refresh_performance()
+    except Exception:
+        pass
+    snapshot.register_job(aggregator.refresh, interval=300)
+    return aggregator
@@ -0,0 +1,375 @@
+import argparse
+from datetime import date, timedelta
+import pandas as pd
+from database import DatabaseManager
+from utils.business_utils import INBOUND_MOVEMENT_TYPES
+
+# Name of the high-water mark row for the snapshots
+LEDGER_NAME = 'stock_snapshots'
+
+# Signed quantity of a movement, matching BusinessUtils.update_stock
+_INBOUND = ', '.join(f"'{movement_type}'" for movement_type in INBOUND_MOVEMENT_TYPES)
+SIGNED_QUANTITY = f"CASE WHEN movement_type IN ({_INBOUND}) THEN quantity ELSE -quantity END"
+
+# Per-(product, day) movement totals for movements (id_from, id_to]
+FOLD_MOVEMENTS_SQL = f"""
+    INSERT INTO stock_snapshots (product_id, day, inbound, outbound, sold, movements, closing_stock)
+    SELECT
+        product_id,
+        DATE(created_at),
+        SUM(CASE WHEN movement_type IN ({_INBOUND}) THEN quantity ELSE 0 END),
+        SUM(CASE WHEN movement_type IN ({_INBOUND}) THEN 0 ELSE quantity END),
+        SUM(CASE WHEN movement_type = 'sale' THEN quantity ELSE 0 END),
+        COUNT(*),
+        0
+    FROM stock_movements
+    WHERE id > ? AND id <= ?
+    GROUP BY product_id, DATE(created_at)
+    ON CONFLICT(product_id, day) DO UPDATE SET
+        inbound = inbound + excluded.inbound,
+        outbound = outbound + excluded.outbound,
+        sold = sold + excluded.sold,
+        movements = movements + excluded.movements
+"""
+
+# Running closing stock of the products in temp.ledger_affected
+CLOSING_STOCK_SQL = """
+    UPDATE stock_snapshots SET closing_stock = running.closing_stock
+    FROM (
+        SELECT
+            s.product_id,
+            s.day,
+            o.opening_stock + SUM(s.inbound - s.outbound) OVER (
+                PARTITION BY s.product_id ORDER BY s.day
+            ) AS closing_stock
+        FROM stock_snapshots s
+        JOIN stock_ledger_products o ON o.product_id = s.product_id
+        WHERE s.product_id IN (SELECT product_id FROM temp.ledger_affected)
+    ) AS running
+    WHERE stock_snapshots.product_id = running.product_id
+    AND stock_snapshots.day = running.day
+"""
+
+# Ledger stock now: closing of the latest snapshot, or the opening stock
+LEDGER_STOCK_SQL = """
+    COALESCE(
+        (SELECT s.closing_stock FROM stock_snapshots s
+         WHERE s.product_id = o.product_id AND s.day <= ?
+         ORDER BY s.day DESC LIMIT 1),
+        o.opening_stock
+    )
+"""
+
+
+class StockLedger:
+    """
+    Daily stock snapshots folded from the stock movement log
+
+    Each product has an opening stock (its stock before the first recorded
+    movement) and one snapshot per day with movements, holding the day's
+    inbound, outbound and sold units and the closing stock. Refreshes fold
+    only movements past a high-water mark, so stock on any date and
+    movement velocity are index lookups over snapshots, and comparing the
+    ledger with products.current_stock exposes drift from writes that
+    bypassed update_stock.
+    """
+
+    def __init__(self):
+        self.db = DatabaseManager()
+        self.init_ledger_tables()
+
+    def init_ledger_tables(self):
+        """Initialize the snapshot, opening stock and high-water mark tables"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+
+            # Stock before the first movement the ledger saw
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stock_ledger_products (
+                    product_id INTEGER PRIMARY KEY,
+                    opening_stock INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (product_id) REFERENCES products (id)
+                )
+            """)
+
+            # One row per product per day with movements
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stock_snapshots (
+                    product_id INTEGER NOT NULL,
+                    day DATE NOT NULL,
+                    inbound INTEGER NOT NULL DEFAULT 0,
+                    outbound INTEGER NOT NULL DEFAULT 0,
+                    sold INTEGER NOT NULL DEFAULT 0,
+                    movements INTEGER NOT NULL DEFAULT 0,
+                    closing_stock INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (product_id, day),
+                    FOREIGN KEY (product_id) REFERENCES products (id)
+                )
+            """)
+
+            # Velocity reads every product over a day range
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_stock_snapshots_day ON stock_snapshots (day)
+            """)
+
+            # Last stock_movements.id folded into the snapshots
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS stock_ledger_state (
+                    name TEXT PRIMARY KEY,
+                    last_movement_id INTEGER NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Opening stock and history lookups filter movements by product
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_stock_movements_product
+                ON stock_movements (product_id, created_at)
+            """)
+
+            conn.commit()
+
+    def _high_water_mark(self, cursor):
+        cursor.execute("SELECT last_movement_id FROM stock_ledger_state WHERE name = ?", (LEDGER_NAME,))
+        row = cursor.fetchone()
+        return row['last_movement_id'] if row else 0
+
+    def _latest_movement_id(self, cursor):
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM stock_movements")
+        return cursor.fetchone()[0]
+
+    def get_high_water_mark(self):
+        """Get the last movement id folded into the snapshots"""
+        with self.db.get_connection() as conn:
+            return self._high_water_mark(conn.cursor())
+
+    def refresh(self):
+        """
+        Fold movements recorded since the last refresh into the snapshots
+
+        Products the ledger has not seen get an opening stock of their
+        current stock less all their movements, which is exact under the
+        write lock. Closing stock is recomputed for products with new
+        movements, so late or back-dated movements land on the right day.
+
+        Returns:
+            int: High-water mark after the refresh
+        """
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            last_id = self._high_water_mark(cursor)
+            cursor.execute("""
+                SELECT
+                    (SELECT COALESCE(MAX(id), 0) FROM products) >
+                    (SELECT COALESCE(MAX(product_id), 0) FROM stock_ledger_products)
+            """)
+            new_products = cursor.fetchone()[0]
+            if not new_products and self._latest_movement_id(cursor) <= last_id:
+                return last_id
+
+            cursor.execute("BEGIN IMMEDIATE")
+            last_id = self._high_water_mark(cursor)
+            latest_id = self._latest_movement_id(cursor)
+
+            cursor.execute(f"""
+                INSERT INTO stock_ledger_products (product_id, opening_stock)
+                SELECT
+                    p.id,
+                    p.current_stock - COALESCE((
+                        SELECT SUM({SIGNED_QUANTITY}) FROM stock_movements m
+                        WHERE m.product_id = p.id AND m.id <= ?
+                    ), 0)
+                FROM products p
+                WHERE p.id NOT IN (SELECT product_id FROM stock_ledger_products)
+            """, (latest_id,))
+
+            if latest_id > last_id:
+                cursor.execute(FOLD_MOVEMENTS_SQL, (last_id, latest_id))
+                cursor.execute("CREATE TEMP TABLE IF NOT EXISTS ledger_affected (product_id INTEGER PRIMARY KEY)")
+                cursor.execute("DELETE FROM temp.ledger_affected")
+                cursor.execute("""
+                    INSERT INTO temp.ledger_affected
+                    SELECT DISTINCT product_id FROM stock_movements WHERE id > ? AND id <= ?
+                """, (last_id, latest_id))
+                cursor.execute(CLOSING_STOCK_SQL)
+                cursor.execute("""
+                    INSERT INTO stock_ledger_state (name, last_movement_id, updated_at)
+                    VALUES (?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(name) DO UPDATE SET
+                        last_movement_id = excluded.last_movement_id,
+                        updated_at = excluded.updated_at
+                """, (LEDGER_NAME, latest_id))
+
+            conn.commit()
+            return latest_id
+
+    def reconcile(self, product_ids=None):
+        """
+        Replay new movements and compare the ledger with current stock
+
+        Args:
+            product_ids (list): Products to check (default: all)
+
+        Returns:
+            pandas.DataFrame: product_id, name, sku, ledger_stock,
+                current_stock and drift (current - ledger) for every product
+                whose stock disagrees with its movements
+        """
+        self.refresh()
+        product_filter = ""
+        params = ['9999-12-31']
+        if product_ids:
+            product_filter = f"WHERE p.id IN ({', '.join('?' * len(product_ids))})"
+            params += list(product_ids)
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT * FROM (
+                    SELECT
+                        p.id as product_id,
+                        p.name,
+                        p.sku,
+                        {LEDGER_STOCK_SQL} as ledger_stock,
+                        p.current_stock
+                    FROM stock_ledger_products o
+                    JOIN products p ON p.id = o.product_id
+                    {product_filter}
+                )
+                WHERE ledger_stock != current_stock
+            """, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+
+        drift = pd.DataFrame(rows, columns=['product_id', 'name', 'sku', 'ledger_stock', 'current_stock'])
+        drift['drift'] = drift['current_stock'] - drift['ledger_stock']
+        return drift
+
+    def stock_on_date(self, on_date, product_ids=None):
+        """
+        Get the closing stock of products on a date
+
+        Args:
+            on_date: Day to report
+            product_ids (list): Products to include (default: all)
+
+        Returns:
+            pandas.DataFrame: product_id, name, sku and stock
+        """
+        self.refresh()
+        query = f"""
+            SELECT p.id as product_id, p.name, p.sku, {LEDGER_STOCK_SQL} as stock
+            FROM stock_ledger_products o
+            JOIN products p ON p.id = o.product_id
+            WHERE DATE(p.created_at) <= ?
+        """
+        params = [str(on_date), str(on_date)]
+        if product_ids:
+            query += f" AND p.id IN ({', '.join('?' * len(product_ids))})"
+            params += list(product_ids)
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query + " ORDER BY p.name", params)
+            rows = [dict(row) for row in cursor.fetchall()]
+        return pd.DataFrame(rows, columns=['product_id', 'name', 'sku', 'stock'])
+
+    def stock_history(self, product_id, start_date, end_date):
+        """
+        Daily closing stock of one product, carried forward over days without movements
+
+        Returns:
+            pandas.DataFrame: Indexed by day with inbound, outbound, sold and stock
+        """
+        self.refresh()
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT {LEDGER_STOCK_SQL} as stock
+                FROM stock_ledger_products o WHERE o.product_id = ?
+            """, (str(start_date - timedelta(days=1)), product_id))
+            opening = cursor.fetchone()
+            cursor.execute("""
+                SELECT day, inbound, outbound, sold, closing_stock
+                FROM stock_snapshots
+                WHERE product_id = ? AND day BETWEEN ? AND ?
+                ORDER BY day
+            """, (product_id, str(start_date), str(end_date)))
+            rows = [dict(row) for row in cursor.fetchall()]
+
+        days = pd.date_range(start_date, end_date, freq='D')
+        snapshots = pd.DataFrame(rows, columns=['day', 'inbound', 'outbound', 'sold', 'closing_stock'])
+        snapshots.index = pd.to_datetime(snapshots.pop('day'))
+        history = snapshots.reindex(days)
+        history[['inbound', 'outbound', 'sold']] = history[['inbound', 'outbound', 'sold']].fillna(0)
+        history['stock'] = history.pop('closing_stock').ffill().fillna(opening['stock'] if opening else 0)
+        return history
+
+    def movement_velocity(self, days=30, end_date=None, product_ids=None):
+        """
+        Average units moved per day over the last N days
+
+        Args:
+            days (int): Window length in days
+            end_date: Last day of the window (default: today)
+            product_ids (list): Products to include (default: all with movements)
+
+        Returns:
+            pandas.DataFrame: product_id, inbound, outbound, sold and their
+                per-day rates (inbound_per_day, outbound_per_day, sold_per_day)
+        """
+        self.refresh()
+        end_date = end_date or date.today()
+        start_date = end_date - timedelta(days=days - 1)
+        query = """
+            SELECT product_id, SUM(inbound) as inbound, SUM(outbound) as outbound, SUM(sold) as sold
+            FROM stock_snapshots
+            WHERE day BETWEEN ? AND ?
+        """
+        params = [str(start_date), str(end_date)]
+        if product_ids:
+            query += f" AND product_id IN ({', '.join('?' * len(product_ids))})"
+            params += list(product_ids)
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query + " GROUP BY product_id", params)
+            rows = [dict(row) for row in cursor.fetchall()]
+
+        velocity = pd.DataFrame(rows, columns=['product_id', 'inbound', 'outbound', 'sold'])
+        for column in ('inbound', 'outbound', 'sold'):
+            velocity[f'{column}_per_day'] = velocity[column] / days
+        return velocity
+
+
+# Global instance
+stock_ledger = StockLedger()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh stock snapshots and report drift from current stock")
+    parser.add_argument('--stock-on', default=None, help="Also print stock on this day (YYYY-MM-DD)")
+    parser.add_argument('--velocity', type=int, default=None, help="Also print velocity over this many days")
+    args = parser.parse_args()
+
+    before = stock_ledger.get_high_water_mark()
+    drift = stock_ledger.reconcile()
+    after = stock_ledger.get_high_water_mark()
+    print(f"Replayed movements {before + 1}-{after}" if after > before else "Snapshots are up to date")
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        if drift.empty:
+            print("No drift: current stock matches the movement ledger")
+        else:
+            print(f"{len(drift)} products drifted from the movement ledger")
+            print(drift.to_string(index=False))
+
+        if args.stock_on:
+            print(stock_ledger.stock_on_date(args.stock_on).to_string(index=False))
+
+        if args.velocity:
+            print(stock_ledger.movement_velocity(args.velocity).round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,108 @@
 import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
 import plotly.express as px
-from plotly.subplots import make_subplots
 import streamlit as st
+from utils import indicator_kernels
+from utils.chart_downsampling import aggregate_ohlc, downsample_series, downsample_frame
+from utils.chart_builder import build_figure, candlestick_trace, line_trace, volume_trace, histogram_trace
+
+# Parameters used when compute_indicators() is given an indicator without its own
+INDICATOR_DEFAULTS = {
+    'sma': {'window': 20},
+    'ema': {'window': 12},
+    'bollinger': {'window': 20, 'num_std': 2},
+    'rsi': {'window': 14, 'method': 'wilder'},
+    'macd': {'fast': 12, 'slow': 26, 'signal': 9},
+    'stochastic': {'k_window': 14, 'd_window': 3},
+    'williams_r': {'window': 14},
+    'atr': {'window': 14, 'method': 'wilder'}
+}
+
+
+# Candlestick patterns recognised by detect_candlestick_patterns: name -> (label, signal)
+CANDLESTICK_PATTERNS = {
+    'doji': ('Doji', 'neutral'),
+    'hammer': ('Hammer', 'bullish'),
+    'shooting_star': ('Shooting Star', 'bearish'),
+    'bullish_engulfing': ('Bullish Engulfing', 'bullish'),
+    'bearish_engulfing': ('Bearish Engulfing', 'bearish'),
+    'bullish_harami': ('Bullish Harami', 'bullish'),
+    'bearish_harami': ('Bearish Harami', 'bearish'),
+    'piercing_line': ('Piercing Line', 'bullish'),
+    'dark_cloud_cover': ('Dark Cloud Cover', 'bearish'),
+    'morning_star': ('Morning Star', 'bullish'),
+    'evening_star': ('Evening Star', 'bearish'),
+    'three_white_soldiers': ('Three White Soldiers', 'bullish'),
+    'three_black_crows': ('Three Black Crows', 'bearish')
+}
+
+# Bars used for the average body size that defines a "long" candle
+PATTERN_BODY_WINDOW = 10
+
+
+def _previous(values, bars=1):
+    """Shift an array forward by a number of bars, padding with NaN / False"""
+    out = np.empty_like(values)
+    out[:bars] = False if values.dtype == bool else np.nan
+    out[bars:] = values[:-bars]
+    return out
+
+
+class IndicatorGraph:
+    """
+    Memoized dependency graph of indicator building blocks over one OHLCV frame
+
+    Every node is keyed by what it computes, e.g. ('sma', ('col', 'Close'), 20),
+    and evaluated at most once, so indicators that need the same SMA, EMA or
+    rolling high/low share it instead of recomputing it.
+    """
+
+    def __init__(self, data, ta):
+        self.data = data
+        self.ta = ta
+        self._nodes = {}
+
+    def node(self, key):
+        """Get a node's values, computing it and its dependencies on first use"""
+        if key not in self._nodes:
+            self._nodes[key] = self._compute(key)
+        return self._nodes[key]
+
+    def _compute(self, key):
+        kind = key[0]
+        if kind == 'col':
+            return self.data[key[1]].astype(np.float64)
+        if kind == 'sma':
+            return self.node(key[1]).rolling(window=key[2]).mean()
+        if kind == 'std':
+            return self.node(key[1]).rolling(window=key[2]).std()
+        if kind == 'ema':
+            return self.node(key[1]).ewm(span=key[2]).mean()
+        if kind == 'max':
+            return self.node(key[1]).rolling(window=key[2]).max()
+        if kind == 'min':
+            return self.node(key[1]).rolling(window=key[2]).min()
+        if kind == 'range':
+            return self.node(('max', ('col', 'High'), key[1])) - self.node(('min', ('col', 'Low'), key[1]))
+        if kind == 'macd':
+            close = ('col', 'Close')
+            return self.node(('ema', close, key[1])) - self.node(('ema', close, key[2]))
+        if kind == 'stoch_k':
+            lowest_low = self.node(('min', ('col', 'Low'), key[1]))
+            return 100 * ((self.node(('col', 'Close')) - lowest_low) / self.node(('range', key[1])))
+        if kind == 'rsi':
+            return self.ta.calculate_rsi(self.node(('col', 'Close')), key[1], key[2])
+        if kind == 'atr':
+            return self.ta.calculate_atr(
+                self.node(('col', 'High')), self.node(('col', 'Low')), self.node(('col', 'Close')), key[1], key[2]
+            )
+        raise ValueError(f"Unknown indicator node '{kind}'")
+
+    @property
+    def computed(self):
+        """Number of distinct nodes evaluated so far"""
+        return len(self._nodes)
+
 
 class TechnicalAnalysis:
     def __init__(self):
@@ -17,14 +116,17 @@ class TechnicalAnalysis:
         """Calculate Exponential Moving Average"""
         return data.ewm(span=window).mean()
     
-    def calculate_rsi(self, data, window=14):
-        """Calculate Relative Strength Index"""
-        delta = data.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
+    def calculate_rsi(self, data, window=14, method='wilder'):
+        """Calculate Relative Strength Index ('wilder' smoothing or simple 'sma' averages)"""
+        values = indicator_kernels.as_float64(data)
+        valid = ~np.isnan(values)
+        if valid.all():
+            return pd.Series(indicator_kernels.rsi(values, window, method), index=data.index)
+        
+        # Skip gaps rather than letting one NaN poison the smoothed averages
+        rsi = np.full(len(values), np.nan)
+        rsi[valid] = indicator_kernels.rsi(values[valid], window, method)
+        return pd.Series(rsi, index=data.index)
     
     def calculate_macd(self, data, fast=12, slow=26, signal=9):
         """Calculate MACD"""
@@ -75,16 +177,16 @@ class TechnicalAnalysis:
         williams_r = -100 * ((highest_high - close) / (highest_high - lowest_low))
         return williams_r
     
-    def calculate_atr(self, high, low, close, window=14):
-        """Calculate Average True Range"""
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        
-        true_range = pd.DataFrame({'tr1': tr1, 'tr2': tr2, 'tr3': tr3}).max(axis=1)
-        atr = true_range.rolling(window=window).mean()
-        
-        return atr
+    def calculate_atr(self, high, low, close, window=14, method='wilder'):
+        """Calculate Average True Range ('wilder' smoothing or simple 'sma' average)"""
+        high, low, values = (indicator_kernels.as_float64(series) for series in (high, low, close))
+        valid = ~(np.isnan(high) | np.isnan(low) | np.isnan(values))
+        if valid.all():
+            return pd.Series(indicator_kernels.atr(high, low, values, window, method), index=close.index)
+        
+        atr = np.full(len(values), np.nan)
+        atr[valid] = indicator_kernels.atr(high[valid], low[valid], values[valid], window, method)
+        return pd.Series(atr, index=close.index)
     
     def calculate_volume_indicators(self, data, volume):
         """Calculate volume-based indicators"""
@@ -113,255 +215,270 @@ class TechnicalAnalysis:
             'volume_sma': volume_sma
         }
     
-    def create_candlestick_chart(self, data, symbol, indicators=None):
-        """Create interactive candlestick chart with indicators"""
-        fig = make_subplots(
-            rows=3, cols=1,
-            shared_xaxes=True,
-            vertical_spacing=0.03,
-            subplot_titles=[f'{symbol} Price', 'Volume', 'Technical Indicators'],
-            row_heights=[0.6, 0.2, 0.2]
-        )
-        
-        # Candlestick chart
-        fig.add_trace(
-            go.Candlestick(
-                x=data.index,
-                open=data['Open'],
-                high=data['High'],
-                low=data['Low'],
-                close=data['Close'],
-                name=symbol
-            ),
-            row=1, col=1
-        )
-        
-        # Add moving averages if requested
-        if indicators and 'sma_20' in indicators:
-            sma_20 = self.calculate_sma(data['Close'], 20)
-            fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=sma_20,
-                    mode='lines',
-                    name='SMA 20',
-                    line=dict(color='orange')
-                ),
-                row=1, col=1
-            )
-        
-        if indicators and 'sma_50' in indicators:
-            sma_50 = self.calculate_sma(data['Close'], 50)
-            fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=sma_50,
-                    mode='lines',
-                    name='SMA 50',
-                    line=dict(color='blue')
-                ),
-                row=1, col=1
-            )
-        
-        if indicators and 'ema_12' in indicators:
-            ema_12 = self.calculate_ema(data['Close'], 12)
-            fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=ema_12,
-                    mode='lines',
-                    name='EMA 12',
-                    line=dict(color='green')
-                ),
-                row=1, col=1
-            )
-        
-        # Bollinger Bands
-        if indicators and 'bollinger' in indicators:
-            bb = self.calculate_bollinger_bands(data['Close'])
-            fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=bb['upper'],
-                    mode='lines',
-                    name='BB Upper',
-                    line=dict(color='red', dash='dash')
-                ),
-                row=1, col=1
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=bb['lower'],
-                    mode='lines',
-                    name='BB Lower',
-                    line=dict(color='red', dash='dash'),
-                    fill='tonexty',
-                    fillcolor='rgba(255,0,0,0.1)'
-                ),
-                row=1, col=1
-            )
-        
-        # Volume chart
-        colors = ['red' if close < open else 'green' 
-                 for close, open in zip(data['Close'], data['Open'])]
-        
-        fig.add_trace(
-            go.Bar(
-                x=data.index,
-                y=data['Volume'],
-                name='Volume',
-                marker_color=colors
-            ),
-            row=2, col=1
-        )
-        
-        # RSI
-        if indicators and 'rsi' in indicators:
-            rsi = self.calculate_rsi(data['Close'])
-            fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=rsi,
-                    mode='lines',
-                    name='RSI',
-                    line=dict(color='purple')
-                ),
-                row=3, col=1
-            )
+    def compute_indicators(self, data, spec):
+        """
+        Compute several indicators in one pass over an OHLCV frame
+        
+        The requested indicators are planned on an IndicatorGraph, so shared
+        pieces (the SMA behind Bollinger Bands, the EMAs behind MACD, the
+        rolling high/low behind Stochastic and Williams %R) are computed once.
+        
+        Args:
+            data (pandas.DataFrame): OHLCV bars
+            spec (dict or list): Indicator names mapped to a params dict, a list
+                of params dicts, or None for INDICATOR_DEFAULTS; a list of names
+                uses the defaults for each
+        
+        Returns:
+            pandas.DataFrame: One column per output, e.g. sma_20, bb_upper_20_2,
+                rsi_14, macd_12_26_9, macd_signal_12_26_9, stoch_k_14_3, atr_14
+        """
+        if not isinstance(spec, dict):
+            spec = {name: None for name in spec}
+        
+        graph = IndicatorGraph(data, self)
+        close = ('col', 'Close')
+        columns = {}
+        
+        for name, requests in spec.items():
+            if name not in INDICATOR_DEFAULTS:
+                raise ValueError(f"Unknown indicator '{name}'")
+            if not isinstance(requests, list):
+                requests = [requests]
             
-            # Add RSI levels
-            fig.add_hline(y=70, line_dash="dash", line_color="red", row=3, col=1)
-            fig.add_hline(y=30, line_dash="dash", line_color="green", row=3, col=1)
-        
-        # MACD
-        if indicators and 'macd' in indicators:
-            macd_data = self.calculate_macd(data['Close'])
-            fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=macd_data['macd'],
-                    mode='lines',
-                    name='MACD',
-                    line=dict(color='blue')
-                ),
-                row=3, col=1
-            )
-            fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=macd_data['signal'],
-                    mode='lines',
-                    name='Signal',
-                    line=dict(color='red')
-                ),
-                row=3, col=1
-            )
-        
-        # Update layout
-        fig.update_layout(
-            title=f'{symbol} Technical Analysis',
-            xaxis_rangeslider_visible=False,
-            height=800,
-            showlegend=True
-        )
-        
-        fig.update_xaxes(title_text="Date", row=3, col=1)
-        fig.update_yaxes(title_text="Price", row=1, col=1)
-        fig.update_yaxes(title_text="Volume", row=2, col=1)
-        fig.update_yaxes(title_text="Indicator", row=3, col=1)
-        
-        return fig
+            for request in requests:
+                params = {**INDICATOR_DEFAULTS[name], **(request or {})}
+                
+                if name == 'sma':
+                    columns[f"sma_{params['window']}"] = graph.node(('sma', close, params['window']))
+                elif name == 'ema':
+                    columns[f"ema_{params['window']}"] = graph.node(('ema', close, params['window']))
+                elif name == 'bollinger':
+                    window, num_std = params['window'], params['num_std']
+                    middle = graph.node(('sma', close, window))
+                    width = graph.node(('std', close, window)) * num_std
+                    columns[f"bb_upper_{window}_{num_std}"] = middle + width
+                    columns[f"bb_middle_{window}_{num_std}"] = middle
+                    columns[f"bb_lower_{window}_{num_std}"] = middle - width
+                elif name == 'rsi':
+                    suffix = params['window'] if params['method'] == 'wilder' else f"{params['method']}_{params['window']}"
+                    columns[f"rsi_{suffix}"] = graph.node(('rsi', params['window'], params['method']))
+                elif name == 'macd':
+                    fast, slow, signal = params['fast'], params['slow'], params['signal']
+                    macd = graph.node(('macd', fast, slow))
+                    macd_signal = graph.node(('ema', ('macd', fast, slow), signal))
+                    columns[f"macd_{fast}_{slow}_{signal}"] = macd
+                    columns[f"macd_signal_{fast}_{slow}_{signal}"] = macd_signal
+                    columns[f"macd_histogram_{fast}_{slow}_{signal}"] = macd - macd_signal
+                elif name == 'stochastic':
+                    k_window, d_window = params['k_window'], params['d_window']
+                    columns[f"stoch_k_{k_window}_{d_window}"] = graph.node(('stoch_k', k_window))
+                    columns[f"stoch_d_{k_window}_{d_window}"] = graph.node(('sma', ('stoch_k', k_window), d_window))
+                elif name == 'williams_r':
+                    window = params['window']
+                    highest_high = graph.node(('max', ('col', 'High'), window))
+                    columns[f"williams_r_{window}"] = -100 * ((highest_high - graph.node(close)) / graph.node(('range', window)))
+                elif name == 'atr':
+                    suffix = params['window'] if params['method'] == 'wilder' else f"{params['method']}_{params['window']}"
+                    columns[f"atr_{suffix}"] = graph.node(('atr', params['window'], params['method']))
+        
+        return pd.DataFrame(columns, index=data.index)
+    
+    def detect_candlestick_patterns(self, data, patterns=None):
+        """
+        Evaluate candlestick patterns over the whole history in one vectorized pass
+        
+        Args:
+            data (pandas.DataFrame): OHLC bars
+            patterns (list): Pattern names from CANDLESTICK_PATTERNS (default: all)
+        
+        Returns:
+            pandas.DataFrame: One boolean column per pattern, True on the bar completing it
+        """
+        patterns = patterns or list(CANDLESTICK_PATTERNS)
+        unknown = set(patterns) - set(CANDLESTICK_PATTERNS)
+        if unknown:
+            raise ValueError(f"Unknown candlestick patterns: {', '.join(sorted(unknown))}")
+        
+        o, h, l, c = (indicator_kernels.as_float64(data[col]) for col in ('Open', 'High', 'Low', 'Close'))
+        
+        body = np.abs(c - o)
+        candle_range = h - l
+        body_top = np.maximum(o, c)
+        body_bottom = np.minimum(o, c)
+        midpoint = (o + c) / 2
+        bullish = c > o
+        bearish = c < o
+        with np.errstate(invalid='ignore'):
+            long_body = body > indicator_kernels.rolling_mean(np.nan_to_num(body), PATTERN_BODY_WINDOW)
+        
+        o1, h1, l1, c1 = (_previous(values) for values in (o, h, l, c))
+        o2, c2 = _previous(o, 2), _previous(c, 2)
+        body1, body2 = _previous(body), _previous(body, 2)
+        bullish1, bearish1 = _previous(bullish), _previous(bearish)
+        bullish2, bearish2 = _previous(bullish, 2), _previous(bearish, 2)
+        long_body1, long_body2 = _previous(long_body), _previous(long_body, 2)
+        midpoint1, midpoint2 = _previous(midpoint), _previous(midpoint, 2)
+        
+        # NaN comparisons are False, so bars without enough history never match
+        with np.errstate(invalid='ignore'):
+            rules = {
+                'doji': lambda: body < candle_range * 0.1,
+                'hammer': lambda: bullish & (body < candle_range * 0.3) & (o - l > candle_range * 0.6),
+                'shooting_star': lambda: bearish & (body < candle_range * 0.3) & (h - o > candle_range * 0.6),
+                'bullish_engulfing': lambda: bearish1 & bullish & (o <= c1) & (c >= o1) & (body > body1),
+                'bearish_engulfing': lambda: bullish1 & bearish & (o >= c1) & (c <= o1) & (body > body1),
+                'bullish_harami': lambda: bearish1 & long_body1 & bullish & (body_top < o1) & (body_bottom > c1),
+                'bearish_harami': lambda: bullish1 & long_body1 & bearish & (body_top < c1) & (body_bottom > o1),
+                'piercing_line': lambda: bearish1 & long_body1 & bullish & (o < l1) & (c > midpoint1) & (c < o1),
+                'dark_cloud_cover': lambda: bullish1 & long_body1 & bearish & (o > h1) & (c < midpoint1) & (c > o1),
+                'morning_star': lambda: (bearish2 & long_body2 & (body1 < body2 * 0.3)
+                                         & (np.maximum(o1, c1) < c2) & bullish & (c > midpoint2)),
+                'evening_star': lambda: (bullish2 & long_body2 & (body1 < body2 * 0.3)
+                                         & (np.minimum(o1, c1) > c2) & bearish & (c < midpoint2)),
+                'three_white_soldiers': lambda: (bullish2 & bullish1 & bullish & (c1 > c2) & (c > c1)
+                                                 & (o1 > o2) & (o1 < c2) & (o > o1) & (o < c1)),
+                'three_black_crows': lambda: (bearish2 & bearish1 & bearish & (c1 < c2) & (c < c1)
+                                              & (o1 < o2) & (o1 > c2) & (o < o1) & (o > c1))
+            }
+            hits = {name: rules[name]() for name in patterns}
+        
+        return pd.DataFrame(hits, index=data.index)
+    
+    def get_pattern_hits(self, data, patterns=None, lookback=None):
+        """
+        Get the bars on which each pattern completed
+        
+        Args:
+            data (pandas.DataFrame): OHLC bars
+            patterns (list): Pattern names (default: all)
+            lookback (int): Only report hits within the last N bars (default: whole history)
+        
+        Returns:
+            dict: Pattern name -> index of hit dates, for patterns with at least one hit
+        """
+        return self.flags_to_hits(self.detect_candlestick_patterns(data, patterns), lookback)
+    
+    def flags_to_hits(self, flags, lookback=None):
+        """Turn a detect_candlestick_patterns() frame into pattern name -> hit dates"""
+        if lookback:
+            flags = flags.tail(lookback)
+        return {
+            name: flags.index[np.flatnonzero(flags[name].to_numpy())]
+            for name in flags.columns
+            if flags[name].any()
+        }
+    
+    def scan_patterns(self, bars_by_symbol, patterns=None, lookback=5):
+        """
+        Screen many symbols for recently completed patterns
+        
+        Args:
+            bars_by_symbol (dict): Symbol -> OHLC bars
+            patterns (list): Pattern names (default: all)
+            lookback (int): Number of most recent bars to report hits for
+        
+        Returns:
+            pandas.DataFrame: One row per hit with Symbol, Date, Pattern and Signal, newest first
+        """
+        rows = []
+        for symbol, bars in bars_by_symbol.items():
+            if bars is None or bars.empty:
+                continue
+            for name, dates in self.get_pattern_hits(bars, patterns, lookback).items():
+                label, signal = CANDLESTICK_PATTERNS[name]
+                rows.extend(
+                    {'Symbol': symbol, 'Date': date, 'Pattern': label, 'Signal': signal.title(),
+                     'Close': bars['Close'].loc[date]}
+                    for date in dates
+                )
+        
+        if not rows:
+            return pd.DataFrame(columns=['Symbol', 'Date', 'Pattern', 'Signal', 'Close'])
+        return pd.DataFrame(rows).sort_values(['Date', 'Symbol'], ascending=[False, True]).reset_index(drop=True)
+    
+    def create_candlestick_chart(self, data, symbol, indicators=None):
+        """Create interactive candlestick chart with indicators (Plotly figure dict)"""
+        indicators = indicators or []
+        # Indicators use every bar; only the plotted points are reduced
+        chart_data = aggregate_ohlc(data)
+        
+        price_traces = [candlestick_trace(chart_data, symbol)]
+        if 'sma_20' in indicators:
+            price_traces.append(line_trace(downsample_series(self.calculate_sma(data['Close'], 20)), 'SMA 20', color='orange'))
+        if 'sma_50' in indicators:
+            price_traces.append(line_trace(downsample_series(self.calculate_sma(data['Close'], 50)), 'SMA 50', color='blue'))
+        if 'ema_12' in indicators:
+            price_traces.append(line_trace(downsample_series(self.calculate_ema(data['Close'], 12)), 'EMA 12', color='green'))
+        if 'bollinger' in indicators:
+            bb = downsample_frame(pd.DataFrame(self.calculate_bollinger_bands(data['Close'])), by='middle')
+            price_traces.append(line_trace(bb['upper'], 'BB Upper', color='red', dash='dash'))
+            price_traces.append(line_trace(bb['lower'], 'BB Lower', color='red', dash='dash',
+                                           fill='tonexty', fillcolor='rgba(255,0,0,0.1)'))
+        
+        indicator_traces = []
+        indicator_lines = []
+        if 'rsi' in indicators:
+            indicator_traces.append(line_trace(downsample_series(self.calculate_rsi(data['Close'])), 'RSI', color='purple'))
+            indicator_lines = [{'y': 70, 'color': 'red'}, {'y': 30, 'color': 'green'}]
+        if 'macd' in indicators:
+            macd_data = downsample_frame(pd.DataFrame(self.calculate_macd(data['Close'])), by='macd')
+            indicator_traces.append(line_trace(macd_data['macd'], 'MACD', color='blue'))
+            indicator_traces.append(line_trace(macd_data['signal'], 'Signal', color='red'))
+        
+        return build_figure({
+            'title': f'{symbol} Technical Analysis',
+            'height': 800,
+            'x_title': 'Date',
+            'rows': [
+                {'title': f'{symbol} Price', 'height': 0.6, 'y_title': 'Price', 'traces': price_traces},
+                {'title': 'Volume', 'height': 0.2, 'y_title': 'Volume', 'traces': [volume_trace(chart_data)]},
+                {'title': 'Technical Indicators', 'height': 0.2, 'y_title': 'Indicator',
+                 'traces': indicator_traces, 'hlines': indicator_lines}
+            ],
+            'layout': {'showlegend': True}
+        })
     
     def create_rsi_chart(self, data, symbol):
-        """Create RSI chart"""
-        rsi = self.calculate_rsi(data['Close'])
-        
-        fig = go.Figure()
-        
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=rsi,
-                mode='lines',
-                name='RSI',
-                line=dict(color='purple')
-            )
-        )
-        
-        # Add overbought and oversold levels
-        fig.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought (70)")
-        fig.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold (30)")
-        fig.add_hline(y=50, line_dash="dot", line_color="gray", annotation_text="Midline (50)")
-        
-        fig.update_layout(
-            title=f'{symbol} RSI (14-period)',
-            xaxis_title='Date',
-            yaxis_title='RSI',
-            height=400,
-            yaxis=dict(range=[0, 100])
-        )
-        
-        return fig
+        """Create RSI chart (Plotly figure dict)"""
+        rsi = downsample_series(self.calculate_rsi(data['Close']))
+        
+        return build_figure({
+            'title': f'{symbol} RSI (14-period)',
+            'height': 400,
+            'x_title': 'Date',
+            'rows': [{
+                'y_title': 'RSI',
+                'y_range': [0, 100],
+                'traces': [line_trace(rsi, 'RSI', color='purple')],
+                'hlines': [
+                    {'y': 70, 'color': 'red', 'text': 'Overbought (70)'},
+                    {'y': 30, 'color': 'green', 'text': 'Oversold (30)'},
+                    {'y': 50, 'color': 'gray', 'dash': 'dot', 'text': 'Midline (50)'}
+                ]
+            }]
+        })
     
     def create_macd_chart(self, data, symbol):
-        """Create MACD chart"""
-        macd_data = self.calculate_macd(data['Close'])
-        
-        fig = make_subplots(
-            rows=2, cols=1,
-            shared_xaxes=True,
-            vertical_spacing=0.1,
-            subplot_titles=['MACD Line & Signal', 'MACD Histogram'],
-            row_heights=[0.7, 0.3]
-        )
-        
-        # MACD line and signal
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=macd_data['macd'],
-                mode='lines',
-                name='MACD',
-                line=dict(color='blue')
-            ),
-            row=1, col=1
-        )
-        
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=macd_data['signal'],
-                mode='lines',
-                name='Signal',
-                line=dict(color='red')
-            ),
-            row=1, col=1
-        )
-        
-        # MACD histogram
-        colors = ['green' if val >= 0 else 'red' for val in macd_data['histogram']]
-        fig.add_trace(
-            go.Bar(
-                x=data.index,
-                y=macd_data['histogram'],
-                name='Histogram',
-                marker_color=colors
-            ),
-            row=2, col=1
-        )
-        
-        fig.update_layout(
-            title=f'{symbol} MACD (12, 26, 9)',
-            height=600,
-            showlegend=True
-        )
-        
-        fig.update_xaxes(title_text="Date", row=2, col=1)
-        fig.update_yaxes(title_text="MACD", row=1, col=1)
-        fig.update_yaxes(title_text="Histogram", row=2, col=1)
-        
-        return fig
+        """Create MACD chart (Plotly figure dict)"""
+        macd_data = downsample_frame(pd.DataFrame(self.calculate_macd(data['Close'])), by='histogram')
+        
+        return build_figure({
+            'title': f'{symbol} MACD (12, 26, 9)',
+            'height': 600,
+            'x_title': 'Date',
+            'vertical_spacing': 0.1,
+            'rows': [
+                {'title': 'MACD Line & Signal', 'height': 0.7, 'y_title': 'MACD', 'traces': [
+                    line_trace(macd_data['macd'], 'MACD', color='blue'),
+                    line_trace(macd_data['signal'], 'Signal', color='red')
+                ]},
+                {'title': 'MACD Histogram', 'height': 0.3, 'y_title': 'Histogram', 'traces': [
+                    histogram_trace(macd_data['histogram'], 'Histogram')
+                ]}
+            ],
+            'layout': {'showlegend': True}
+        })
     
     def get_support_resistance_levels(self, data, window=20):
         """Calculate support and resistance levels"""